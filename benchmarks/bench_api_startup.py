@@ -0,0 +1,132 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+import pandas as pd
+
+from src.api.bundle import build_bundle
+
+# ----------------------------
+# Configuration
+# ----------------------------
+RUNS = 3
+POLL_S = 0.01
+TIMEOUT_S = 120
+
+# Runs in a fresh interpreter so nothing is already imported
+IMPORTER = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in ("sklearn", "shap", "joblib", "scipy") if m in sys.modules]
+print(elapsed, ",".join(heavy) or "-")
+"""
+
+
+def time_import(module):
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORTER.format(module=module)],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    return float(out[0]), out[1]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=TIMEOUT_S) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, None
+    except OSError:
+        return None, None
+
+
+def wait_for(url, start, status=200):
+    while time.perf_counter() - start < TIMEOUT_S:
+        if get(url)[0] == status:
+            return time.perf_counter() - start
+        time.sleep(POLL_S)
+    raise TimeoutError(url)
+
+
+# ----------------------------
+# Server startup
+# ----------------------------
+def time_startup(env):
+    """Seconds from process start until each endpoint first answers"""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app",
+         "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **env},
+    )
+    try:
+        timings = {
+            "health_s": wait_for(f"{base}/health", start),
+            "ready_s": wait_for(f"{base}/ready", start),
+        }
+        # The first decision also pays for the explainer unless preloading finished
+        get(f"{base}/predict/1")
+        timings["first_predict_s"] = time.perf_counter() - start
+        get(f"{base}/decision/1")
+        timings["first_decision_s"] = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+    return {k: round(v, 3) for k, v in timings.items()}
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    import_rows = []
+    for module in ["src.api.main", "joblib, shap, sklearn.ensemble"]:
+        runs = [time_import(module) for _ in range(RUNS)]
+        import_rows.append({
+            "import": module,
+            "seconds": round(min(s for s, _ in runs), 3),
+            "heavy_modules": runs[0][1],
+        })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prebuilt = os.path.join(tmp, "prebuilt")
+        build_bundle(bundle_dir=prebuilt)
+        scenarios = {
+            # No bundle yet: built from the CSV and model pickles at startup
+            "cold (build bundle)": lambda run: {
+                "BUNDLE_DIR": os.path.join(tmp, f"empty-{run}")
+            },
+            "prebuilt bundle": lambda run: {"BUNDLE_DIR": prebuilt},
+            "prebuilt + preload": lambda run: {
+                "BUNDLE_DIR": prebuilt, "PRELOAD_MODELS": "1"
+            },
+        }
+
+        startup_rows = []
+        for name, env in scenarios.items():
+            runs = [time_startup(env(run)) for run in range(RUNS)]
+            startup_rows.append({
+                "startup": name,
+                **pd.DataFrame(runs).median().round(3).to_dict()
+            })
+
+    print("✅ API startup benchmark complete")
+    print(pd.DataFrame(import_rows).to_string(index=False))
+    print()
+    print(pd.DataFrame(startup_rows).to_string(index=False))
@@ -0,0 +1,96 @@
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_api_startup import free_port, wait_for
+
+# ----------------------------
+# Configuration
+# ----------------------------
+FEATURES_PATH = "data/processed/user_features.csv"
+BATCH_SIZES = [100, 1_000, 10_000]
+# Batch-only sizes (looping would take minutes)
+LARGE_BATCH_SIZES = [50_000]
+SEED = 42
+
+
+def request(conn, method, path, body=None):
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    payload = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{method} {path}: {response.status} {payload[:200]}")
+    return payload
+
+
+def time_loop(conn, endpoint, user_ids):
+    """One GET /{endpoint}/{user_id} per user over a keep-alive connection"""
+    start = time.perf_counter()
+    for user_id in user_ids:
+        request(conn, "GET", f"/{endpoint}/{user_id}")
+    return time.perf_counter() - start
+
+
+def time_batch(conn, endpoint, user_ids):
+    body = json.dumps({"user_ids": [int(u) for u in user_ids]})
+    start = time.perf_counter()
+    payload = request(conn, "POST", f"/{endpoint}/batch", body)
+    elapsed = time.perf_counter() - start
+    assert len(json.loads(payload)["data"]["user_id"]) == len(user_ids)
+    return elapsed, len(payload)
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    known_ids = pd.read_csv(FEATURES_PATH)["user_id"].to_numpy()
+    rng = np.random.default_rng(SEED)
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--port", str(port),
+         "--log-level", "warning"],
+        env={**os.environ, "PRELOAD_MODELS": "1"},
+    )
+    rows = []
+    try:
+        wait_for(f"http://127.0.0.1:{port}/ready", time.perf_counter())
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        for endpoint in ["predict", "decision"]:
+            # Warm up both paths
+            time_loop(conn, endpoint, known_ids[:50])
+            time_batch(conn, endpoint, known_ids[:50])
+
+            for n in BATCH_SIZES + LARGE_BATCH_SIZES:
+                user_ids = rng.choice(known_ids, size=n)
+                batch_s, response_bytes = time_batch(conn, endpoint, user_ids)
+                row = {
+                    "endpoint": endpoint,
+                    "users": n,
+                    "batch_s": round(batch_s, 4),
+                    "batch_users_per_s": round(n / batch_s),
+                    "response_kb": round(response_bytes / 1024, 1),
+                }
+                if n in BATCH_SIZES:
+                    loop_s = time_loop(conn, endpoint, user_ids)
+                    row.update({
+                        "loop_s": round(loop_s, 3),
+                        "loop_users_per_s": round(n / loop_s),
+                        "speedup": round(loop_s / batch_s, 1),
+                    })
+                rows.append(row)
+        conn.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+    print("✅ Batch endpoint benchmark complete")
+    print(pd.DataFrame(rows).to_string(index=False))
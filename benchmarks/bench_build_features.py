@@ -0,0 +1,79 @@
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy.stats import entropy
+
+from benchmarks.bench_chunked_features import synthetic_events
+from src.features.build_features import (
+    activity_events,
+    daily_sessions,
+    count_features,
+    user_aggregates,
+    recency,
+    trends,
+    feature_diversity,
+)
+
+warnings.filterwarnings("ignore")
+
+# ----------------------------
+# Configuration
+# ----------------------------
+EVENT_COUNTS = [1_000_000, 5_000_000]
+REPEATS = 3
+SEED = 42
+
+
+def legacy_feature_diversity(feature_counts):
+    """Previous per-user groupby-apply implementation"""
+    grouped = feature_counts.groupby("user_id")
+    feature_entropy = grouped.apply(lambda x: entropy(x["count"])).rename("feature_entropy")
+    unique_features = grouped["feature_name"].nunique().rename("unique_features_used")
+    return pd.concat([feature_entropy, unique_features], axis=1).reset_index()
+
+
+def best_time(fn, *args):
+    best, result = float("inf"), None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    counts = [int(n) for n in sys.argv[1:]] or EVENT_COUNTS
+    rng = np.random.default_rng(SEED)
+    rows = []
+
+    for n in counts:
+        events = synthetic_events(n, rng)
+        stages = {}
+
+        stages["activity_events"], activity = best_time(activity_events, events)
+        stages["daily_sessions"], sessions = best_time(daily_sessions, activity)
+        stages["count_features"], feature_counts = best_time(count_features, activity)
+        stages["user_aggregates"], _ = best_time(user_aggregates, sessions)
+        stages["recency"], _ = best_time(recency, sessions)
+        stages["trends"], _ = best_time(trends, sessions)
+        stages["feature_diversity"], diversity = best_time(feature_diversity, feature_counts)
+        stages["feature_diversity (legacy)"], legacy = best_time(
+            legacy_feature_diversity, feature_counts
+        )
+
+        # Vectorized results must be identical, not just close
+        pd.testing.assert_frame_equal(diversity, legacy, check_exact=True)
+
+        total = sum(v for k, v in stages.items() if "legacy" not in k)
+        for stage, seconds in stages.items():
+            rows.append({"events": n, "stage": stage, "ms": round(seconds * 1000, 1),
+                         "share": "" if "legacy" in stage else f"{seconds / total:.0%}"})
+
+    print("✅ build_user_features stage benchmark complete")
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.ingestion.event_schema import compact_events
+
+# ----------------------------
+# Configuration
+# ----------------------------
+EVENT_COUNTS = [1_000_000, 4_000_000, 8_000_000]
+NUM_USERS = 20_000
+DAYS = 44
+CHUNK_ROWS = 500_000
+SEED = 42
+
+FEATURES = ["dashboard", "search", "analytics", "notifications", "profile", "settings"]
+EVENT_TYPES = np.array(["login", "feature_use", "logout"], dtype=object)
+
+# Each build runs in a fresh interpreter; VmHWM gives its own peak RSS
+BUILDER = """
+import sys, time
+from src.features.build_features import load_events, build_user_features
+from src.features.chunked import build_user_features_chunked
+def peak_rss_kb():
+    for line in open("/proc/self/status"):
+        if line.startswith("VmHWM"):
+            return int(line.split()[1])
+base = peak_rss_kb()
+start = time.perf_counter()
+if sys.argv[1] == "in_memory":
+    features = build_user_features(load_events(sys.argv[2]))
+else:
+    features = build_user_features_chunked(sys.argv[2], int(sys.argv[3]))
+print(time.perf_counter() - start, (peak_rss_kb() - base) / 1024)
+"""
+
+
+def synthetic_events(n_events, rng):
+    """Synthetic event log with the generator's columns, event mix and schema"""
+    start = np.datetime64("2026-01-01T00:00:00")
+    offsets = rng.integers(0, DAYS * 86_400, n_events).astype("timedelta64[s]")
+    kinds = rng.choice(3, n_events, p=[0.25, 0.5, 0.25])
+    feature = np.where(kinds == 1, rng.choice(FEATURES, n_events), None)
+    return compact_events(pd.DataFrame({
+        "user_id": rng.integers(1, NUM_USERS + 1, n_events),
+        "event_time": start + offsets,
+        "event_type": EVENT_TYPES[kinds],
+        "session_duration": rng.gamma(2, 10, n_events),
+        "feature_name": feature,
+        "device_type": rng.choice(["android", "ios", "web"], n_events),
+    }))
+
+
+def run_builder(mode, path):
+    out = subprocess.run(
+        [sys.executable, "-c", BUILDER, mode, path, str(CHUNK_ROWS)],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    seconds, rss_mb = map(float, out)
+    return {"seconds": round(seconds, 2), "peak_rss_mb": round(rss_mb, 1)}
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    counts = [int(n) for n in sys.argv[1:]] or EVENT_COUNTS
+    rng = np.random.default_rng(SEED)
+    rows = []
+
+    for n in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "events.csv")
+            synthetic_events(n, rng).to_csv(path, index=False)
+            size_mb = round(os.path.getsize(path) / 2**20, 1)
+            for mode in ["in_memory", "chunked"]:
+                rows.append({"events": n, "csv_mb": size_mb, "mode": mode,
+                             **run_builder(mode, path)})
+
+    print("✅ Chunked feature pipeline benchmark complete")
+    print(f"{NUM_USERS} users, {CHUNK_ROWS} rows per chunk")
+    print(pd.DataFrame(rows).to_string(index=False))
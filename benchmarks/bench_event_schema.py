@@ -0,0 +1,96 @@
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_chunked_features import synthetic_events
+from src.features.build_features import activity_events, daily_sessions, count_features
+
+warnings.filterwarnings("ignore")
+
+# ----------------------------
+# Configuration
+# ----------------------------
+EVENTS = 5_000_000
+REPEATS = 3
+SEED = 42
+
+LEGACY_DTYPES = {
+    "user_id": "int64",
+    "event_type": object,
+    "session_duration": "float64",
+    "feature_name": object,
+    "device_type": object,
+}
+
+
+# ----------------------------
+# Previous representation
+# ----------------------------
+def legacy_activity(events):
+    events["date"] = events["event_time"].dt.date
+    return events[events["event_type"].isin(["login", "feature_use"])]
+
+
+def legacy_daily_sessions(activity):
+    return activity.groupby(["user_id", "date"]).agg(
+        daily_sessions=("event_type", "count"),
+        avg_session_duration=("session_duration", "mean")
+    ).reset_index()
+
+
+def legacy_count_features(activity):
+    return (
+        activity
+        .dropna(subset=["feature_name"])
+        .groupby(["user_id", "feature_name"])
+        .size()
+        .reset_index(name="count")
+    )
+
+
+def best_time(fn, *args):
+    best, result = float("inf"), None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def mb(frame):
+    return round(frame.memory_usage(deep=True).sum() / 2**20, 1)
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    n_events = int(sys.argv[1]) if len(sys.argv) > 1 else EVENTS
+    compact = synthetic_events(n_events, np.random.default_rng(SEED))
+    legacy = compact.astype(LEGACY_DTYPES)
+    legacy["feature_name"] = legacy["feature_name"].where(compact["feature_name"].notna(), None)
+
+    rows = []
+    for name, events, stages in [
+        ("legacy", legacy, (legacy_activity, legacy_daily_sessions, legacy_count_features)),
+        ("compact", compact, (activity_events, daily_sessions, count_features)),
+    ]:
+        events_mb = mb(events)
+        activity_s, activity = best_time(stages[0], events)
+        sessions_s, sessions = best_time(stages[1], activity)
+        features_s, _ = best_time(stages[2], activity)
+        rows.append({
+            "schema": name,
+            "events_mb": events_mb,
+            "activity_mb": mb(activity),
+            "activity_ms": round(activity_s * 1000, 1),
+            "user_day_groupby_ms": round(sessions_s * 1000, 1),
+            "user_feature_groupby_ms": round(features_s * 1000, 1),
+        })
+
+    print("✅ Event schema benchmark complete")
+    print(f"{n_events} events")
+    print(pd.DataFrame(rows).to_string(index=False))
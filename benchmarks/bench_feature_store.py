@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.features.feature_store import write_feature_store
+
+# ----------------------------
+# Configuration
+# ----------------------------
+FEATURES_PATH = "data/processed/user_features.csv"
+POPULATIONS = [5_000, 1_000_000, 10_000_000]
+SEED = 42
+
+# Runs in a fresh interpreter so timings and peak RSS reflect a cold start
+# (VmHWM, unlike ru_maxrss, is not inherited from the parent across exec)
+LOADER = """
+import sys, time
+import numpy as np, pandas as pd
+from src.features.feature_store import load_feature_matrix
+def peak_rss_kb():
+    for line in open("/proc/self/status"):
+        if line.startswith("VmHWM"):
+            return int(line.split()[1])
+base = peak_rss_kb()
+start = time.perf_counter()
+if sys.argv[1] == "csv":
+    features = pd.read_csv(sys.argv[2])
+    user_ids, X = features["user_id"].to_numpy(), features.drop(columns=["user_id"])
+else:
+    user_ids, X = load_feature_matrix(csv_path=sys.argv[2], store_dir=sys.argv[3])
+load_s = time.perf_counter() - start
+X.to_numpy().sum()
+scan_s = time.perf_counter() - start
+peak = peak_rss_kb()
+print(load_s, scan_s, (peak - base) / 1024)
+"""
+
+
+def run_loader(mode, csv_path, store_dir):
+    out = subprocess.run(
+        [sys.executable, "-c", LOADER, mode, csv_path, store_dir],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    load_s, scan_s, rss_mb = map(float, out)
+    return {"load_s": round(load_s, 3), "load_and_scan_s": round(scan_s, 3),
+            "peak_rss_mb": round(rss_mb, 1)}
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    populations = [int(n) for n in sys.argv[1:]] or POPULATIONS
+    source = pd.read_csv(FEATURES_PATH)
+    rows = []
+
+    for n in populations:
+        with tempfile.TemporaryDirectory() as tmp:
+            features = source.sample(n, replace=True, random_state=SEED)
+            features["user_id"] = np.arange(1, n + 1)
+            csv_path = os.path.join(tmp, "user_features.csv")
+            store_dir = os.path.join(tmp, "user_features")
+            features.to_csv(csv_path, index=False)
+            write_feature_store(features, store_dir, csv_path)
+            del features
+
+            for mode in ["csv", "store"]:
+                rows.append({"users": n, "format": mode,
+                             **run_loader(mode, csv_path, store_dir)})
+
+    print("✅ Feature store benchmark complete")
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,126 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.api.bundle import build_bundle, set_current
+from benchmarks.bench_api_startup import free_port, wait_for
+
+# ----------------------------
+# Configuration
+# ----------------------------
+FEATURES_PATH = "data/processed/user_features.csv"
+CLIENTS = 8
+DURATION_S = 20
+RELOAD_EVERY_S = 2.0
+SEED = 42
+
+
+def client(base, user_ids, stop, results, seed):
+    rng = np.random.default_rng(seed)
+    while not stop.is_set():
+        user_id = int(rng.choice(user_ids))
+        endpoint = "decision" if rng.random() < 0.5 else "predict"
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(f"{base}/{endpoint}/{user_id}") as response:
+                status = response.status
+                version = json.loads(response.read())["meta"]["version"]
+        except urllib.error.HTTPError as exc:
+            status, version = exc.code, None
+        except OSError:
+            status, version = None, None
+        results.append((start, time.perf_counter() - start, status, version))
+
+
+def post(url):
+    request = urllib.request.Request(url, method="POST")
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        # Two artifact versions: the real features and a perturbed copy
+        features = pd.read_csv(FEATURES_PATH)
+        user_ids = features["user_id"].to_numpy()
+        bundle_dir = os.path.join(tmp, "bundle")
+        versions = []
+        for name, scale in [("a", 1.0), ("b", 1.1)]:
+            csv_path = os.path.join(tmp, f"features_{name}.csv")
+            features.assign(total_sessions=features["total_sessions"] * scale).to_csv(
+                csv_path, index=False
+            )
+            versions.append(build_bundle(features_path=csv_path, bundle_dir=bundle_dir))
+        set_current(bundle_dir, versions[0])
+
+        port = free_port()
+        base = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.api.main:app", "--port", str(port),
+             "--log-level", "warning"],
+            env={**os.environ, "BUNDLE_DIR": bundle_dir, "BUILD_BUNDLE": "0",
+                 "PRELOAD_MODELS": "1"},
+        )
+        try:
+            wait_for(f"{base}/ready", time.perf_counter())
+            stop = threading.Event()
+            results = []
+            clients = [
+                threading.Thread(target=client, args=(base, user_ids, stop, results, SEED + i))
+                for i in range(CLIENTS)
+            ]
+            for thread in clients:
+                thread.start()
+
+            reloads = []
+            start = time.perf_counter()
+            while time.perf_counter() - start < DURATION_S:
+                time.sleep(RELOAD_EVERY_S)
+                # Alternate between the two versions on every reload
+                set_current(bundle_dir, versions[(len(reloads) + 1) % 2])
+                t0 = time.perf_counter()
+                post(f"{base}/admin/reload")
+                reloads.append((t0, time.perf_counter()))
+
+            stop.set()
+            for thread in clients:
+                thread.join()
+        finally:
+            server.terminate()
+            server.wait()
+
+    df = pd.DataFrame(results, columns=["start", "latency", "status", "version"])
+    during = np.zeros(len(df), dtype=bool)
+    for t0, t1 in reloads:
+        during |= (df["start"] >= t0) & (df["start"] <= t1)
+
+    rows = []
+    for label, mask in [("steady", ~during), ("during reload", during)]:
+        latency_ms = df.loc[mask, "latency"] * 1000
+        rows.append({
+            "phase": label,
+            "requests": int(mask.sum()),
+            "p50_ms": round(latency_ms.quantile(0.5), 2),
+            "p99_ms": round(latency_ms.quantile(0.99), 2),
+            "max_ms": round(latency_ms.max(), 2),
+        })
+
+    reload_s = [t1 - t0 for t0, t1 in reloads]
+    print("✅ Hot reload benchmark complete")
+    print(f"{len(df)} requests, {len(reloads)} reloads "
+          f"(median {np.median(reload_s) * 1000:.0f} ms), "
+          f"failed requests: {int((df['status'] != 200).sum())}")
+    print(f"responses per version: {df['version'].value_counts().to_dict()}")
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,153 @@
+import http.client
+import os
+import re
+import subprocess
+import sys
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+import src.api.instrumentation as instrumentation
+from benchmarks.bench_api_startup import free_port, wait_for
+
+# ----------------------------
+# Configuration
+# ----------------------------
+FEATURES_PATH = "data/processed/user_features.csv"
+REQUESTS = 2_000
+UPLOAD_ROWS = 50_000
+UPLOADS = 3
+SEED = 42
+
+STAGE_LINE = re.compile(
+    r'^\w+_stage_seconds_(sum|count)\{endpoint="([^"]*)",stage="([^"]*)"\} (\S+)$'
+)
+
+
+def stage_block_ns(enabled, calls=200_000):
+    """Cost of one empty `with stage(...)` block"""
+    instrumentation.STAGE_TIMINGS = enabled
+    start = time.perf_counter()
+    for _ in range(calls):
+        with instrumentation.stage("noop", "bench"):
+            pass
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def start_server(env):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--port", str(port),
+         "--log-level", "warning"],
+        env={**os.environ, **env},
+    )
+    wait_for(f"http://127.0.0.1:{port}/ready", time.perf_counter())
+    return server, http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+
+
+def request(conn, method, path, body=None, headers=None):
+    conn.request(method, path, body=body, headers=headers or {})
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def multipart(csv_bytes):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"upload.csv\"\r\n"
+        f"Content-Type: text/csv\r\n\r\n"
+    ).encode() + csv_bytes + f"\r\n--{boundary}--\r\n".encode()
+    return body, {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+def predict_latency(conn, user_ids):
+    latencies = []
+    for i, user_id in enumerate(user_ids):
+        start = time.perf_counter()
+        request(conn, "GET", f"/predict/{user_id}")
+        if i >= 100:  # warm-up
+            latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+def stage_means(metrics_text, endpoint):
+    """Mean milliseconds per stage of one endpoint, from /metrics"""
+    sums, counts = {}, {}
+    for line in metrics_text.splitlines():
+        match = STAGE_LINE.match(line)
+        if match and match.group(2) == endpoint:
+            kind, _, stage, value = match.groups()
+            (sums if kind == "sum" else counts)[stage] = float(value)
+    return {stage: sums[stage] / counts[stage] * 1000 for stage in sums if counts[stage]}
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    features = pd.read_csv(FEATURES_PATH)
+    rng = np.random.default_rng(SEED)
+    user_ids = rng.choice(features["user_id"].to_numpy(), size=REQUESTS)
+    upload = features.sample(UPLOAD_ROWS, replace=True, random_state=SEED)
+    upload_body, upload_headers = multipart(upload.to_csv(index=False).encode())
+
+    # In-process: what a stage block costs on and off
+    enabled_ns = stage_block_ns(True)
+    disabled_ns = stage_block_ns(False)
+
+    # End to end: single-user latency with timings off, on, and profiling available
+    latency_rows = []
+    for label, env in [
+        ("timings off", {"STAGE_TIMINGS": "0"}),
+        ("timings on", {"STAGE_TIMINGS": "1"}),
+        ("timings on + PROFILING=1", {"STAGE_TIMINGS": "1", "PROFILING": "1"}),
+    ]:
+        server, conn = start_server(env)
+        try:
+            latency_ms = predict_latency(conn, user_ids)
+        finally:
+            conn.close()
+            server.terminate()
+            server.wait()
+        latency_rows.append({
+            "config": label,
+            "p50_ms": round(np.percentile(latency_ms, 50), 3),
+            "p99_ms": round(np.percentile(latency_ms, 99), 3),
+        })
+
+    # Where an upload's time goes, and what a profiled upload costs
+    server, conn = start_server({"PROFILING": "1"})
+    try:
+        plain_s = []
+        for _ in range(UPLOADS):
+            start = time.perf_counter()
+            request(conn, "POST", "/upload-data", upload_body, upload_headers)
+            plain_s.append(time.perf_counter() - start)
+        _, metrics = request(conn, "GET", "/metrics")
+
+        start = time.perf_counter()
+        response, folded = request(conn, "POST", "/upload-data?profile=1", upload_body, upload_headers)
+        profiled_s = time.perf_counter() - start
+        samples = int(response.getheader("X-Profile-Samples"))
+    finally:
+        conn.close()
+        server.terminate()
+        server.wait()
+
+    stages = stage_means(metrics.decode(), "/upload-data")
+    request_ms = stages.pop("request")
+    breakdown = pd.DataFrame(
+        [{"stage": name, "mean_ms": round(ms, 1), "share_pct": round(ms / request_ms * 100, 1)}
+         for name, ms in sorted(stages.items(), key=lambda item: -item[1])]
+        + [{"stage": "request (handler total)", "mean_ms": round(request_ms, 1), "share_pct": 100.0}]
+    )
+
+    print("✅ Instrumentation benchmark complete")
+    print(f"stage block: {enabled_ns:.0f} ns enabled, {disabled_ns:.0f} ns disabled")
+    print(pd.DataFrame(latency_rows).to_string(index=False))
+    print(f"/upload-data, {UPLOAD_ROWS:,} rows:")
+    print(breakdown.to_string(index=False))
+    print(f"profiled upload: {profiled_s:.2f} s vs {np.median(plain_s):.2f} s unprofiled, "
+          f"{samples} samples, {len(folded.splitlines())} distinct stacks")
@@ -0,0 +1,98 @@
+import asyncio
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.api.batcher import MicroBatcher
+
+warnings.filterwarnings("ignore")
+
+# ----------------------------
+# Configuration
+# ----------------------------
+FEATURES_PATH = "data/processed/user_features.csv"
+MODEL_PATH = "models/gb_model.pkl"
+
+CONCURRENCY = [1, 16, 64, 256]
+REQUESTS = 2_000
+THREADPOOL_SIZE = 40  # Starlette's default threadpool for sync endpoints
+SEED = 42
+
+
+# ----------------------------
+# Load artifacts
+# ----------------------------
+features = pd.read_csv(FEATURES_PATH)
+model = joblib.load(MODEL_PATH)
+X = features.drop(columns=["user_id"])
+
+
+def predict_one(idx):
+    return float(model.predict_proba(X.iloc[[idx]])[:, 1][0])
+
+
+def predict_rows(positions):
+    return model.predict_proba(X.iloc[positions])[:, 1].tolist()
+
+
+# ----------------------------
+# Load generator
+# ----------------------------
+async def run_load(call, concurrency, positions):
+    latencies = []
+    queue = iter(positions)
+
+    async def client():
+        for idx in queue:
+            start = time.perf_counter()
+            await call(int(idx))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1e3
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+    }
+
+
+async def main():
+    rng = np.random.default_rng(SEED)
+    positions = rng.integers(0, len(X), size=REQUESTS)
+    executor = ThreadPoolExecutor(THREADPOOL_SIZE)
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(executor)
+    rows = []
+
+    for concurrency in CONCURRENCY:
+        async def per_request(idx):
+            return await loop.run_in_executor(executor, predict_one, idx)
+
+        batcher = MicroBatcher(predict_rows, max_batch_size=64, max_wait_ms=2.0)
+
+        baseline = await run_load(per_request, concurrency, positions)
+        batched = await run_load(batcher.submit, concurrency, positions)
+        await batcher.close()
+
+        rows.append({"path": "per_request", "concurrency": concurrency, **baseline})
+        rows.append({
+            "path": "micro_batched",
+            "concurrency": concurrency,
+            **batched,
+            "avg_batch": round(batcher.stats()["avg_batch_size"], 1),
+        })
+
+    print("✅ Micro-batching benchmark complete")
+    print(pd.DataFrame(rows).fillna("").to_string(index=False))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
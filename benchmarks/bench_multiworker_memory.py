@@ -0,0 +1,118 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.api.bundle import build_bundle
+from benchmarks.bench_api_startup import free_port, get
+
+# ----------------------------
+# Configuration
+# ----------------------------
+FEATURES_PATH = "data/processed/user_features.csv"
+POPULATION = 1_000_000
+WORKER_COUNTS = [1, 2, 4]
+REQUESTS = 2_000
+TIMEOUT_S = 300
+SEED = 42
+
+
+def memory_mb(pid):
+    """Rss, Pss and private (unshared) memory of a process from smaps_rollup"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": fields["Rss"],
+        "pss_mb": fields["Pss"],
+        "private_mb": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def wait_for_workers(base, workers):
+    """Poll /ready until every worker process has answered 200"""
+    seen = set()
+    start = time.perf_counter()
+    while len(seen) < workers:
+        if time.perf_counter() - start > TIMEOUT_S:
+            raise TimeoutError(f"{len(seen)}/{workers} workers ready")
+        status, body = get(f"{base}/ready")
+        if status == 200:
+            seen.add(body["data"]["worker_pid"])
+        else:
+            time.sleep(0.05)
+    return seen
+
+
+def run_server(bundle_dir, workers, mmap, n_users):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "BUNDLE_DIR": bundle_dir, "BUILD_BUNDLE": "0",
+           "BUNDLE_MMAP": "1" if mmap else "0"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        pids = wait_for_workers(base, workers)
+        # Random users touch pages of the feature, score and SHAP arrays
+        rng = np.random.default_rng(SEED)
+        for user_id in rng.integers(1, n_users + 1, size=REQUESTS):
+            with urllib.request.urlopen(f"{base}/decision/{user_id}") as response:
+                json.loads(response.read())
+        per_worker = pd.DataFrame([memory_mb(pid) for pid in pids])
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "workers": workers,
+        "arrays": "mmap (shared)" if mmap else "private copy",
+        "private_mb_per_worker": round(per_worker["private_mb"].mean(), 1),
+        "rss_mb_per_worker": round(per_worker["rss_mb"].mean(), 1),
+        "total_pss_mb": round(per_worker["pss_mb"].sum(), 1),
+    }
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else POPULATION
+    worker_counts = [int(n) for n in sys.argv[2:]] or WORKER_COUNTS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        features = pd.read_csv(FEATURES_PATH).sample(n_users, replace=True, random_state=SEED)
+        features["user_id"] = np.arange(1, n_users + 1)
+        csv_path = os.path.join(tmp, "user_features.csv")
+        features.to_csv(csv_path, index=False)
+        del features
+
+        bundle_dir = os.path.join(tmp, "bundle")
+        start = time.perf_counter()
+        build_bundle(features_path=csv_path, bundle_dir=bundle_dir)
+        build_s = time.perf_counter() - start
+        bundle_mb = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(bundle_dir) for name in names
+        ) / 1024 ** 2
+
+        rows = [
+            run_server(bundle_dir, workers, mmap, n_users)
+            for mmap in [False, True]
+            for workers in worker_counts
+        ]
+
+    print("✅ Multi-worker memory benchmark complete")
+    print(f"{n_users} users, bundle {bundle_mb:.0f} MB built in {build_s:.1f}s")
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_chunked_features import synthetic_events
+from src.features.build_features import build_user_features
+from src.features.parallel import build_user_features_parallel
+
+warnings.filterwarnings("ignore")
+
+# ----------------------------
+# Configuration
+# ----------------------------
+EVENTS = 4_000_000
+SEED = 42
+
+
+def worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    n_events = int(sys.argv[1]) if len(sys.argv) > 1 else EVENTS
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    events = synthetic_events(n_events, np.random.default_rng(SEED))
+
+    serial_s, expected = timed(build_user_features, events.copy())
+    rows = [{"workers": "serial", "seconds": round(serial_s, 2),
+             "speedup": 1.0, "efficiency": ""}]
+
+    for workers in worker_counts(max_workers):
+        seconds, features = timed(build_user_features_parallel, events, workers)
+        pd.testing.assert_frame_equal(features, expected, check_exact=True)
+        speedup = serial_s / seconds
+        rows.append({"workers": workers, "seconds": round(seconds, 2),
+                     "speedup": round(speedup, 2),
+                     "efficiency": f"{speedup / workers:.0%}"})
+
+    print("✅ Parallel feature build benchmark complete")
+    print(f"{n_events} events, {os.cpu_count()} cores available")
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,74 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_instrumentation import request, start_server
+
+# ----------------------------
+# Configuration
+# ----------------------------
+FEATURES_PATH = "data/processed/user_features.csv"
+HOT_USERS = 1_000
+REQUESTS = 3_000
+SEED = 42
+
+
+def latencies(conn, paths, etags=None):
+    """Per-request milliseconds and response bytes for sequential GETs"""
+    times, sizes = [], 0
+    for path in paths:
+        headers = {"If-None-Match": etags[path]} if etags else None
+        start = time.perf_counter()
+        _, body = request(conn, "GET", path, headers=headers)
+        times.append(time.perf_counter() - start)
+        sizes += len(body)
+    return np.array(times) * 1000, sizes
+
+
+def row(endpoint, mode, latency_ms, sizes):
+    return {
+        "endpoint": endpoint,
+        "mode": mode,
+        "p50_ms": round(np.percentile(latency_ms, 50), 3),
+        "p99_ms": round(np.percentile(latency_ms, 99), 3),
+        "req_per_s": round(len(latency_ms) / latency_ms.sum() * 1000),
+        "bytes_per_req": round(sizes / len(latency_ms)),
+    }
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    features = pd.read_csv(FEATURES_PATH)
+    rng = np.random.default_rng(SEED)
+    hot = rng.choice(features["user_id"].to_numpy(), size=HOT_USERS, replace=False)
+    workloads = {
+        "/summary/overview": ["/summary/overview"] * REQUESTS,
+        "/decision/{user_id}": [f"/decision/{user_id}" for user_id in rng.choice(hot, size=REQUESTS)],
+    }
+
+    rows = []
+    for mode, env in [("no cache", {"RESPONSE_CACHE_MB": "0"}), ("cache", {})]:
+        server, conn = start_server(env)
+        try:
+            for endpoint, paths in workloads.items():
+                # Warm every distinct path once and keep its ETag
+                etags = {}
+                for path in dict.fromkeys(paths):
+                    response, _ = request(conn, "GET", path)
+                    etags[path] = response.getheader("ETag")
+                rows.append(row(endpoint, mode, *latencies(conn, paths)))
+                if mode == "cache":
+                    rows.append(row(endpoint, "If-None-Match (304)", *latencies(conn, paths, etags)))
+            _, stats = request(conn, "GET", "/cache/responses")
+        finally:
+            conn.close()
+            server.terminate()
+            server.wait()
+
+    print("✅ Response cache benchmark complete")
+    print(f"{REQUESTS:,} sequential requests per row, /decision over {HOT_USERS:,} hot users")
+    print(pd.DataFrame(rows).to_string(index=False))
+    print(f"cache stats: {stats.decode()}")
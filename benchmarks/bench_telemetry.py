@@ -0,0 +1,142 @@
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.api.telemetry import Telemetry
+from src.decision_engine.rules import RISK_LEVELS
+from src.models.compiled_gb import load_scorer
+from benchmarks.bench_api_startup import free_port, wait_for
+
+# ----------------------------
+# Configuration
+# ----------------------------
+FEATURES_PATH = "data/processed/user_features.csv"
+MODEL_PATH = "models/gb_model.pkl"
+# Single requests, a full micro-batch and an upload chunk
+BATCH_SIZES = [1, 64, 50_000]
+THREADS = 4
+CALLS_PER_THREAD = 20_000
+REQUESTS = 2_000
+SEED = 42
+
+
+def time_per_call(fn, min_s=0.5):
+    calls, start = 0, time.perf_counter()
+    while time.perf_counter() - start < min_s:
+        fn()
+        calls += 1
+    return (time.perf_counter() - start) / calls
+
+
+def record_throughput(telemetry, X, probs, codes):
+    """Records per second with THREADS threads recording concurrently"""
+    def work():
+        for _ in range(CALLS_PER_THREAD):
+            telemetry.record("predict", probs, risk_codes=codes, X=X)
+
+    threads = [threading.Thread(target=work) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return THREADS * CALLS_PER_THREAD / (time.perf_counter() - start)
+
+
+def serve_latency(user_ids, telemetry):
+    """p50/p99 of sequential GET /predict against a server with telemetry on or off"""
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--port", str(port),
+         "--log-level", "warning"],
+        env={**os.environ, "TELEMETRY": "1" if telemetry else "0"},
+    )
+    try:
+        wait_for(f"http://127.0.0.1:{port}/ready", time.perf_counter())
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        latencies = []
+        for i, user_id in enumerate(user_ids):
+            start = time.perf_counter()
+            conn.request("GET", f"/predict/{user_id}")
+            conn.getresponse().read()
+            if i >= 100:  # warm-up
+                latencies.append(time.perf_counter() - start)
+
+        scrape_ms = None
+        if telemetry:
+            start = time.perf_counter()
+            conn.request("GET", "/metrics")
+            conn.getresponse().read()
+            scrape_ms = (time.perf_counter() - start) * 1000
+        conn.close()
+    finally:
+        server.terminate()
+        server.wait()
+    latency_ms = np.array(latencies) * 1000
+    return np.percentile(latency_ms, 50), np.percentile(latency_ms, 99), scrape_ms
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    features = pd.read_csv(FEATURES_PATH)
+    source = features.drop(columns=["user_id"])
+    scorer = load_scorer(joblib.load(MODEL_PATH))
+    rng = np.random.default_rng(SEED)
+
+    # In-process: record() cost next to the scoring it accompanies
+    rows = []
+    for n in BATCH_SIZES:
+        X = source.sample(n, replace=True, random_state=SEED).reset_index(drop=True)
+        # The API records ndarray rows taken from the bundle's feature matrix
+        features_rows = X.to_numpy(dtype=np.float64)
+        probs = scorer.predict_proba(X)[:, 1]
+        codes = rng.integers(0, len(RISK_LEVELS), n)
+        flags = rng.random(n) < 0.05
+
+        telemetry = Telemetry(source.columns)
+        record_s = time_per_call(
+            lambda: telemetry.record("upload", probs, risk_codes=codes, is_anomaly=flags, X=features_rows)
+        )
+        score_s = time_per_call(lambda: scorer.predict_proba(X))
+        rows.append({
+            "rows": n,
+            "record_us": round(record_s * 1e6, 1),
+            "record_ns_per_row": round(record_s / n * 1e9, 1),
+            "predict_proba_us": round(score_s * 1e6, 1),
+            "overhead_pct": round(record_s / score_s * 100, 2),
+        })
+
+    X_one = source.iloc[:1]
+    telemetry = Telemetry(source.columns)
+    records_per_s = record_throughput(
+        telemetry, X_one.to_numpy(), scorer.predict_proba(X_one)[:, 1], np.zeros(1, dtype=np.int8)
+    )
+    recorded = sum(telemetry.snapshot()["predictions"].values())
+    render_ms = time_per_call(telemetry.render) * 1000
+
+    # End to end: the same request sequence with telemetry on and off
+    user_ids = rng.choice(features["user_id"].to_numpy(), size=REQUESTS)
+    serving = []
+    for enabled in [False, True]:
+        p50, p99, scrape_ms = serve_latency(user_ids, enabled)
+        serving.append({
+            "telemetry": "on" if enabled else "off",
+            "p50_ms": round(p50, 3),
+            "p99_ms": round(p99, 3),
+            "metrics_scrape_ms": round(scrape_ms, 2) if scrape_ms else None,
+        })
+
+    print("✅ Telemetry benchmark complete")
+    print(pd.DataFrame(rows).to_string(index=False))
+    print(f"{THREADS} threads: {records_per_s:,.0f} single-row records/s, "
+          f"{recorded} recorded (expected {THREADS * CALLS_PER_THREAD}), render {render_ms:.2f} ms")
+    print(pd.DataFrame(serving).to_string(index=False))
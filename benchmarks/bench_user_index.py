@@ -0,0 +1,59 @@
+import time
+import numpy as np
+import pandas as pd
+
+from src.api.user_index import UserIndex
+
+# ----------------------------
+# Configuration
+# ----------------------------
+POPULATIONS = [5_000, 100_000, 1_000_000, 10_000_000]
+LOOKUPS = 2_000
+BATCH_SIZE = 10_000
+SEED = 42
+
+
+def time_per_call(fn, ids):
+    start = time.perf_counter()
+    for user_id in ids:
+        fn(user_id)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEED)
+    rows = []
+
+    for n in POPULATIONS:
+        user_ids = pd.Series(np.arange(1, n + 1, dtype=np.int64))
+        queries = rng.integers(1, n + 1, size=LOOKUPS)
+
+        start = time.perf_counter()
+        index = UserIndex(user_ids.values)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        # Baseline: boolean mask scan (previous get_user_index)
+        scan_ids = queries[: max(10, LOOKUPS * 5_000 // n)]
+        scan_us = time_per_call(
+            lambda u: user_ids[user_ids == u].index[0], scan_ids
+        )
+        index_us = time_per_call(index.position, queries)
+
+        batch = rng.integers(1, n + 1, size=BATCH_SIZE)
+        start = time.perf_counter()
+        index.positions(batch)
+        batch_us = (time.perf_counter() - start) / BATCH_SIZE * 1e6
+
+        rows.append({
+            "users": n,
+            "build_ms": round(build_ms, 2),
+            "mask_scan_us": round(scan_us, 2),
+            "index_lookup_us": round(index_us, 3),
+            "batch_lookup_us_per_id": round(batch_us, 4),
+        })
+
+    print("✅ User index benchmark complete")
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,89 @@
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.api.validation import validate_features
+from src.models.compiled_gb import load_scorer
+
+warnings.filterwarnings("ignore")
+
+# ----------------------------
+# Configuration
+# ----------------------------
+FEATURES_PATH = "data/processed/user_features.csv"
+MODEL_PATH = "models/gb_model.pkl"
+ANOMALY_MODEL_PATH = "models/anomaly_model.pkl"
+
+UPLOAD_ROWS = 1_000_000
+SEED = 42
+
+
+def legacy_validate(df, feature_cols):
+    """Previous multi-scan checks, stopping at the first failure"""
+    for col in feature_cols:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            return False
+    if df[feature_cols].isnull().any().any():
+        return False
+    if not np.isfinite(df[feature_cols].values).all():
+        return False
+    if (df["days_since_last_active"] < 0).any():
+        return False
+    if (df["sessions_per_day"] < 0).any():
+        return False
+    if ((df["active_days_ratio"] < 0) | (df["active_days_ratio"] > 1)).any():
+        return False
+    return True
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+if __name__ == "__main__":
+    features = pd.read_csv(FEATURES_PATH)
+    scorer = load_scorer(joblib.load(MODEL_PATH))
+    anomaly_model = joblib.load(ANOMALY_MODEL_PATH)
+    feature_cols = [c for c in features.columns if c != "user_id"]
+
+    upload = features.sample(UPLOAD_ROWS, replace=True, random_state=SEED)
+    upload = upload.reset_index(drop=True)
+
+    # A dirty copy with a handful of violations spread over the file
+    dirty = upload.copy()
+    rng = np.random.default_rng(SEED)
+    dirty.loc[rng.choice(UPLOAD_ROWS, 50), "days_since_last_active"] = -1
+    dirty.loc[rng.choice(UPLOAD_ROWS, 50), "active_days_ratio"] = 1.5
+    dirty.loc[rng.choice(UPLOAD_ROWS, 50), "feature_entropy"] = np.nan
+
+    timings = {
+        "legacy_validation_clean": timed(legacy_validate, upload, feature_cols),
+        "single_pass_validation_clean": timed(validate_features, upload, feature_cols),
+        "single_pass_validation_dirty": timed(validate_features, dirty, feature_cols),
+        "churn_inference": timed(scorer.predict_proba, upload[feature_cols]),
+        "anomaly_inference": timed(anomaly_model.decision_function, upload[feature_cols]),
+    }
+    inference = timings["churn_inference"] + timings["anomaly_inference"]
+
+    rows = [
+        {
+            "stage": stage,
+            "seconds": round(seconds, 4),
+            "pct_of_inference": round(100 * seconds / inference, 2),
+        }
+        for stage, seconds in timings.items()
+    ]
+
+    _, violations = validate_features(dirty, feature_cols)
+    print(f"✅ Validation benchmark complete ({UPLOAD_ROWS:,} rows)")
+    print(pd.DataFrame(rows).to_string(index=False))
+    print(f"Dirty upload: {violations.invalid_rows} invalid rows, "
+          f"{len(violations.to_list())} violation groups")
@@ -5,6 +5,8 @@ import os
 
 from sklearn.ensemble import IsolationForest
 
+from src.features.feature_store import load_features
+
 # ----------------------------
 # Paths
 # ----------------------------
@@ -17,7 +19,7 @@ os.makedirs("reports/anomaly", exist_ok=True)
 # ----------------------------
 # Load data
 # ----------------------------
-features = pd.read_csv(FEATURES_PATH)
+features = load_features(FEATURES_PATH)
 user_ids = features["user_id"]
 X = features.drop(columns=["user_id"])
 
@@ -0,0 +1,411 @@
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.api.score_table import ScoreTable
+from src.api.shap_cache import compute_shap
+from src.api.user_index import UserIndex
+from src.features.feature_store import load_feature_matrix, feature_source
+from src.explainability.tree_shap import CompiledTreeShap
+from src.models.compiled_gb import CompiledGB
+from src.monitoring.sketches import (
+    BASELINE_SKETCH_PATH,
+    PROBABILITY,
+    FeatureSketch,
+    load_reference,
+    sketch_frame,
+)
+
+# ----------------------------
+# Paths
+# ----------------------------
+FEATURES_PATH = "data/processed/user_features.csv"
+MODEL_PATH = "models/gb_model.pkl"
+ANOMALY_MODEL_PATH = "models/anomaly_model.pkl"
+
+BUNDLE_DIR = "models/bundle"
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+SCORER_FILE = "scorer.npz"
+EXPLAINER_FILE = "explainer.npz"
+MODEL_FILE = "gb_model.pkl"
+ANOMALY_MODEL_FILE = "anomaly_model.pkl"
+SKETCH_FILE = "sketch.npz"
+LOCK_FILE = ".lock"
+# Staging directory of a build in progress: <version>.tmp-<pid>
+TMP_SUFFIX = ".tmp-"
+ARRAYS = [
+    "user_id",
+    "features",
+    "churn_probability",
+    "risk_bucket",
+    "anomaly_score",
+    "is_anomaly",
+]
+# Written when available: the dense user index and every row's SHAP vector
+OPTIONAL_ARRAYS = ["user_index", "shap_values"]
+
+# Precompute SHAP for every user at build time so workers share one matrix
+# instead of each building an explainer and cache (n_users x n_features floats)
+BUNDLE_SHAP = os.environ.get("BUNDLE_SHAP", "1") == "1"
+
+BUNDLE_FORMAT = 3
+# Older versions are pruned; a few are kept, and leased ones are never removed
+KEEP_VERSIONS = 3
+
+
+# ----------------------------
+# Versions
+# ----------------------------
+# A bundle is one directory per version under BUNDLE_DIR, holding the
+# feature matrix, precomputed scores and the compiled scorer and SHAP
+# explainer as .npy/.npz
+# files plus copies of both model pickles. CURRENT names the live version.
+# Arrays are memory-mapped read-only, so every worker process serving the
+# same version shares one copy through the page cache.
+# Anything still using a version (a loaded Bundle, a queued job) holds a
+# VersionLease on it, which keeps prune_bundles from deleting it.
+def source_paths(features_path=FEATURES_PATH, model_path=MODEL_PATH,
+                 anomaly_model_path=ANOMALY_MODEL_PATH):
+    return [feature_source(csv_path=features_path), model_path, anomaly_model_path]
+
+
+def bundle_version(paths):
+    return artifact_fingerprint(paths)[:16]
+
+
+def current_version(bundle_dir=BUNDLE_DIR):
+    path = os.path.join(bundle_dir, CURRENT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return f.read().strip() or None
+
+
+def set_current(bundle_dir, version):
+    path = os.path.join(bundle_dir, CURRENT_FILE)
+    with open(f"{path}.tmp", "w") as f:
+        f.write(version)
+    os.replace(f"{path}.tmp", path)
+
+
+def bundle_is_complete(path):
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path) as f:
+        return json.load(f).get("format") == BUNDLE_FORMAT
+
+
+def bundle_is_current(bundle_dir=BUNDLE_DIR, paths=None):
+    """CURRENT points at a complete bundle built from the current sources"""
+    version = current_version(bundle_dir)
+    if version is None or version != bundle_version(paths or source_paths()):
+        return False
+    return bundle_is_complete(os.path.join(bundle_dir, version))
+
+
+# ----------------------------
+# Build (offline)
+# ----------------------------
+def build_bundle(features_path=FEATURES_PATH, model_path=MODEL_PATH,
+                 anomaly_model_path=ANOMALY_MODEL_PATH, bundle_dir=BUNDLE_DIR,
+                 with_shap=BUNDLE_SHAP):
+    """Precompute everything the API serves and point CURRENT at it.
+
+    Run it holding build_lock when anything else may build in bundle_dir.
+    """
+    import joblib
+    from src.api.score_table import build_score_table
+    from src.explainability.tree_shap import load_explainer
+    from src.models.compiled_gb import load_scorer
+
+    paths = source_paths(features_path, model_path, anomaly_model_path)
+    version = bundle_version(paths)
+    target = os.path.join(bundle_dir, version)
+
+    if not bundle_is_complete(target):
+        user_ids, X = load_feature_matrix(features_path)
+        model = joblib.load(model_path)
+        scorer = load_scorer(model)
+        explainer = load_explainer(model)
+        table = build_score_table(scorer, joblib.load(anomaly_model_path), X)
+
+        tmp = f"{target}{TMP_SUFFIX}{os.getpid()}"
+        os.makedirs(tmp, exist_ok=True)
+        arrays = {
+            "user_id": np.asarray(user_ids, dtype=np.int64),
+            "features": np.ascontiguousarray(X.to_numpy(dtype=np.float64)),
+            "churn_probability": table.churn_probability,
+            "risk_bucket": table.risk_bucket,
+            "anomaly_score": table.anomaly_score,
+            "is_anomaly": table.is_anomaly,
+        }
+        index = UserIndex(arrays["user_id"])
+        if index.table is not None:
+            arrays["user_index"] = index.table
+        if with_shap:
+            arrays["shap_values"] = compute_shap(explainer, X)
+        for name, values in arrays.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), values)
+
+        # Population drift sketch, on the monitoring baseline's bins if any
+        scored = X.assign(**{PROBABILITY: table.churn_probability})
+        reference = load_reference(BASELINE_SKETCH_PATH, scored.columns)
+        sketch_frame(scored, reference).save(os.path.join(tmp, SKETCH_FILE))
+
+        compiled = isinstance(scorer, CompiledGB)
+        if compiled:
+            scorer.save(os.path.join(tmp, SCORER_FILE))
+        compiled_explainer = isinstance(explainer, CompiledTreeShap)
+        if compiled_explainer:
+            explainer.save(os.path.join(tmp, EXPLAINER_FILE))
+        shutil.copyfile(model_path, os.path.join(tmp, MODEL_FILE))
+        shutil.copyfile(anomaly_model_path, os.path.join(tmp, ANOMALY_MODEL_FILE))
+
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "version": version,
+            "created_at": time.time(),
+            "rows": len(X),
+            "columns": X.columns.tolist(),
+            "scorer": "compiled" if compiled else "sklearn",
+            "explainer": "compiled" if compiled_explainer else "shap",
+            "arrays": list(arrays),
+            "sources": paths,
+        }
+        # The manifest is written last: its presence marks a complete bundle
+        with open(os.path.join(tmp, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.replace(tmp, target)
+
+    set_current(bundle_dir, version)
+    prune_bundles(bundle_dir)
+    return version
+
+
+@contextlib.contextmanager
+def build_lock(bundle_dir=BUNDLE_DIR):
+    """Exclusive lock for building, pointing CURRENT and pruning in bundle_dir"""
+    os.makedirs(bundle_dir, exist_ok=True)
+    with open(os.path.join(bundle_dir, LOCK_FILE), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def artifact_fingerprint(paths):
+    """Cheap version key for a set of files (path, size, mtime)"""
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def build_bundle_if_stale(features_path=FEATURES_PATH, model_path=MODEL_PATH,
+                          anomaly_model_path=ANOMALY_MODEL_PATH, bundle_dir=BUNDLE_DIR):
+    """Rebuild when the sources changed; keep serving a shipped bundle without them.
+
+    Worker processes starting together take the build lock, so one of them
+    builds while the others wait and then load the same version.
+    """
+    paths = source_paths(features_path, model_path, anomaly_model_path)
+    with build_lock(bundle_dir):
+        try:
+            if bundle_is_current(bundle_dir, paths):
+                return current_version(bundle_dir)
+        except FileNotFoundError:
+            if current_version(bundle_dir) is None:
+                raise
+            return current_version(bundle_dir)
+        return build_bundle(features_path, model_path, anomaly_model_path, bundle_dir)
+
+
+def prune_bundles(bundle_dir=BUNDLE_DIR, keep=KEEP_VERSIONS):
+    """Remove all but the newest keep versions, skipping any still leased.
+
+    Call it holding build_lock; other builders' staging directories are
+    left alone either way.
+    """
+    current = current_version(bundle_dir)
+    versions = sorted(
+        (e for e in os.scandir(bundle_dir)
+         if e.is_dir() and e.name != current and TMP_SUFFIX not in e.name),
+        key=lambda e: e.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in versions[max(0, keep - 1):]:
+        manifest_path = os.path.join(entry.path, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            shutil.rmtree(entry.path, ignore_errors=True)
+            continue
+        with open(manifest_path) as manifest:
+            try:
+                fcntl.flock(manifest, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue  # a live worker or queued job still uses it
+            # Held while deleting, so a new lease waits and then finds it gone
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class VersionLease:
+    """Shared lock on a bundle version, held while anything may still read it.
+
+    It is a flock on the version's manifest. prune_bundles only deletes
+    versions it can lock exclusively. The OS drops the lock when the
+    lease is released or its process exits, so a crashed worker leaves no
+    stale lease behind.
+    """
+
+    def __init__(self, path):
+        self._file = open(os.path.join(path, MANIFEST_FILE))
+        fcntl.flock(self._file, fcntl.LOCK_SH)
+
+    def read_manifest(self):
+        self._file.seek(0)
+        return json.load(self._file)
+
+    def release(self):
+        self._file.close()
+
+
+# ----------------------------
+# Load (API startup)
+# ----------------------------
+class Bundle:
+    """One bundle version: memory-mapped arrays, eager scorer, lazy models.
+
+    Loading touches no pickles and imports neither sklearn nor shap. The
+    compiled scorer and explainer are loaded eagerly; the models are
+    unpickled on first use. shap_values() lets the bundle stand
+    in for a SHAP explainer. With mmap=False the arrays are read into
+    private memory instead. The bundle leases its version for as long as
+    it lives, so the pickles cannot be pruned before they are loaded.
+    """
+
+    def __init__(self, path, mmap=True):
+        self.path = path
+        self._lease = VersionLease(path)
+        self.manifest = self._lease.read_manifest()
+        if self.manifest.get("format") != BUNDLE_FORMAT:
+            raise ValueError(f"Unsupported bundle format in {path}")
+        self.version = self.manifest["version"]
+
+        mmap_mode = "r" if mmap else None
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ARRAYS + OPTIONAL_ARRAYS
+            if name in ARRAYS or name in self.manifest.get("arrays", [])
+        }
+        self.user_ids = arrays["user_id"]
+        self.user_index_table = arrays.get("user_index")
+        self.shap_matrix = arrays.get("shap_values")
+        self.features = arrays["features"]
+        self.X = pd.DataFrame(self.features, columns=self.manifest["columns"], copy=False)
+        self.score_table = ScoreTable(
+            arrays["churn_probability"],
+            arrays["anomaly_score"],
+            arrays["is_anomaly"],
+            risk_bucket=arrays["risk_bucket"],
+        )
+
+        sketch_path = os.path.join(path, SKETCH_FILE)
+        self.sketch = FeatureSketch.load(sketch_path) if os.path.exists(sketch_path) else None
+
+        self._compiled = None
+        if self.manifest["scorer"] == "compiled":
+            self._compiled = CompiledGB.load(os.path.join(path, SCORER_FILE))
+
+        self._lock = threading.Lock()
+        self._model = None
+        self._explainer = None
+        self._anomaly_model = None
+        if self.manifest["explainer"] == "compiled":
+            # Small lookup tables: loaded up front, no model or shap needed
+            self._explainer = CompiledTreeShap.load(
+                os.path.join(path, EXPLAINER_FILE), self._compiled
+            )
+
+    def lease(self):
+        """A separate lease on this version, for work that may outlive the bundle"""
+        return VersionLease(self.path)
+
+    @property
+    def model_path(self):
+        return os.path.join(self.path, MODEL_FILE)
+
+    @property
+    def anomaly_model_path(self):
+        return os.path.join(self.path, ANOMALY_MODEL_FILE)
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                import joblib
+                self._model = joblib.load(self.model_path)
+            return self._model
+
+    @property
+    def scorer(self):
+        return self._compiled if self._compiled is not None else self.model
+
+    @property
+    def explainer(self):
+        if self._explainer is not None:
+            return self._explainer
+        model = self.model
+        with self._lock:
+            if self._explainer is None:
+                import shap
+                self._explainer = shap.TreeExplainer(model)
+            return self._explainer
+
+    @property
+    def anomaly_model(self):
+        with self._lock:
+            if self._anomaly_model is None:
+                import joblib
+                self._anomaly_model = joblib.load(self.anomaly_model_path)
+            return self._anomaly_model
+
+    def shap_values(self, X_rows):
+        return self.explainer.shap_values(X_rows)
+
+    def models_loaded(self):
+        return {
+            "model": self._model is not None,
+            "explainer": self._explainer is not None,
+            "anomaly_model": self._anomaly_model is not None,
+        }
+
+
+def load_bundle(bundle_dir=BUNDLE_DIR, version=None, mmap=True):
+    version = version or current_version(bundle_dir)
+    if version is None:
+        raise FileNotFoundError(f"No artifact bundle in {bundle_dir}")
+    return Bundle(os.path.join(bundle_dir, version), mmap=mmap)
+
+
+# ----------------------------
+# Build the current bundle
+# ----------------------------
+if __name__ == "__main__":
+    # Same lock as build_bundle_if_stale, so a serving worker never races it
+    with build_lock():
+        version = build_bundle()
+    bundle = load_bundle()
+    print(f"✅ Artifact bundle {version} written to {BUNDLE_DIR}")
+    print(f"{bundle.manifest['rows']} users, scorer: {bundle.manifest['scorer']}, "
+          f"explainer: {bundle.manifest['explainer']}, arrays: {', '.join(bundle.manifest['arrays'])}")
@@ -0,0 +1,325 @@
+import bisect
+import collections
+import contextvars
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.routing import APIRoute
+
+from src.api.telemetry import PREFIX, format_value
+
+# ----------------------------
+# Configuration
+# ----------------------------
+# Per-endpoint, per-stage latency histograms (exported at /metrics)
+STAGE_TIMINGS = os.environ.get("STAGE_TIMINGS", "1") == "1"
+
+# Sampling profiler: PROFILING=1 lets any request ask for ?profile=1
+PROFILING = os.environ.get("PROFILING", "0") == "1"
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 5))
+# Profiles are also written here as <endpoint>-<time>.folded when set
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "")
+
+# Prometheus histogram buckets in seconds (le is inclusive)
+LATENCY_BUCKETS = [
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+]
+# The whole route handler: body parsing, endpoint and serialization
+REQUEST = "request"
+
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(SOURCE_ROOT)
+
+
+# ----------------------------
+# Stage histograms
+# ----------------------------
+class StageHistograms:
+    """Latency histograms keyed by (endpoint, stage), one shard per thread.
+
+    Like Telemetry, each thread only writes its own shard, so observing
+    takes no lock; a scrape sums the shards.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = list(buckets)
+        self._local = threading.local()
+        self._shards = []
+
+    def observe(self, endpoint, stage, seconds):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            self._shards.append(shard)  # list.append is atomic
+        entry = shard.get((endpoint, stage))
+        if entry is None:
+            # [count per bucket (+Inf last), sum]
+            entry = shard[(endpoint, stage)] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        entry[1] += seconds
+
+    def snapshot(self):
+        """{(endpoint, stage): (counts per bucket, sum)} over all threads"""
+        totals = {}
+        for shard in list(self._shards):
+            for key, (counts, total) in list(shard.items()):
+                merged = totals.setdefault(key, [[0] * len(counts), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+        return totals
+
+    def render(self):
+        """Prometheus text format: one stage_seconds histogram series per key"""
+        name = f"{PREFIX}_stage_seconds"
+        lines = [
+            f"# HELP {name} Time per request stage, by endpoint (stage=\"{REQUEST}\" is the whole handler)",
+            f"# TYPE {name} histogram",
+        ]
+        for (endpoint, stage), (counts, total) in sorted(self.snapshot().items()):
+            labels = f'endpoint="{endpoint}",stage="{stage}"'
+            cumulative = 0
+            for edge, count in zip(self.buckets + ["+Inf"], counts):
+                cumulative += count
+                le = edge if edge == "+Inf" else f"{edge:g}"
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {format_value(total)}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+stage_histograms = StageHistograms()
+
+# Route path of the request being handled; copied into threadpool threads
+_endpoint = contextvars.ContextVar("endpoint", default="")
+
+
+class _Stage:
+    __slots__ = ("name", "endpoint", "start")
+
+    def __init__(self, name, endpoint):
+        self.name = name
+        self.endpoint = endpoint
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        stage_histograms.observe(
+            self.endpoint or _endpoint.get(), self.name, time.perf_counter() - self.start
+        )
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name, endpoint=None):
+    """Time a block as one stage of the current endpoint:
+
+        with stage("predict_proba"):
+            ...
+
+    A shared no-op when STAGE_TIMINGS=0.
+    """
+    if not STAGE_TIMINGS:
+        return _NO_STAGE
+    return _Stage(name, endpoint)
+
+
+def labelled(endpoint, fn):
+    """fn run with stages attributed to endpoint (for work outside a request,
+    such as micro-batches run on executor threads)"""
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        token = _endpoint.set(endpoint)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _endpoint.reset(token)
+    return run
+
+
+# ----------------------------
+# Sampling profiler
+# ----------------------------
+class SamplingProfiler:
+    """Samples the stacks of threads running repository code.
+
+    Every interval_ms a background thread reads sys._current_frames() and
+    counts each stack that passes through src/; idle server threads are
+    left out. Other requests running at the same time are sampled too.
+    folded() gives the collapsed-stack format read by flamegraph.pl,
+    speedscope and inferno.
+    """
+
+    def __init__(self, interval_ms=PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.samples = collections.Counter()
+        self.duration_s = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.duration_s = time.perf_counter() - self._start
+        return False
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                if any(code.co_filename.startswith(SOURCE_ROOT) for code in stack):
+                    self.samples[tuple(reversed(stack))] += 1
+
+    @property
+    def n_samples(self):
+        return sum(self.samples.values())
+
+    def folded(self):
+        """One 'outer;...;inner count' line per distinct stack"""
+        return "".join(
+            ";".join(_frame_label(code) for code in stack) + f" {count}\n"
+            for stack, count in self.samples.most_common()
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _frame_label(code):
+    filename = code.co_filename
+    if filename.startswith(REPO_ROOT):
+        filename = os.path.relpath(filename, REPO_ROOT)
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+async def _profile_request(handler, request, path):
+    """Run the request under the profiler; the folded profile is the response"""
+    with SamplingProfiler() as profiler:
+        response = await handler(request)
+        # Streamed bodies are produced after the handler returns
+        if isinstance(response, StreamingResponse):
+            async for _ in response.body_iterator:
+                pass
+
+    folded = profiler.folded()
+    headers = {
+        "X-Profile-Samples": str(profiler.n_samples),
+        "X-Profile-Duration-Ms": f"{profiler.duration_s * 1000:.1f}",
+        "X-Profile-Status": str(response.status_code),
+    }
+    if PROFILE_DIR:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        slug = path.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        dump_path = os.path.join(PROFILE_DIR, f"{slug}-{time.time_ns()}.folded")
+        with open(dump_path, "w") as f:
+            f.write(folded)
+        headers["X-Profile-Path"] = dump_path
+    return PlainTextResponse(folded, headers=headers)
+
+
+# ----------------------------
+# FastAPI integration
+# ----------------------------
+class TimedRoute(APIRoute):
+    """APIRoute that labels stages with the route path and times the handler.
+
+    Also marks when the endpoint function returns, so TimedJSONResponse can
+    time the serialization FastAPI does afterwards; with PROFILING=1,
+    ?profile=1 returns a sampled profile of the request instead.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _mark_return(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        path = self.path
+
+        async def timed_handler(request):
+            # Each request runs in its own task, so the label needs no reset;
+            # it must outlive the handler for streamed bodies
+            _endpoint.set(path)
+            _returned_at.set([None])
+            if PROFILING and request.query_params.get("profile") == "1":
+                return await _profile_request(handler, request, path)
+            if not STAGE_TIMINGS:
+                return await handler(request)
+            start = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                stage_histograms.observe(path, REQUEST, time.perf_counter() - start)
+
+        return timed_handler
+
+
+# [time the endpoint function returned], shared by reference because sync
+# endpoints run in a copy of the request's context on a threadpool thread
+_returned_at = contextvars.ContextVar("returned_at", default=None)
+
+
+def _stamp_return():
+    marker = _returned_at.get()
+    if marker is not None:
+        marker[0] = time.perf_counter()
+
+
+def _mark_return(endpoint):
+    # The wrapper's signature is the endpoint's (FastAPI follows __wrapped__)
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def marked(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            _stamp_return()
+            return result
+    else:
+        @functools.wraps(endpoint)
+        def marked(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            _stamp_return()
+            return result
+    return marked
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that records FastAPI's encoding plus rendering as "serialize" """
+
+    def render(self, content):
+        body = super().render(content)
+        marker = _returned_at.get()
+        if STAGE_TIMINGS and marker is not None and marker[0] is not None:
+            stage_histograms.observe(_endpoint.get(), "serialize", time.perf_counter() - marker[0])
+        return body
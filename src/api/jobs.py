@@ -0,0 +1,361 @@
+import json
+import multiprocessing
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+from fastapi import HTTPException
+
+from src.api.upload_pipeline import check_uploaded_frame, analyze_frame, to_records
+from src.explainability.tree_shap import load_explainer
+from src.models.compiled_gb import load_scorer
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = (
+    "queued", "running", "done", "failed", "cancelled"
+)
+FINISHED = {DONE, FAILED, CANCELLED}
+JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+# ----------------------------
+# Worker process side
+# ----------------------------
+# Artifacts are loaded once per worker process by the pool initializer
+_worker = {}
+
+
+def _init_worker(model_path, anomaly_model_path, feature_cols):
+    # Heavy imports stay out of the API process until a job actually runs
+    import joblib
+
+    model = joblib.load(model_path)
+    _worker["scorer"] = load_scorer(model)
+    _worker["explainer"] = load_explainer(model)
+    _worker["anomaly_model"] = joblib.load(anomaly_model_path)
+    _worker["feature_cols"] = feature_cols
+
+
+def _score_chunk(df):
+    columns = analyze_frame(
+        df,
+        _worker["feature_cols"],
+        _worker["scorer"],
+        _worker["explainer"],
+        _worker["anomaly_model"],
+    )
+    return "".join(json.dumps(record) + "\n" for record in to_records(columns))
+
+
+# ----------------------------
+# Job records
+# ----------------------------
+# Every job is a set of files under the jobs directory, so any API worker
+# can answer for it: <id>.csv (input), <id>.ndjson (results), <id>.json
+# (status record) and <id>.cancel (cancellation requested).
+def job_paths(jobs_dir, job_id):
+    base = os.path.join(jobs_dir, job_id)
+    return f"{base}.csv", f"{base}.ndjson", f"{base}.json", f"{base}.cancel"
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Job:
+    def __init__(self, job_id, jobs_dir, artifacts=None, version=None, lease=None):
+        self.id = job_id
+        self.input_path, self.output_path, self.record_path, self.cancel_path = (
+            job_paths(jobs_dir, job_id)
+        )
+        # (model_path, anomaly_model_path, feature_cols) the job is scored with
+        self.artifacts = artifacts
+        self.version = version
+        # Released when the job finishes (see bundle.VersionLease)
+        self.lease = lease
+        self.status = QUEUED
+        self.rows_done = 0
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # API worker running the job
+        self.pid = os.getpid()
+        self.cancel_requested = threading.Event()
+
+    def cancelled(self):
+        """Cancellation requested here or, by marker file, through any worker"""
+        if not self.cancel_requested.is_set() and os.path.exists(self.cancel_path):
+            self.cancel_requested.set()
+        return self.cancel_requested.is_set()
+
+    def save(self):
+        tmp_path = f"{self.record_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({**self.to_dict(), "pid": self.pid}, f)
+        os.replace(tmp_path, self.record_path)
+
+    @classmethod
+    def load(cls, jobs_dir, job_id):
+        """The job's saved record, or None for an unknown id"""
+        if not JOB_ID.fullmatch(job_id):
+            return None
+        job = cls(job_id, jobs_dir)
+        try:
+            with open(job.record_path) as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        for name in ["status", "version", "rows_done", "error",
+                     "created_at", "started_at", "finished_at", "pid"]:
+            setattr(job, name, record[name])
+        if job.status not in FINISHED and not _process_alive(job.pid):
+            job.status = FAILED
+            job.error = "The API worker running this job exited"
+        return job
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "version": self.version,
+            "rows_done": self.rows_done,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def load_job(jobs_dir, job_id):
+    return Job.load(jobs_dir, job_id)
+
+
+def request_cancel(jobs_dir, job_id):
+    """Ask whichever worker runs the job to stop it; None for an unknown id"""
+    job = Job.load(jobs_dir, job_id)
+    if job is not None and job.status not in FINISHED:
+        open(job.cancel_path, "w").close()
+    return job
+
+
+# ----------------------------
+# Job manager (parent process)
+# ----------------------------
+class JobManager:
+    """Bounded in-process job queue feeding a scoring process pool.
+
+    A runner thread reads each job's CSV in chunks, validates them and keeps
+    up to `workers` chunks in flight on the pool, appending NDJSON results in
+    order. Progress and cancellation are tracked per chunk, in files any
+    API worker can read (see job_paths). Each job is
+    scored with the artifacts current when it was submitted; the pool is
+    restarted between jobs when those change.
+    """
+
+    def __init__(self, jobs_dir, model_path, anomaly_model_path, feature_cols,
+                 workers=2, max_queued=8, chunk_rows=50_000, history=100, version=None):
+        self.jobs_dir = jobs_dir
+        self.use_artifacts(model_path, anomaly_model_path, feature_cols, version)
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+        self.history = history
+        self.jobs = OrderedDict()
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_artifacts = None
+        self._runner = None
+
+    def use_artifacts(self, model_path, anomaly_model_path, feature_cols, version=None):
+        """Artifacts for jobs submitted from now on (queued jobs keep theirs)"""
+        self.artifacts = (model_path, anomaly_model_path, list(feature_cols))
+        self.version = version
+
+    def _ensure_started(self):
+        if self._runner is None:
+            self._runner = threading.Thread(target=self._run, name="job-runner", daemon=True)
+            self._runner.start()
+
+    def _pool_for(self, job):
+        """Scoring pool loaded with the job's artifacts (runner thread only)"""
+        if self._pool is not None and self._pool._broken:
+            # A worker died while idle (e.g. OOM-killed): start over
+            self._discard_pool()
+        if self._pool is not None and self._pool_artifacts != job.artifacts:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._pool is None:
+            # spawn: never fork the threaded API process
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=job.artifacts,
+            )
+            self._pool_artifacts = job.artifacts
+        return self._pool
+
+    def submit(self, fileobj, lease=None):
+        """Persist the upload and enqueue it; raises JobQueueFull when saturated.
+
+        lease, if given, is released once the job has finished.
+        """
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        job_id = uuid.uuid4().hex
+        job = Job(
+            job_id,
+            self.jobs_dir,
+            artifacts=self.artifacts,
+            version=self.version,
+            lease=lease,
+        )
+
+        with self._lock:
+            self._ensure_started()
+            if self._queue.full():
+                self._release(job)
+                raise JobQueueFull()
+
+        with open(job.input_path, "wb") as out:
+            while True:
+                block = fileobj.read(1 << 20)
+                if not block:
+                    break
+                out.write(block)
+
+        with self._lock:
+            # Saved before the runner can pick it up and save it as running
+            job.save()
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                for path in (job.input_path, job.record_path):
+                    os.remove(path)
+                self._release(job)
+                raise JobQueueFull()
+            self.jobs[job_id] = job
+            self._evict()
+        return job
+
+    def get(self, job_id):
+        return load_job(self.jobs_dir, job_id)
+
+    def cancel(self, job_id):
+        return request_cancel(self.jobs_dir, job_id)
+
+    def queued(self):
+        return self._queue.qsize()
+
+    def _evict(self):
+        finished = [j for j in self.jobs.values() if j.status in FINISHED]
+        for job in finished[: max(0, len(self.jobs) - self.history)]:
+            del self.jobs[job.id]
+            for path in (job.input_path, job.output_path, job.record_path, job.cancel_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job.cancelled():
+                self._finish(job, CANCELLED)
+                continue
+            job.status = RUNNING
+            job.started_at = time.time()
+            job.save()
+            try:
+                self._process(job)
+            except HTTPException as exc:
+                self._finish(job, FAILED, exc.detail)
+            except pd.errors.EmptyDataError:
+                self._finish(job, FAILED, "Uploaded CSV is empty")
+            except BrokenProcessPool as exc:
+                # A worker died mid-job: only this job fails, the next gets a new pool
+                self._discard_pool()
+                self._finish(job, FAILED, f"Scoring worker died: {exc}")
+            except Exception as exc:
+                self._finish(job, FAILED, f"{type(exc).__name__}: {exc}")
+
+    def _process(self, job):
+        pool = self._pool_for(job)
+        feature_cols = job.artifacts[2]
+        in_flight = deque()
+        try:
+            with open(job.output_path, "w") as out:
+                for chunk in pd.read_csv(job.input_path, chunksize=self.chunk_rows):
+                    if job.cancelled():
+                        break
+                    check_uploaded_frame(chunk, feature_cols)
+                    in_flight.append((len(chunk), pool.submit(_score_chunk, chunk)))
+
+                    # Backpressure: never hold more chunks than there are workers
+                    while len(in_flight) >= self.workers:
+                        self._drain(job, in_flight, out)
+
+                while in_flight and not job.cancelled():
+                    self._drain(job, in_flight, out)
+        finally:
+            # Cancelled, or failed on a later chunk: free the pool for the next job
+            self._abandon(in_flight)
+
+        if job.cancelled():
+            self._finish(job, CANCELLED)
+        elif job.rows_done == 0:
+            self._finish(job, FAILED, "Uploaded CSV is empty")
+        else:
+            self._finish(job, DONE)
+
+    def _drain(self, job, in_flight, out):
+        rows, future = in_flight.popleft()
+        out.write(future.result())
+        job.rows_done += rows
+        job.save()
+
+    def _discard_pool(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    def _abandon(self, in_flight):
+        """Cancel chunks not started yet and wait for the running ones"""
+        for _, future in in_flight:
+            future.cancel()
+        wait([future for _, future in in_flight])
+        in_flight.clear()
+
+    def _finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        # Only completed jobs keep their (full) results file
+        stale = [job.input_path, job.cancel_path] + ([job.output_path] if status != DONE else [])
+        for path in stale:
+            if os.path.exists(path):
+                os.remove(path)
+        job.save()
+        self._release(job)
+
+    def _release(self, job):
+        if job.lease is not None:
+            job.lease.release()
+            job.lease = None
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,20 +1,50 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, UploadFile, File, Header, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, FileResponse, Response
+from pydantic import BaseModel, Field
 import io
+import itertools
+import json
+import os
+import threading
+from typing import Annotated
 import pandas as pd
-import joblib
-import shap
 import numpy as np
-from sklearn.ensemble import IsolationForest
+
+# sklearn, shap, joblib and scipy are imported on first use, not at startup
+from src.api.user_index import MISSING
+from src.api.bundle import build_bundle_if_stale, current_version, load_bundle
+from src.api.serving import ServingArtifacts, ArtifactState, Reloader, group_by_artifacts
+from src.api.batcher import MicroBatcher
+from src.api.instrumentation import TimedRoute, TimedJSONResponse, labelled, stage, stage_histograms
+from src.api.response_cache import render_json
+from src.decision_engine.rules import RISK_LEVELS, recommend_actions, risk_codes
+from src.explainability.tree_shap import top_k_columns
+from src.api.upload_pipeline import check_uploaded_frame, analyze_frame, to_records
+from src.api.jobs import JobManager, JobQueueFull, DONE, load_job, request_cancel
+from src.monitoring.sketches import PROBABILITY, PSI_ALERT, drift_table
 
 # ----------------------------
 # App
 # ----------------------------
+@asynccontextmanager
+async def lifespan(app):
+    start_loading()
+    yield
+    await close_batchers()
+
+
 app = FastAPI(
     title="DecisionPulse API",
     description="Churn Prediction, Explainability & Decision Engine",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=TimedJSONResponse,
+    lifespan=lifespan
 )
+# Routes label and time their stages (see src/api/instrumentation.py)
+app.router.route_class = TimedRoute
 
 # ----------------------------
 # CORS (Frontend ↔ Backend)
@@ -34,219 +64,724 @@ FEATURES_PATH = "data/processed/user_features.csv"
 MODEL_PATH = "models/gb_model.pkl"
 ANOMALY_MODEL_PATH = "models/anomaly_model.pkl"
 
-features = pd.read_csv(FEATURES_PATH)
+# Prebuilt, versioned artifact bundle, built offline by python -m src.api.bundle.
+# BUILD_BUNDLE=1 (development only) rebuilds it in the server when the
+# sources above changed, at startup and on POST /admin/reload.
+BUNDLE_DIR = os.environ.get("BUNDLE_DIR", "models/bundle")
+BUILD_BUNDLE = os.environ.get("BUILD_BUNDLE", "0") == "1"
+# Memory-map the bundle read-only so all workers share one copy of the
+# arrays; BUNDLE_MMAP=0 reads a private copy into each worker instead
+BUNDLE_MMAP = os.environ.get("BUNDLE_MMAP", "1") == "1"
+# Requests arriving while artifacts load wait this long before a 503
+READY_TIMEOUT_S = float(os.environ.get("READY_TIMEOUT_S", 30))
+# Unpickle the models and build the explainer in the background once ready
+PRELOAD_MODELS = os.environ.get("PRELOAD_MODELS", "0") == "1"
+# Seconds between checks of CURRENT, so every worker follows a version built
+# or reloaded by any of them (0 = only this worker's POST /admin/reload)
+RELOAD_INTERVAL_S = float(os.environ.get("RELOAD_INTERVAL_S", 5))
+
+# SHAP rows are computed lazily and kept in a bounded LRU cache.
+# SHAP_WARMUP_USERS > 0 precomputes the highest-risk users in the background.
+SHAP_CACHE_SIZE = int(os.environ.get("SHAP_CACHE_SIZE", 10_000))
+SHAP_WARMUP_USERS = int(os.environ.get("SHAP_WARMUP_USERS", 0))
+
+# In-process telemetry of served predictions, scraped at /metrics
+TELEMETRY = os.environ.get("TELEMETRY", "1") == "1"
+
+# Serialized per-user and summary GET responses, per artifact version, with
+# ETags; RESPONSE_CACHE_MB=0 keeps nothing but still answers If-None-Match
+RESPONSE_CACHE_MB = float(os.environ.get("RESPONSE_CACHE_MB", 32))
+
+# Concurrent single-user requests are scored together in micro-batches
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 64))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", 2.0))
+
+# Most user ids accepted by one /predict/batch or /decision/batch request
+BATCH_MAX_IDS = int(os.environ.get("BATCH_MAX_IDS", 50_000))
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Rows parsed, scored and streamed per chunk by /upload-data/stream
+UPLOAD_CHUNK_ROWS = int(os.environ.get("UPLOAD_CHUNK_ROWS", 50_000))
+
+# Background scoring jobs for large uploads
+JOBS_DIR = os.environ.get("JOBS_DIR", "data/jobs")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", min(4, os.cpu_count() or 1)))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", 8))
+
+state = ArtifactState()
+
+
+def latest_version():
+    """Version to serve: rebuilt from changed sources, or whatever CURRENT names"""
+    if BUILD_BUNDLE:
+        return build_bundle_if_stale(FEATURES_PATH, MODEL_PATH, ANOMALY_MODEL_PATH, BUNDLE_DIR)
+    version = current_version(BUNDLE_DIR)
+    if version is None:
+        raise FileNotFoundError(f"No artifact bundle in {BUNDLE_DIR}")
+    return version
+
+
+def load_version(version):
+    artifacts = ServingArtifacts(
+        load_bundle(BUNDLE_DIR, version, mmap=BUNDLE_MMAP), SHAP_CACHE_SIZE, telemetry=TELEMETRY,
+        response_cache_bytes=int(RESPONSE_CACHE_MB * 1024 * 1024)
+    )
+    # The summaries are the same for every request of a version: serialize once
+    for key, content in SUMMARIES.items():
+        artifacts.responses.pin(key, render_json(content(artifacts)))
+    if SHAP_WARMUP_USERS > 0:
+        highest_risk = np.argsort(-artifacts.score_table.churn_probability, kind="stable")
+        artifacts.shap_cache.warm_up(highest_risk[:SHAP_WARMUP_USERS])
+    return artifacts
+
+
+# Polls only read CURRENT; with BUILD_BUNDLE=1, startup and POST /admin/reload also build
+reloader = Reloader(
+    state, latest_version, load_version, RELOAD_INTERVAL_S,
+    watch_fn=lambda: current_version(BUNDLE_DIR)
+)
+
+
+def load_artifacts():
+    """First load; runs off the event loop, then hands over to the reloader"""
+    try:
+        reloader.reload()
+    except Exception as exc:
+        state.fail(f"{type(exc).__name__}: {exc}")
+        raise
 
-model = joblib.load(MODEL_PATH)
-anomaly_model = joblib.load(ANOMALY_MODEL_PATH)
+    if PRELOAD_MODELS:
+        state.current.preload()
+    reloader.start()
 
-X = features.drop(columns=["user_id"])
-user_ids = features["user_id"]
 
-explainer = shap.TreeExplainer(model)
-shap_values = explainer.shap_values(X)
-if isinstance(shap_values, list):
-    shap_values = shap_values[1]
+def start_loading():
+    """Artifacts load in the background so /health answers at once"""
+    threading.Thread(target=load_artifacts, name="artifact-loader", daemon=True).start()
+
 
 # ----------------------------
 # Helpers
 # ----------------------------
-def get_user_index(user_id: int):
-    matches = user_ids[user_ids == user_id]
-    if matches.empty:
-        raise HTTPException(status_code=404, detail="User not found")
-    return matches.index[0]
+def not_ready():
+    return HTTPException(
+        status_code=503,
+        detail=state.error or "Artifacts are still loading",
+        headers={"Retry-After": "5"}
+    )
 
 
-def recommend_action(churn_prob, row, shap_row):
-    top_driver = shap_row.abs().idxmax()
+def current_artifacts():
+    artifacts = state.current or state.wait(READY_TIMEOUT_S)
+    if artifacts is None:
+        raise not_ready()
+    return artifacts
 
-    if churn_prob >= 0.8 and row["days_since_last_active"] >= 10:
-        return {
-            "risk_level": "CRITICAL",
-            "action": "Send re-engagement email + push notification",
-            "primary_reason": top_driver
-        }
-    elif churn_prob >= 0.6 and row["session_trend_ratio"] < 0.7:
-        return {
-            "risk_level": "AT_RISK",
-            "action": "Show feature discovery nudge",
-            "primary_reason": top_driver
-        }
-    else:
-        return {
-            "risk_level": "HEALTHY",
-            "action": "No action required",
-            "primary_reason": top_driver
-        }
 
+async def current_artifacts_async():
+    artifacts = state.current
+    if artifacts is None:
+        artifacts = await run_in_threadpool(state.wait, READY_TIMEOUT_S)
+    if artifacts is None:
+        raise not_ready()
+    return artifacts
 
-def validate_uploaded_data(df: pd.DataFrame, feature_cols: list):
-    for col in feature_cols:
-        if not pd.api.types.is_numeric_dtype(df[col]):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Column '{col}' must be numeric"
-            )
 
-    if df[feature_cols].isnull().any().any():
-        raise HTTPException(
-            status_code=400,
-            detail="Uploaded data contains NaN values"
-        )
+def get_user_index(artifacts, user_id: int):
+    idx = artifacts.user_index.position(user_id)
+    if idx is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return idx
 
-    if not np.isfinite(df[feature_cols].values).all():
-        raise HTTPException(
-            status_code=400,
-            detail="Uploaded data contains infinite values"
-        )
 
-    if (df["days_since_last_active"] < 0).any():
+def get_user_indices(artifacts, ids):
+    """(found ids, their row positions, unknown ids) for a batch request"""
+    if len(ids) > BATCH_MAX_IDS:
         raise HTTPException(
-            status_code=400,
-            detail="days_since_last_active cannot be negative"
+            status_code=413,
+            detail=f"At most {BATCH_MAX_IDS} user ids per request, got {len(ids)}"
         )
+    ids = np.asarray(ids, dtype=np.int64)
+    with stage("lookup"):
+        positions = artifacts.user_index.positions(ids)
+    found = positions != MISSING
+    return ids[found], positions[found], ids[~found]
 
-    if (df["sessions_per_day"] < 0).any():
-        raise HTTPException(
-            status_code=400,
-            detail="sessions_per_day cannot be negative"
-        )
 
-    if ((df["active_days_ratio"] < 0) | (df["active_days_ratio"] > 1)).any():
-        raise HTTPException(
-            status_code=400,
-            detail="active_days_ratio must be between 0 and 1"
+def meta(artifacts, **fields):
+    """Response meta; always names the artifact version that served it"""
+    return {"version": artifacts.version, **fields}
+
+
+def predict_columns(artifacts, positions, endpoint):
+    with stage("predict_proba"):
+        probs = artifacts.scorer.predict_proba(artifacts.X.iloc[positions])[:, 1]
+    artifacts.record(endpoint, probs, X=artifacts.features[positions])
+    return probs
+
+
+def predict_rows(artifacts, positions):
+    return predict_columns(artifacts, positions, "predict").tolist()
+
+
+def decision_columns(artifacts, positions, endpoint="decision"):
+    """One scoring and SHAP pass over the rows, as response columns"""
+    X_rows = artifacts.X.iloc[positions]
+    with stage("predict_proba"):
+        probs = artifacts.scorer.predict_proba(X_rows)[:, 1]
+    with stage("shap_values"):
+        shap_rows = artifacts.shap_cache.get_many(positions)
+    with stage("decision_rules"):
+        decisions = recommend_actions(probs, X_rows, shap_rows)
+    artifacts.record(
+        endpoint, probs, risk_codes=decisions["risk_code"], X=artifacts.features[positions]
+    )
+    return {
+        "churn_probability": probs,
+        "risk_level": decisions["risk_level"],
+        "action": decisions["action"],
+        "primary_reason": decisions["primary_reason"]
+    }
+
+
+def decide_rows(artifacts, positions):
+    columns = decision_columns(artifacts, positions)
+    return [
+        dict(zip(columns, values))
+        for values in zip(*(column.tolist() for column in columns.values()))
+    ]
+
+
+def columnar_response(columns, meta_fields, accept=None):
+    """Columns as compact JSON, or as an Arrow IPC stream when asked for"""
+    if accept and ARROW_MEDIA_TYPE in accept:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise HTTPException(status_code=406, detail="Arrow output needs pyarrow")
+        table = pa.table(columns).replace_schema_metadata({"meta": json.dumps(meta_fields)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue().to_pybytes(), media_type=ARROW_MEDIA_TYPE)
+
+    # Serialized directly: FastAPI's encoder walks every list element
+    with stage("serialize"):
+        body = json.dumps({
+            "meta": meta_fields,
+            "data": {name: np.asarray(values).tolist() for name, values in columns.items()}
+        })
+    return Response(body, media_type="application/json")
+
+
+def cache_headers(etag):
+    # no-cache: clients may keep the body but revalidate it with If-None-Match
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def cached_response(artifacts, key, if_none_match):
+    """304 if the client's copy is current, else the cached body, else None"""
+    cache = artifacts.responses
+    etag = cache.etag(key)
+    if cache.check(etag, if_none_match):
+        return Response(status_code=304, headers=cache_headers(etag))
+    body = cache.get(key)
+    if body is None:
+        return None
+    return Response(body, media_type="application/json", headers=cache_headers(etag))
+
+
+def record_cache_hit(artifacts, idx, endpoint):
+    """Telemetry for a cached (or 304) answer, as if the user had been scored.
+
+    The probability comes from the bundle's score table, which holds what
+    the scorer returns for every user.
+    """
+    positions = [idx]
+    probs = artifacts.score_table.churn_probability[positions]
+    X = artifacts.features[positions]
+    fields = {}
+    if endpoint == "decision":
+        cols = artifacts.feature_cols
+        fields["risk_codes"] = risk_codes(
+            probs,
+            X[:, cols.index("days_since_last_active")],
+            X[:, cols.index("session_trend_ratio")]
         )
+    artifacts.record(endpoint, probs, X=X, **fields)
+
+
+def store_response(artifacts, key, content):
+    """Serialize content, cache it under key and return it with its ETag"""
+    with stage("serialize"):
+        body = render_json(content)
+    artifacts.responses.put(key, body)
+    return Response(body, media_type="application/json", headers=cache_headers(artifacts.responses.etag(key)))
+
+
+# Created on first use: the job pool loads models from the bundle
+job_manager = None
+job_manager_lock = threading.Lock()
+
+
+def get_job_manager(artifacts):
+    """Job manager submitting new jobs with the given artifacts"""
+    global job_manager
+    bundle = artifacts.bundle
+    with job_manager_lock:
+        if job_manager is None:
+            job_manager = JobManager(
+                JOBS_DIR,
+                bundle.model_path,
+                bundle.anomaly_model_path,
+                artifacts.feature_cols,
+                workers=JOB_WORKERS,
+                max_queued=JOB_QUEUE_SIZE,
+                chunk_rows=UPLOAD_CHUNK_ROWS,
+                version=artifacts.version
+            )
+        elif job_manager.version != artifacts.version:
+            job_manager.use_artifacts(
+                bundle.model_path, bundle.anomaly_model_path,
+                artifacts.feature_cols, artifacts.version
+            )
+        return job_manager
+
+
+# Items are (artifacts, position) so each request is scored on the version
+# it started with, even if a reload lands while it waits in a batch
+# Batches run on executor threads outside any request, so stages are labelled here
+predict_batcher = MicroBatcher(
+    labelled("/predict/{user_id}", lambda items: group_by_artifacts(items, predict_rows)),
+    BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+)
+decision_batcher = MicroBatcher(
+    labelled("/decision/{user_id}", lambda items: group_by_artifacts(items, decide_rows)),
+    BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+)
+
+
+async def close_batchers():
+    reloader.stop()
+    await predict_batcher.close()
+    await decision_batcher.close()
+    if job_manager is not None:
+        job_manager.shutdown()
 
 # ----------------------------
 # Routes
 # ----------------------------
 @app.get("/health")
 def health():
-    return {"meta": {}, "data": {"status": "ok"}}
+    """Liveness: the process is up, whether or not artifacts are loaded"""
+    artifacts = state.current
+    return {
+        "meta": {"version": artifacts.version if artifacts else None},
+        "data": {"status": "ok"}
+    }
 
 
-@app.get("/predict/{user_id}")
-def predict(user_id: int):
-    idx = get_user_index(user_id)
-    prob = float(model.predict_proba(X.iloc[[idx]])[:, 1][0])
+@app.get("/ready")
+def ready():
+    """Readiness: 503 until the artifact bundle is loaded and serving"""
+    artifacts = state.current
+    if artifacts is None:
+        raise not_ready()
     return {
-        "meta": {},
+        "meta": meta(artifacts),
         "data": {
-            "user_id": user_id,
-            "churn_probability": prob
+            "status": "ready",
+            "version": artifacts.version,
+            "loaded_at": state.loaded_at,
+            "reloads": state.reloads,
+            "last_reload_error": reloader.last_error,
+            "worker_pid": os.getpid(),
+            "users": len(artifacts.user_index),
+            "models_loaded": artifacts.bundle.models_loaded()
         }
     }
 
 
-@app.get("/decision/{user_id}")
-def decision(user_id: int):
-    idx = get_user_index(user_id)
-    prob = float(model.predict_proba(X.iloc[[idx]])[:, 1][0])
-    shap_row = pd.Series(shap_values[idx], index=X.columns)
-    decision = recommend_action(prob, X.iloc[idx], shap_row)
+@app.post("/admin/reload")
+def reload_artifacts(force: bool = False):
+    """Load the latest artifact version (building it if sources changed) and swap it in"""
+    previous = state.current
+    try:
+        reloaded = reloader.reload(force=force)
+    except Exception as exc:
+        reloader.last_error = f"{type(exc).__name__}: {exc}"
+        raise HTTPException(status_code=500, detail=f"Reload failed: {reloader.last_error}")
 
+    artifacts = state.current
     return {
-        "meta": {},
+        "meta": meta(artifacts),
+        "data": {
+            "reloaded": reloaded,
+            "previous_version": previous.version if previous else None,
+            "version": artifacts.version
+        }
+    }
+
+
+# Per-user GET responses are cached by path; cache hits skip the batchers
+@app.get("/predict/{user_id}")
+async def predict(user_id: int, if_none_match: str | None = Header(None)):
+    artifacts = await current_artifacts_async()
+    idx = get_user_index(artifacts, user_id)
+    key = f"/predict/{user_id}"
+    response = cached_response(artifacts, key, if_none_match)
+    if response is not None:
+        record_cache_hit(artifacts, idx, "predict")
+        return response
+
+    prob = await predict_batcher.submit((artifacts, idx))
+    return store_response(artifacts, key, {
+        "meta": meta(artifacts),
+        "data": {
+            "user_id": user_id,
+            "churn_probability": prob
+        }
+    })
+
+
+@app.get("/decision/{user_id}")
+async def decision(user_id: int, if_none_match: str | None = Header(None)):
+    artifacts = await current_artifacts_async()
+    idx = get_user_index(artifacts, user_id)
+    key = f"/decision/{user_id}"
+    response = cached_response(artifacts, key, if_none_match)
+    if response is not None:
+        record_cache_hit(artifacts, idx, "decision")
+        return response
+
+    decision = await decision_batcher.submit((artifacts, idx))
+    return store_response(artifacts, key, {
+        "meta": meta(artifacts),
         "data": {
             "user_id": user_id,
-            "churn_probability": prob,
             **decision
         }
-    }
+    })
+
+
+@app.get("/explain/{user_id}")
+def explain(user_id: int, top_k: int = Query(5, ge=1), if_none_match: str | None = Header(None)):
+    """Top-k churn drivers for a user, with signed SHAP values (log-odds)"""
+    artifacts = current_artifacts()
+    idx = get_user_index(artifacts, user_id)
+    key = f"/explain/{user_id}?top_k={top_k}"
+    response = cached_response(artifacts, key, if_none_match)
+    if response is not None:
+        return response
+
+    with stage("shap_values"):
+        shap_row = artifacts.shap_cache.get(idx)
+    features, values = top_k_columns(shap_row[None, :], top_k)
+    return store_response(artifacts, key, {
+        "meta": meta(artifacts, top_k=len(features[0])),
+        "data": {
+            "user_id": user_id,
+            "churn_probability": float(artifacts.score_table.churn_probability[idx]),
+            "drivers": [
+                {"feature": artifacts.feature_cols[j], "shap_value": value}
+                for j, value in zip(features[0].tolist(), values[0].tolist())
+            ]
+        }
+    })
+
+# ----------------------------
+# Batch Endpoints
+# ----------------------------
+# Ids are looked up as int64; anything wider is rejected with a 422
+UserId = Annotated[int, Field(ge=np.iinfo(np.int64).min, le=np.iinfo(np.int64).max)]
+
+
+class UserIdsRequest(BaseModel):
+    user_ids: list[UserId]
+
+
+def batch_meta(artifacts, user_ids, missing):
+    return meta(artifacts, users=len(user_ids), missing_user_ids=missing.tolist())
+
+
+@app.post("/predict/batch")
+def predict_batch(request: UserIdsRequest, accept: str | None = Header(None)):
+    """Churn probability for many known users; unknown ids are listed in meta"""
+    artifacts = current_artifacts()
+    user_ids, positions, missing = get_user_indices(artifacts, request.user_ids)
+    probs = predict_columns(artifacts, positions, "predict_batch")
+    return columnar_response(
+        {"user_id": user_ids, "churn_probability": probs},
+        batch_meta(artifacts, user_ids, missing),
+        accept
+    )
+
+
+@app.post("/decision/batch")
+def decision_batch(request: UserIdsRequest, accept: str | None = Header(None)):
+    """Decisions for many known users as columns; unknown ids are listed in meta"""
+    artifacts = current_artifacts()
+    user_ids, positions, missing = get_user_indices(artifacts, request.user_ids)
+    return columnar_response(
+        {"user_id": user_ids, **decision_columns(artifacts, positions, "decision_batch")},
+        batch_meta(artifacts, user_ids, missing),
+        accept
+    )
+
+@app.get("/cache/shap")
+def shap_cache_stats():
+    artifacts = current_artifacts()
+    return {"meta": meta(artifacts), "data": artifacts.shap_cache.stats()}
+
+
+@app.get("/cache/responses")
+def response_cache_stats():
+    artifacts = current_artifacts()
+    return {"meta": meta(artifacts), "data": artifacts.responses.stats()}
 
 # ----------------------------
 # Summary Endpoints
 # ----------------------------
-@app.get("/summary/overview")
-def summary_overview():
-    probs = model.predict_proba(X)[:, 1]
+def overview_content(artifacts):
+    score_table = artifacts.score_table
     return {
-        "meta": {},
+        "meta": meta(artifacts),
         "data": {
-            "total_users": len(X),
-            "avg_churn_probability": float(np.mean(probs)),
-            "high_risk_users": int((probs >= 0.8).sum())
+            "total_users": score_table.total_users,
+            "avg_churn_probability": score_table.avg_churn_probability,
+            "high_risk_users": score_table.risk_counts["critical"]
         }
     }
 
 
-@app.get("/summary/risk-distribution")
-def risk_distribution():
-    probs = model.predict_proba(X)[:, 1]
+def risk_distribution_content(artifacts):
     return {
-        "meta": {},
-        "data": {
-            "healthy": int((probs < 0.6).sum()),
-            "at_risk": int(((probs >= 0.6) & (probs < 0.8)).sum()),
-            "critical": int((probs >= 0.8).sum())
-        }
+        "meta": meta(artifacts),
+        "data": dict(artifacts.score_table.risk_counts)
     }
 
 
-@app.get("/summary/anomalies")
-def anomaly_summary():
-    anomaly_labels = anomaly_model.predict(X)
+def anomalies_content(artifacts):
     return {
-        "meta": {},
+        "meta": meta(artifacts),
         "data": {
-            "total_anomalies": int((anomaly_labels == -1).sum())
+            "total_anomalies": artifacts.score_table.total_anomalies
         }
     }
 
+
+# Pinned in each version's response cache when it loads
+SUMMARIES = {
+    "/summary/overview": overview_content,
+    "/summary/risk-distribution": risk_distribution_content,
+    "/summary/anomalies": anomalies_content,
+}
+
+
+def summary_response(key, if_none_match):
+    artifacts = current_artifacts()
+    response = cached_response(artifacts, key, if_none_match)
+    if response is None:
+        response = store_response(artifacts, key, SUMMARIES[key](artifacts))
+    return response
+
+
+@app.get("/summary/overview")
+def summary_overview(if_none_match: str | None = Header(None)):
+    return summary_response("/summary/overview", if_none_match)
+
+
+@app.get("/summary/risk-distribution")
+def risk_distribution(if_none_match: str | None = Header(None)):
+    return summary_response("/summary/risk-distribution", if_none_match)
+
+
+@app.get("/summary/anomalies")
+def anomaly_summary(if_none_match: str | None = Header(None)):
+    return summary_response("/summary/anomalies", if_none_match)
+
 # ----------------------------
-# Upload Endpoint
+# Upload Endpoints
 # ----------------------------
+def check_upload(artifacts, df: pd.DataFrame):
+    check_uploaded_frame(df, artifacts.feature_cols)
+
+
+def analyze_upload(artifacts, df: pd.DataFrame, endpoint="upload"):
+    bundle = artifacts.bundle
+    columns = analyze_frame(
+        df, artifacts.feature_cols, bundle.scorer, bundle, bundle.anomaly_model
+    )
+    artifacts.record(
+        endpoint,
+        columns["churn_probability"],
+        risk_codes=pd.Categorical(columns["risk_level"], categories=RISK_LEVELS).codes,
+        is_anomaly=columns["is_anomaly"],
+        X=df[artifacts.feature_cols].to_numpy(dtype=np.float64)
+    )
+    if artifacts.traffic_sketch is not None:
+        artifacts.traffic_sketch.update(
+            df[artifacts.feature_cols].assign(**{PROBABILITY: columns["churn_probability"]})
+        )
+    return columns
+
+
 @app.post("/upload-data")
 def upload_and_analyze(file: UploadFile = File(...)):
-    contents = file.file.read()
-    df = pd.read_csv(io.BytesIO(contents))
+    artifacts = current_artifacts()
+    with stage("parse_csv"):
+        contents = file.file.read()
+        df = pd.read_csv(io.BytesIO(contents))
 
-    if df.empty:
-        raise HTTPException(status_code=400, detail="Uploaded CSV is empty")
+    with stage("validate"):
+        check_upload(artifacts, df)
 
-    required_cols = set(X.columns.tolist() + ["user_id"])
-    if not required_cols.issubset(df.columns):
-        missing = required_cols - set(df.columns)
-        raise HTTPException(
-            status_code=400,
-            detail=f"Missing columns: {list(missing)}"
-        )
+    # Build the response column-wise, then zip into records
+    results = to_records(analyze_upload(artifacts, df))
 
-    validate_uploaded_data(df, X.columns.tolist())
+    return {
+        "meta": meta(artifacts, rows_processed=len(results)),
+        "data": results
+    }
 
-    user_ids_upload = df["user_id"]
-    X_upload = df[X.columns]
 
-    churn_probs = model.predict_proba(X_upload)[:, 1]
+@app.post("/upload-data/stream")
+def upload_and_analyze_stream(file: UploadFile = File(...)):
+    """Chunked variant of /upload-data streaming NDJSON.
+
+    One result record per line as each chunk finishes, then a final
+    {"meta": ...} line. Errors in later chunks end the stream with an
+    {"error": ...} line, since the status code has already been sent.
+    """
+    # The whole stream is scored with the artifacts current when it started
+    artifacts = current_artifacts()
+    try:
+        with stage("parse_csv"):
+            chunks = pd.read_csv(file.file, chunksize=UPLOAD_CHUNK_ROWS)
+            first = next(chunks)
+    except (StopIteration, pd.errors.EmptyDataError):
+        raise HTTPException(status_code=400, detail="Uploaded CSV is empty")
 
-    shap_vals = explainer.shap_values(X_upload)
-    if isinstance(shap_vals, list):
-        shap_vals = shap_vals[1]
+    # The first chunk is checked up front so bad files still get a 400
+    with stage("validate"):
+        check_upload(artifacts, first)
+
+    def parsed(chunks):
+        while True:
+            with stage("parse_csv"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    def stream():
+        rows_processed = 0
+        for chunk_no, chunk in enumerate(itertools.chain([first], parsed(chunks))):
+            if chunk_no:
+                try:
+                    with stage("validate"):
+                        check_upload(artifacts, chunk)
+                except HTTPException as exc:
+                    yield json.dumps({
+                        "error": exc.detail,
+                        "chunk": chunk_no,
+                        "rows_processed": rows_processed
+                    }) + "\n"
+                    return
+
+            records = to_records(analyze_upload(artifacts, chunk, "upload_stream"))
+            rows_processed += len(records)
+            with stage("serialize"):
+                lines = "".join(json.dumps(record) + "\n" for record in records)
+            yield lines
+
+        yield json.dumps({
+            "meta": meta(artifacts, rows_processed=rows_processed, chunks=chunk_no + 1)
+        }) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
-    anomaly_scores = anomaly_model.decision_function(X_upload)
-    anomaly_labels = anomaly_model.predict(X_upload)
+# ----------------------------
+# Monitoring
+# ----------------------------
+@app.get("/monitoring/drift")
+def traffic_drift():
+    """Drift of uploaded rows vs the served population, from sketches only"""
+    artifacts = current_artifacts()
+    traffic = artifacts.traffic_sketch
+    if traffic is None:
+        raise HTTPException(status_code=404, detail="Artifact bundle has no population sketch")
+
+    rows = int(traffic.rows.max())
+    drift = drift_table(artifacts.bundle.sketch, traffic).to_dict(orient="records") if rows else []
+    return {
+        "meta": meta(artifacts, rows=rows, psi_alert=PSI_ALERT),
+        "data": drift
+    }
 
-    results = []
-    for i in range(len(df)):
-        shap_row = pd.Series(shap_vals[i], index=X.columns)
-        decision = recommend_action(
-            churn_probs[i],
-            X_upload.iloc[i],
-            shap_row
-        )
 
-        results.append({
-            "user_id": int(user_ids_upload.iloc[i]),
-            "churn_probability": float(churn_probs[i]),
-            "risk_level": decision["risk_level"],
-            "recommended_action": decision["action"],
-            "primary_reason": decision["primary_reason"],
-            "is_anomaly": bool(anomaly_labels[i] == -1),
-            "anomaly_score": float(anomaly_scores[i])
-        })
+@app.get("/metrics")
+def metrics():
+    """Served-prediction telemetry and per-stage timings, Prometheus text format"""
+    artifacts = current_artifacts()
+    text = stage_histograms.render()
+    if artifacts.telemetry is not None:
+        text = artifacts.telemetry.render() + text
+    return Response(text, media_type="text/plain; version=0.0.4")
 
+# ----------------------------
+# Batch Scoring Jobs
+# ----------------------------
+def get_job(job_id: str):
+    # Read from JOBS_DIR: the job may belong to another API worker
+    job = load_job(JOBS_DIR, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/jobs/upload-data", status_code=202)
+def submit_upload_job(file: UploadFile = File(...)):
+    artifacts = current_artifacts()
+    job_manager = get_job_manager(artifacts)
+    try:
+        # The lease keeps the version's model pickles until the job has run
+        job = job_manager.submit(file.file, lease=artifacts.bundle.lease())
+    except JobQueueFull:
+        raise HTTPException(
+            status_code=429,
+            detail="Job queue is full, retry later",
+            headers={"Retry-After": "30"}
+        )
     return {
-        "meta": {"rows_processed": len(results)},
-        "data": results
+        "meta": meta(artifacts, queued_jobs=job_manager.queued()),
+        "data": job.to_dict()
     }
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    return {"meta": meta(current_artifacts()), "data": get_job(job_id).to_dict()}
+
+
+@app.get("/jobs/{job_id}/results")
+def job_results(job_id: str):
+    job = get_job(job_id)
+    if job.status != DONE:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job is {job.status}, results are not available"
+        )
+    return FileResponse(
+        job.output_path,
+        media_type="application/x-ndjson",
+        filename=f"{job.id}.ndjson"
+    )
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = request_cancel(JOBS_DIR, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"meta": meta(current_artifacts()), "data": job.to_dict()}
@@ -0,0 +1,116 @@
+import collections
+import hashlib
+import json
+import sys
+import threading
+
+# ----------------------------
+# Configuration
+# ----------------------------
+# Bookkeeping per cached entry beyond its key and body (OrderedDict node, tuple)
+ENTRY_OVERHEAD_BYTES = 200
+
+
+def render_json(content):
+    """The bytes FastAPI's JSONResponse would send for content"""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match check: weak comparison, "*" matches anything"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+# ----------------------------
+# Response cache
+# ----------------------------
+class ResponseCache:
+    """Serialized JSON bodies for one artifact version, keyed by request.
+
+    A cached GET response only depends on the artifact version and the
+    request path, so the ETag is derived from those two alone and an
+    If-None-Match hit needs neither the body nor a lookup. Bodies live in
+    an LRU bounded by max_bytes; pinned bodies (the summaries, built at
+    load) are kept outside the bound and never evicted. A reload builds a
+    new ServingArtifacts and with it an empty cache, so no entry outlives
+    its version. max_bytes=0 stores nothing (ETags and 304s still work).
+    """
+
+    def __init__(self, version, max_bytes=32 * 1024 * 1024):
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self._bodies = collections.OrderedDict()  # key -> (body, size)
+        self._pinned = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def etag(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        return f'"{self.version}-{digest}"'
+
+    def check(self, etag, if_none_match):
+        """True when the client's copy is current (answer 304)"""
+        if if_none_match and etag_matches(if_none_match, etag):
+            with self._lock:
+                self.not_modified += 1
+            return True
+        return False
+
+    def get(self, key):
+        body = self._pinned.get(key)
+        with self._lock:
+            if body is None:
+                entry = self._bodies.get(key)
+                if entry is not None:
+                    self._bodies.move_to_end(key)
+                    body = entry[0]
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return body
+
+    def put(self, key, body):
+        size = sys.getsizeof(key) + sys.getsizeof(body) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._bodies.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._bodies[key] = (body, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._bodies.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def pin(self, key, body):
+        """Keep body for the life of this version, outside the LRU bound"""
+        if self.max_bytes > 0:
+            self._pinned[key] = body
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._bodies),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "pinned": sorted(self._pinned),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,58 @@
+import numpy as np
+
+from src.decision_engine.rules import (
+    AT_RISK_PROBABILITY,
+    CRITICAL_PROBABILITY,
+    HEALTHY,
+    AT_RISK,
+    CRITICAL,
+)
+
+# ----------------------------
+# Risk buckets (churn probability only)
+# ----------------------------
+RISK_BUCKETS = ["healthy", "at_risk", "critical"]
+
+
+def risk_buckets(probs):
+    buckets = np.full(len(probs), HEALTHY, dtype=np.int8)
+    buckets[probs >= AT_RISK_PROBABILITY] = AT_RISK
+    buckets[probs >= CRITICAL_PROBABILITY] = CRITICAL
+    return buckets
+
+
+# ----------------------------
+# Score table
+# ----------------------------
+class ScoreTable:
+    """Columnar per-user scores plus population aggregates"""
+
+    def __init__(self, churn_probability, anomaly_score, is_anomaly, risk_bucket=None):
+        self.churn_probability = np.asarray(churn_probability, dtype=np.float64)
+        self.risk_bucket = (
+            risk_buckets(self.churn_probability) if risk_bucket is None
+            else np.asarray(risk_bucket, dtype=np.int8)
+        )
+        self.anomaly_score = np.asarray(anomaly_score, dtype=np.float64)
+        self.is_anomaly = np.asarray(is_anomaly, dtype=bool)
+
+        bucket_counts = np.bincount(self.risk_bucket, minlength=len(RISK_BUCKETS))
+        self.total_users = len(self.churn_probability)
+        self.avg_churn_probability = (
+            float(self.churn_probability.mean()) if self.total_users else 0.0
+        )
+        self.risk_counts = {
+            name: int(count) for name, count in zip(RISK_BUCKETS, bucket_counts)
+        }
+        self.total_anomalies = int(self.is_anomaly.sum())
+
+    def __len__(self):
+        return self.total_users
+
+
+def build_score_table(model, anomaly_model, X):
+    churn_probs = model.predict_proba(X)[:, 1]
+    anomaly_scores = anomaly_model.decision_function(X)
+    # IsolationForest.predict is decision_function < 0
+    is_anomaly = anomaly_scores < 0
+    return ScoreTable(churn_probs, anomaly_scores, is_anomaly)
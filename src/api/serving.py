@@ -0,0 +1,179 @@
+import threading
+import time
+
+from src.api.response_cache import ResponseCache
+from src.api.shap_cache import ShapCache, ShapTable
+from src.api.telemetry import Telemetry
+from src.api.user_index import UserIndex
+
+
+# ----------------------------
+# Per-version serving artifacts
+# ----------------------------
+class ServingArtifacts:
+    """A loaded bundle plus the lookup and cache structures built on it.
+
+    Everything per-user comes from the bundle's shared arrays when it has
+    them; only bundles without them build a private index or SHAP cache.
+    """
+
+    def __init__(self, bundle, shap_cache_size=10_000, telemetry=True,
+                 response_cache_bytes=32 * 1024 * 1024):
+        self.bundle = bundle
+        self.version = bundle.version
+        self.X = bundle.X
+        self.features = bundle.features  # the ndarray behind X
+        self.feature_cols = bundle.X.columns.tolist()
+        self.score_table = bundle.score_table
+
+        if bundle.user_index_table is not None:
+            self.user_index = UserIndex.from_table(bundle.user_index_table, len(bundle.user_ids))
+        else:
+            self.user_index = UserIndex(bundle.user_ids)
+
+        # Uploaded rows scored by this version, sketched for drift monitoring
+        self.traffic_sketch = bundle.sketch.empty_like() if bundle.sketch is not None else None
+        # Served predictions and inputs for /metrics; counters restart with each version
+        self.telemetry = Telemetry(self.feature_cols, version=self.version) if telemetry else None
+        # Serialized GET responses; a new version starts with an empty cache
+        self.responses = ResponseCache(self.version, response_cache_bytes)
+
+        if bundle.shap_matrix is not None:
+            self.shap_cache = ShapTable(bundle.shap_matrix)
+        else:
+            # The bundle unpickles the model and builds the explainer on first miss
+            self.shap_cache = ShapCache(bundle, bundle.X, maxsize=shap_cache_size)
+
+    def record(self, endpoint, probs, **fields):
+        if self.telemetry is not None:
+            self.telemetry.record(endpoint, probs, **fields)
+
+    @property
+    def scorer(self):
+        return self.bundle.scorer
+
+    def probe(self):
+        """Score one row so first-use imports happen before traffic arrives"""
+        self.scorer.predict_proba(self.X.iloc[:1])
+
+    def preload(self, explainer=True, anomaly_model=True):
+        if explainer:
+            self.bundle.explainer
+        if anomaly_model:
+            self.bundle.anomaly_model
+
+    def preload_like(self, other):
+        """Load whatever models the artifacts being replaced had loaded"""
+        loaded = other.bundle.models_loaded()
+        self.preload(explainer=loaded["explainer"], anomaly_model=loaded["anomaly_model"])
+
+
+def group_by_artifacts(items, process):
+    """Run process(artifacts, positions) once per artifacts in a micro-batch.
+
+    items are (artifacts, position) pairs captured when each request
+    arrived, so a batch straddling a reload is still scored per version.
+    """
+    groups = {}
+    for slot, (artifacts, idx) in enumerate(items):
+        groups.setdefault(id(artifacts), (artifacts, [], []))
+        groups[id(artifacts)][1].append(slot)
+        groups[id(artifacts)][2].append(idx)
+
+    results = [None] * len(items)
+    for artifacts, slots, positions in groups.values():
+        for slot, result in zip(slots, process(artifacts, positions)):
+            results[slot] = result
+    return results
+
+
+# ----------------------------
+# Readiness
+# ----------------------------
+class ArtifactState:
+    """The artifacts currently served; empty until loading finishes"""
+
+    def __init__(self):
+        self.current = None
+        self.error = None
+        self.loaded_at = None
+        self.reloads = 0
+        self._done = threading.Event()
+
+    def set(self, artifacts):
+        # One reference assignment: requests that already hold the previous
+        # artifacts finish on them, new requests see the new version
+        if self.current is not None:
+            self.reloads += 1
+        self.current = artifacts
+        self.loaded_at = time.time()
+        self.error = None
+        self._done.set()
+
+    def fail(self, error):
+        self.error = error
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """Current artifacts, waiting up to timeout for the first load"""
+        self._done.wait(timeout)
+        return self.current
+
+
+# ----------------------------
+# Hot reload
+# ----------------------------
+class Reloader:
+    """Loads new artifact versions in the background and swaps them in.
+
+    latest_fn() returns the version that should be served (building it if
+    needed) and load_fn(version) returns its ServingArtifacts. The new
+    version is probed and warmed before the swap, so no request waits on
+    it. With interval_s > 0 a daemon thread polls watch_fn (default
+    latest_fn) and swaps in whatever version it names.
+    """
+
+    def __init__(self, state, latest_fn, load_fn, interval_s=0, watch_fn=None):
+        self.state = state
+        self.latest_fn = latest_fn
+        self.watch_fn = watch_fn or latest_fn
+        self.load_fn = load_fn
+        self.interval_s = interval_s
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def reload(self, force=False, version_fn=None):
+        """Serve the latest version; returns True if artifacts were swapped"""
+        with self._lock:
+            version = (version_fn or self.latest_fn)()
+            if version is None:
+                return False
+            current = self.state.current
+            if current is not None and current.version == version and not force:
+                return False
+
+            artifacts = self.load_fn(version)
+            artifacts.probe()
+            if current is not None:
+                artifacts.preload_like(current)
+            self.state.set(artifacts)
+            self.last_error = None
+            return True
+
+    def start(self):
+        if self.interval_s > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="artifact-reloader", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.reload(version_fn=self.watch_fn)
+            except Exception as exc:
+                # Keep serving the current version; retried on the next poll
+                self.last_error = f"{type(exc).__name__}: {exc}"
@@ -0,0 +1,137 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def compute_shap(explainer, X_rows):
+    shap_vals = explainer.shap_values(X_rows)
+    if isinstance(shap_vals, list):
+        shap_vals = shap_vals[1]
+    return np.asarray(shap_vals)
+
+
+# ----------------------------
+# Lazy SHAP cache
+# ----------------------------
+class ShapCache:
+    """Size-bounded LRU of per-row SHAP vectors, computed on demand"""
+
+    def __init__(self, explainer, X, maxsize=10_000):
+        self.explainer = explainer
+        self.X = X
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+        self._warmup_thread = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get(self, idx):
+        return self.get_many([idx])[0]
+
+    def get_many(self, indices):
+        """SHAP rows for the given row positions; misses share one explainer call"""
+        indices = [int(i) for i in indices]
+        if not indices:
+            return np.empty((0, self.X.shape[1]))
+        found = {}
+
+        with self._lock:
+            for idx in indices:
+                row = self._rows.get(idx)
+                if row is not None:
+                    self._rows.move_to_end(idx)
+                    found[idx] = row
+            missing = sorted(set(indices) - found.keys())
+            self.hits += len(indices) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            computed = compute_shap(self.explainer, self.X.iloc[missing])
+            for idx, row in zip(missing, computed):
+                found[idx] = row
+            self._store(missing, computed)
+
+        return np.stack([found[idx] for idx in indices])
+
+    def _store(self, indices, rows):
+        with self._lock:
+            for idx, row in zip(indices, rows):
+                self._rows[idx] = row
+                self._rows.move_to_end(idx)
+            while len(self._rows) > self.maxsize:
+                self._rows.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._rows),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "warming_up": bool(
+                    self._warmup_thread and self._warmup_thread.is_alive()
+                ),
+            }
+
+    # ----------------------------
+    # Background warm-up
+    # ----------------------------
+    def warm_up(self, indices, batch_size=512):
+        """Precompute rows in a daemon thread without touching hit/miss counters"""
+        indices = [int(i) for i in indices[: self.maxsize]]
+
+        def run():
+            for start in range(0, len(indices), batch_size):
+                batch = [i for i in indices[start:start + batch_size] if i not in self._rows]
+                if batch:
+                    self._store(batch, compute_shap(self.explainer, self.X.iloc[batch]))
+
+        self._warmup_thread = threading.Thread(target=run, name="shap-warmup", daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+
+# ----------------------------
+# Precomputed SHAP matrix
+# ----------------------------
+class ShapTable:
+    """Every row's SHAP vector precomputed (e.g. memory-mapped from a bundle).
+
+    Same interface as ShapCache; lookups are plain row gathers, so worker
+    processes share the matrix instead of each filling its own cache.
+    """
+
+    def __init__(self, values):
+        self.values = values
+        self.hits = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, idx):
+        return self.get_many([idx])[0]
+
+    def get_many(self, indices):
+        self.hits += len(indices)
+        return self.values[np.asarray(indices, dtype=np.int64)]
+
+    def stats(self):
+        return {
+            "size": len(self.values),
+            "maxsize": len(self.values),
+            "hits": self.hits,
+            "misses": 0,
+            "hit_rate": 1.0 if self.hits else 0.0,
+            "warming_up": False,
+            "precomputed": True,
+        }
+
+    def warm_up(self, indices, batch_size=512):
+        return None
@@ -0,0 +1,245 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from src.decision_engine.rules import RISK_LEVELS
+
+# ----------------------------
+# Configuration
+# ----------------------------
+# Rolling gauges cover the last TELEMETRY_WINDOW_S seconds, kept in slots
+TELEMETRY_WINDOW_S = int(os.environ.get("TELEMETRY_WINDOW_S", 300))
+TELEMETRY_SLOT_S = int(os.environ.get("TELEMETRY_SLOT_S", 10))
+
+PREFIX = "decisionpulse"
+# Prometheus histogram buckets for churn probability (le is inclusive)
+PROBABILITY_BUCKETS = np.round(np.linspace(0.1, 1.0, 10), 1)
+# Confident: in the first bucket (<= 0.1) or above 0.9, read off the histogram
+HIGH_CONFIDENCE_BUCKET = int(np.searchsorted(PROBABILITY_BUCKETS, 0.9)) + 1
+
+# Rolling window slot: [n, total, total_sq, confident, anomalies, checked]
+WINDOW_FIELDS = 6
+
+
+# ----------------------------
+# Per-thread shard
+# ----------------------------
+class _Shard:
+    """Counters written by exactly one thread, so updates need no lock"""
+
+    def __init__(self, n_features, n_slots):
+        self.predictions = {}
+        self.probability_total = 0.0
+        self.probability_total_sq = 0.0
+        self.confident = 0
+        self.probability_buckets = np.zeros(len(PROBABILITY_BUCKETS) + 1, dtype=np.int64)
+        self.risk_levels = np.zeros(len(RISK_LEVELS), dtype=np.int64)
+        self.anomalies = 0
+        self.anomaly_checks = 0
+        self.feature_n = np.zeros(n_features, dtype=np.int64)
+        self.feature_total = np.zeros(n_features)
+        self.feature_total_sq = np.zeros(n_features)
+        # Plain lists: per-call updates are scalar, and list item adds beat numpy's
+        self.window = [[0.0] * WINDOW_FIELDS for _ in range(n_slots)]
+        self.window_epoch = [-1] * n_slots
+
+
+# ----------------------------
+# Telemetry
+# ----------------------------
+class Telemetry:
+    """In-process aggregates of served predictions, rendered for Prometheus.
+
+    Every thread records into its own shard (numpy arrays it alone
+    writes); a scrape sums the shards. Recording takes no lock, and a
+    micro-batch or upload is recorded with one vectorized call.
+    """
+
+    def __init__(self, feature_cols, version="", window_s=TELEMETRY_WINDOW_S,
+                 slot_s=TELEMETRY_SLOT_S):
+        self.feature_cols = list(feature_cols)
+        self.version = version
+        self.slot_s = slot_s
+        self.n_slots = max(1, window_s // slot_s)
+        self._local = threading.local()
+        self._shards = []
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(len(self.feature_cols), self.n_slots)
+            self._shards.append(shard)  # list.append is atomic
+        return shard
+
+    # ----------------------------
+    # Recording (hot path)
+    # ----------------------------
+    def record(self, endpoint, probs, risk_codes=None, is_anomaly=None, X=None):
+        """Fold one batch of served predictions (and their inputs) in.
+
+        X is best passed as an ndarray; a DataFrame costs a conversion.
+        """
+        probs = np.asarray(probs, dtype=np.float64)
+        n = len(probs)
+        if n == 0:
+            return
+        shard = self._shard()
+
+        buckets = np.bincount(
+            np.searchsorted(PROBABILITY_BUCKETS, probs), minlength=len(PROBABILITY_BUCKETS) + 1
+        )
+        shard.probability_buckets += buckets
+        confident = int(buckets[0] + buckets[HIGH_CONFIDENCE_BUCKET:].sum())
+        total = float(probs.sum())
+        total_sq = float(probs @ probs)
+        shard.predictions[endpoint] = shard.predictions.get(endpoint, 0) + n
+        shard.probability_total += total
+        shard.probability_total_sq += total_sq
+        shard.confident += confident
+
+        if risk_codes is not None:
+            shard.risk_levels += np.bincount(risk_codes, minlength=len(RISK_LEVELS))
+
+        anomalies = checked = 0
+        if is_anomaly is not None:
+            anomalies = int(np.count_nonzero(is_anomaly))
+            checked = len(is_anomaly)
+            shard.anomalies += anomalies
+            shard.anomaly_checks += checked
+
+        if X is not None:
+            values = np.asarray(X, dtype=np.float64)
+            column_total = values.sum(axis=0)
+            if np.isnan(column_total).any():
+                present = ~np.isnan(values)
+                values = np.where(present, values, 0.0)
+                shard.feature_n += present.sum(axis=0)
+                column_total = values.sum(axis=0)
+            else:
+                shard.feature_n += n
+            shard.feature_total += column_total
+            shard.feature_total_sq += np.einsum("ij,ij->j", values, values)
+
+        epoch = int(time.monotonic() // self.slot_s)
+        slot = epoch % self.n_slots
+        if shard.window_epoch[slot] != epoch:
+            shard.window[slot] = [0.0] * WINDOW_FIELDS
+            shard.window_epoch[slot] = epoch
+        window = shard.window[slot]
+        window[0] += n
+        window[1] += total
+        window[2] += total_sq
+        window[3] += confident
+        window[4] += anomalies
+        window[5] += checked
+
+    # ----------------------------
+    # Scrape
+    # ----------------------------
+    def snapshot(self):
+        """Shard totals; a scrape racing a writer may miss its latest batch"""
+        shards = list(self._shards)
+        k = len(self.feature_cols)
+        totals = {
+            "predictions": {},
+            "probability_total": 0.0,
+            "probability_total_sq": 0.0,
+            "confident": 0,
+            "probability_buckets": np.zeros(len(PROBABILITY_BUCKETS) + 1, dtype=np.int64),
+            "risk_levels": np.zeros(len(RISK_LEVELS), dtype=np.int64),
+            "anomalies": 0,
+            "anomaly_checks": 0,
+            "feature_n": np.zeros(k, dtype=np.int64),
+            "feature_total": np.zeros(k),
+            "feature_total_sq": np.zeros(k),
+            "window": np.zeros(WINDOW_FIELDS),
+        }
+        oldest = int(time.monotonic() // self.slot_s) - self.n_slots
+        for shard in shards:
+            for endpoint, count in list(shard.predictions.items()):
+                totals["predictions"][endpoint] = totals["predictions"].get(endpoint, 0) + count
+            for name in ["probability_total", "probability_total_sq", "confident",
+                         "probability_buckets", "risk_levels", "anomalies",
+                         "anomaly_checks", "feature_n", "feature_total", "feature_total_sq"]:
+                totals[name] = totals[name] + getattr(shard, name)
+            for epoch, window in zip(list(shard.window_epoch), list(shard.window)):
+                if epoch > oldest:
+                    totals["window"] += window
+        return totals
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        snap = self.snapshot()
+        version = f'version="{self.version}"'
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join([version] + labels)
+                lines.append(f"{PREFIX}_{name}{suffix}{{{label_text}}} {format_value(value)}")
+
+        metric("predictions_total", "counter", "Churn predictions served", [
+            ("", [f'endpoint="{endpoint}"'], count)
+            for endpoint, count in sorted(snap["predictions"].items())
+        ])
+
+        n = int(snap["probability_buckets"].sum())
+        cumulative = np.cumsum(snap["probability_buckets"])
+        metric("churn_probability", "histogram", "Served churn probabilities", [
+            ("_bucket", [f'le="{edge:g}"'], cumulative[i])
+            for i, edge in enumerate(PROBABILITY_BUCKETS)
+        ] + [
+            ("_bucket", ['le="+Inf"'], n),
+            ("_sum", [], snap["probability_total"]),
+            ("_count", [], n),
+        ])
+
+        window_n, window_total, window_total_sq, window_confident, window_anomalies, \
+            window_checked = snap["window"]
+        window = [f'window="{self.n_slots * self.slot_s}s"']
+        mean = window_total / window_n if window_n else float("nan")
+        variance = window_total_sq / window_n - mean ** 2 if window_n else float("nan")
+        metric("mean_probability", "gauge", "Mean served churn probability (rolling)",
+               [("", window, mean)])
+        metric("std_probability", "gauge", "Std of served churn probability (rolling)",
+               [("", window, np.sqrt(max(variance, 0.0)) if window_n else variance)])
+        metric("high_confidence_rate", "gauge",
+               "Share of served probabilities at most 0.1 or above 0.9 (rolling)",
+               [("", window, window_confident / window_n if window_n else float("nan"))])
+        metric("anomaly_rate", "gauge", "Share of scored uploaded rows flagged anomalous (rolling)",
+               [("", window, window_anomalies / window_checked if window_checked else float("nan"))])
+
+        metric("risk_level_total", "counter", "Decisions served by risk level", [
+            ("", [f'level="{level}"'], count)
+            for level, count in zip(RISK_LEVELS, snap["risk_levels"])
+        ])
+        metric("anomalies_total", "counter", "Uploaded rows flagged anomalous",
+               [("", [], snap["anomalies"])])
+        metric("anomaly_checks_total", "counter", "Uploaded rows checked for anomalies",
+               [("", [], snap["anomaly_checks"])])
+
+        for name, key, help_text in [
+            ("feature_input_count", "feature_n", "Served feature values per feature"),
+            ("feature_input_sum", "feature_total", "Sum of served feature values"),
+            ("feature_input_sum_squares", "feature_total_sq", "Sum of squared served feature values"),
+        ]:
+            metric(name, "counter", help_text, [
+                ("", [f'feature="{feature}"'], value)
+                for feature, value in zip(self.feature_cols, snap[key])
+            ])
+
+        return "\n".join(lines) + "\n"
+
+
+def format_value(value):
+    """Sample value as Prometheus text (integers without a decimal point)"""
+    value = float(value)
+    if np.isnan(value):
+        return "NaN"
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from src.api.instrumentation import stage
+from src.api.shap_cache import compute_shap
+from src.api.validation import validate_features
+from src.decision_engine.rules import recommend_actions
+
+
+# ----------------------------
+# Validation
+# ----------------------------
+def validate_uploaded_data(df: pd.DataFrame, feature_cols: list):
+    """Single-pass validation; a 400 lists every violation found"""
+    _, violations = validate_features(df, feature_cols)
+    if violations:
+        raise HTTPException(status_code=400, detail=violations.report())
+
+
+def check_uploaded_frame(df: pd.DataFrame, feature_cols: list):
+    if df.empty:
+        raise HTTPException(status_code=400, detail="Uploaded CSV is empty")
+
+    required_cols = set(feature_cols + ["user_id"])
+    if not required_cols.issubset(df.columns):
+        missing = required_cols - set(df.columns)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing columns: {list(missing)}"
+        )
+
+    validate_uploaded_data(df, feature_cols)
+
+
+# ----------------------------
+# Scoring
+# ----------------------------
+def analyze_frame(df: pd.DataFrame, feature_cols: list, scorer, explainer, anomaly_model):
+    """Score, explain and decide every uploaded row; returns result columns"""
+    user_ids_upload = df["user_id"]
+    X_upload = df[feature_cols]
+
+    with stage("predict_proba"):
+        churn_probs = scorer.predict_proba(X_upload)[:, 1]
+
+    with stage("shap_values"):
+        shap_vals = compute_shap(explainer, X_upload)
+
+    with stage("decision_function"):
+        anomaly_scores = anomaly_model.decision_function(X_upload)
+
+    with stage("decision_rules"):
+        decisions = recommend_actions(churn_probs, X_upload, shap_vals)
+
+    return {
+        "user_id": user_ids_upload.to_numpy(dtype=np.int64).tolist(),
+        "churn_probability": churn_probs.tolist(),
+        "risk_level": decisions["risk_level"].tolist(),
+        "recommended_action": decisions["action"].tolist(),
+        "primary_reason": decisions["primary_reason"].tolist(),
+        "is_anomaly": (anomaly_scores < 0).tolist(),
+        "anomaly_score": anomaly_scores.tolist()
+    }
+
+
+def to_records(columns: dict):
+    """Zip result columns into per-row records"""
+    keys = list(columns)
+    with stage("result_loop"):
+        return [dict(zip(keys, values)) for values in zip(*columns.values())]
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# User index
+# ----------------------------
+# Dense lookup tables are used while user ids stay reasonably compact
+# (at most DENSE_FACTOR slots per user); otherwise fall back to a hashed index.
+DENSE_FACTOR = 4
+MISSING = -1
+
+
+class UserIndex:
+    """Prebuilt user_id -> row position lookup (single id or batch)"""
+
+    def __init__(self, user_ids):
+        ids = np.asarray(user_ids, dtype=np.int64)
+        self.size = len(ids)
+        self._table = None
+        self._index = None
+        self._rows = None
+
+        if self.size and ids.min() >= 0 and ids.max() < DENSE_FACTOR * self.size + 1024:
+            table = np.full(int(ids.max()) + 1, MISSING, dtype=np.int64)
+            # Reverse assignment keeps the first occurrence of duplicated ids
+            table[ids[::-1]] = np.arange(self.size - 1, -1, -1)
+            self._table = table
+        else:
+            # Keep the first occurrence of duplicated ids so lookups stay unique
+            _, first = np.unique(ids, return_index=True)
+            first.sort()
+            self._index = pd.Index(ids[first])
+            self._rows = first.astype(np.int64)
+
+    @classmethod
+    def from_table(cls, table, size):
+        """Index over a prebuilt dense table, e.g. memory-mapped from a bundle"""
+        index = cls.__new__(cls)
+        index.size = size
+        index._table = table
+        index._index = None
+        index._rows = None
+        return index
+
+    @property
+    def table(self):
+        """Dense id -> position table, None when the hashed index is used"""
+        return self._table
+
+    def __len__(self):
+        return self.size
+
+    def positions(self, user_ids):
+        """Row positions for a batch of ids, MISSING (-1) where unknown"""
+        ids = np.asarray(user_ids, dtype=np.int64).ravel()
+
+        if self._table is not None:
+            out = np.full(len(ids), MISSING, dtype=np.int64)
+            in_range = (ids >= 0) & (ids < len(self._table))
+            out[in_range] = self._table[ids[in_range]]
+            return out
+
+        loc = self._index.get_indexer(ids)
+        return np.where(loc >= 0, self._rows[loc], MISSING)
+
+    def position(self, user_id):
+        """Row position for a single id, None if unknown"""
+        if self._table is not None:
+            if 0 <= user_id < len(self._table):
+                pos = self._table[user_id]
+                return int(pos) if pos != MISSING else None
+            return None
+
+        try:
+            return int(self._rows[self._index.get_loc(user_id)])
+        except KeyError:
+            return None
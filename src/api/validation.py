@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# Rules
+# ----------------------------
+# Inclusive bounds; None means unbounded on that side
+RANGE_RULES = [
+    {
+        "column": "days_since_last_active",
+        "min": 0,
+        "max": None,
+        "message": "days_since_last_active cannot be negative",
+    },
+    {
+        "column": "sessions_per_day",
+        "min": 0,
+        "max": None,
+        "message": "sessions_per_day cannot be negative",
+    },
+    {
+        "column": "active_days_ratio",
+        "min": 0,
+        "max": 1,
+        "message": "active_days_ratio must be between 0 and 1",
+    },
+]
+
+# Rows per block: each block is checked while it is still in cache
+BLOCK_ROWS = 8_192
+SAMPLE_ROWS = 5
+
+FLOAT_MAX = np.finfo(np.float64).max
+
+
+class Violations:
+    """Per (rule, column) violation counts with a few sample row indices.
+
+    Rows are added as positions in the frame and reported as its index
+    labels, so chunks from read_csv(chunksize=...) report file rows.
+    """
+
+    def __init__(self, sample_rows=SAMPLE_ROWS, index=None):
+        self.sample_rows = sample_rows
+        self.index = index
+        self.entries = {}
+        self.invalid_rows = 0
+
+    def add(self, rule, column, message, rows):
+        entry = self.entries.setdefault((rule, column), {
+            "rule": rule,
+            "column": column,
+            "message": message,
+            "rows": 0,
+            "sample_rows": [],
+        })
+        entry["rows"] += len(rows)
+        room = self.sample_rows - len(entry["sample_rows"])
+        if room > 0:
+            sample = rows[:room]
+            if self.index is not None:
+                sample = self.index[sample]
+            entry["sample_rows"].extend(int(r) for r in sample)
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def to_list(self):
+        return list(self.entries.values())
+
+    def report(self):
+        violations = self.to_list()
+        return {
+            "message": violations[0]["message"] if violations else None,
+            "invalid_rows": self.invalid_rows,
+            "invalid_columns": sorted({v["column"] for v in violations}),
+            "violations": violations,
+        }
+
+
+# ----------------------------
+# Validation engine
+# ----------------------------
+def feature_matrix(df: pd.DataFrame, feature_cols: list, violations: Violations):
+    """One contiguous float64 copy of the features.
+
+    Cells of non-numeric columns that do not parse as numbers are reported
+    and replaced by 0 so they are not reported a second time as NaN.
+    Returns the matrix and the row indices flagged here.
+    """
+    flagged = []
+    for col in feature_cols:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            coerced = pd.to_numeric(df[col], errors="coerce")
+            unparsed = coerced.isna().to_numpy() & df[col].notna().to_numpy()
+            bad = np.flatnonzero(unparsed)
+            violations.add("numeric", col, f"Column '{col}' must be numeric", bad)
+            flagged.append(bad)
+            df = df.assign(**{col: coerced.mask(unparsed, 0)})
+
+    M = np.ascontiguousarray(df[feature_cols].to_numpy(dtype=np.float64))
+    return M, np.concatenate(flagged) if flagged else np.empty(0, dtype=np.intp)
+
+
+def range_bounds(feature_cols: list, rules=RANGE_RULES):
+    """Per-column inclusive bounds; unbounded sides still reject +/-inf and NaN"""
+    lo = np.full(len(feature_cols), -FLOAT_MAX)
+    hi = np.full(len(feature_cols), FLOAT_MAX)
+    messages = [None] * len(feature_cols)
+    for rule in rules:
+        if rule["column"] not in feature_cols:
+            continue
+        j = feature_cols.index(rule["column"])
+        if rule["min"] is not None:
+            lo[j] = rule["min"]
+        if rule["max"] is not None:
+            hi[j] = rule["max"]
+        messages[j] = rule["message"]
+    return lo, hi, messages
+
+
+def validate_features(df: pd.DataFrame, feature_cols: list, rules=RANGE_RULES,
+                      sample_rows=SAMPLE_ROWS):
+    """Check dtype, NaN, inf and range rules in one blocked pass.
+
+    Returns the float64 feature matrix and a Violations collection covering
+    every failing (rule, column) pair rather than only the first one.
+    """
+    violations = Violations(sample_rows, index=df.index)
+    M, flagged = feature_matrix(df, feature_cols, violations)
+    lo, hi, messages = range_bounds(feature_cols, rules)
+
+    bad_row_blocks = [flagged]
+    nan_cells, inf_cells, range_cells = [], [], []
+    for start in range(0, len(M), BLOCK_ROWS):
+        block = M[start:start + BLOCK_ROWS]
+        # NaN fails both comparisons, +/-inf falls outside +/-FLOAT_MAX
+        ok = (block >= lo) & (block <= hi)
+        if ok.all():
+            continue
+
+        rows, cols = np.nonzero(~ok)
+        values = block[rows, cols]
+        rows = rows + start
+        bad_row_blocks.append(rows)
+
+        is_nan = np.isnan(values)
+        is_inf = np.isinf(values)
+        nan_cells.append((rows[is_nan], cols[is_nan]))
+        inf_cells.append((rows[is_inf], cols[is_inf]))
+        in_range = ~(is_nan | is_inf)
+        range_cells.append((rows[in_range], cols[in_range]))
+
+    def record(cells, rule, column_order, message_for):
+        if not cells:
+            return
+        rows = np.concatenate([r for r, _ in cells])
+        cols = np.concatenate([c for _, c in cells])
+        for j in column_order:
+            hits = rows[cols == j]
+            if len(hits):
+                violations.add(rule, feature_cols[j], message_for(j), hits)
+
+    all_cols = range(len(feature_cols))
+    # Range violations are reported in rule order
+    rule_cols = list(dict.fromkeys(
+        feature_cols.index(r["column"]) for r in rules if r["column"] in feature_cols
+    ))
+    record(nan_cells, "nan", all_cols, lambda j: "Uploaded data contains NaN values")
+    record(inf_cells, "inf", all_cols, lambda j: "Uploaded data contains infinite values")
+    record(range_cells, "range", rule_cols, lambda j: messages[j])
+
+    violations.invalid_rows = len(np.unique(np.concatenate(bad_row_blocks)))
+    return M, violations
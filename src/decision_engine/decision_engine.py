@@ -1,6 +1,11 @@
 import pandas as pd
+import numpy as np
 import joblib
-import shap
+
+from src.explainability.tree_shap import load_explainer
+from src.models.compiled_gb import load_scorer
+from src.features.feature_store import load_features
+from src.decision_engine.rules import ACTIONS, recommend_actions
 
 # ----------------------------
 # Paths
@@ -11,8 +16,9 @@ MODEL_PATH = "models/gb_model.pkl"
 # ----------------------------
 # Load artifacts
 # ----------------------------
-features = pd.read_csv(FEATURES_PATH)
+features = load_features(FEATURES_PATH)
 model = joblib.load(MODEL_PATH)
+scorer = load_scorer(model)
 
 user_ids = features["user_id"]
 X = features.drop(columns=["user_id"])
@@ -20,47 +26,30 @@ X = features.drop(columns=["user_id"])
 # ----------------------------
 # Predict churn probability
 # ----------------------------
-churn_probs = model.predict_proba(X)[:, 1]
-features["churn_probability"] = churn_probs
+churn_probs = scorer.predict_proba(X)[:, 1]
 
 # ----------------------------
 # SHAP for explanation drivers
 # ----------------------------
-explainer = shap.TreeExplainer(model)
+explainer = load_explainer(model)
 shap_values = explainer.shap_values(X)
 
 # ----------------------------
-# Decision Logic
-# ----------------------------
-def recommend_action(row, shap_row):
-    top_driver = shap_row.abs().idxmax()
-
-    if row["churn_probability"] >= 0.8 and row["days_since_last_active"] >= 10:
-        return "CRITICAL: Send re-engagement email + push notification", top_driver
-
-    elif row["churn_probability"] >= 0.6 and row["session_trend_ratio"] < 0.7:
-        return "AT RISK: Show feature discovery nudge", top_driver
-
-    else:
-        return "HEALTHY: No action required", top_driver
-
-
-# ----------------------------
-# Apply decisions
+# Apply decisions (vectorized)
 # ----------------------------
-decisions = []
+# Report labels keep their historical spelling, indexed by risk code
+REPORT_LABELS = np.array(["HEALTHY", "AT RISK", "CRITICAL"], dtype=object)
+REPORT_ACTIONS = REPORT_LABELS + ": " + ACTIONS
 
-for i, row in features.iterrows():
-    action, driver = recommend_action(row, pd.Series(shap_values[i], index=X.columns))
-    decisions.append({
-        "user_id": row["user_id"],
-        "churn_probability": row["churn_probability"],
-        "risk_level": action.split(":")[0],
-        "recommended_action": action,
-        "primary_reason": driver
-    })
+decisions = recommend_actions(churn_probs, X, shap_values)
 
-decision_df = pd.DataFrame(decisions)
+decision_df = pd.DataFrame({
+    "user_id": user_ids,
+    "churn_probability": churn_probs,
+    "risk_level": REPORT_LABELS[decisions["risk_code"]],
+    "recommended_action": REPORT_ACTIONS[decisions["risk_code"]],
+    "primary_reason": decisions["primary_reason"]
+})
 
 decision_df.to_csv("reports/user_decisions.csv", index=False)
 
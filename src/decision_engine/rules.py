@@ -0,0 +1,59 @@
+import numpy as np
+
+# ----------------------------
+# Decision thresholds
+# ----------------------------
+CRITICAL_PROBABILITY = 0.8
+CRITICAL_INACTIVE_DAYS = 10
+AT_RISK_PROBABILITY = 0.6
+AT_RISK_TREND_RATIO = 0.7
+
+HEALTHY, AT_RISK, CRITICAL = 0, 1, 2
+
+# Indexed by risk code; object arrays so results convert to plain str lists
+RISK_LEVELS = np.array(["HEALTHY", "AT_RISK", "CRITICAL"], dtype=object)
+ACTIONS = np.array([
+    "No action required",
+    "Show feature discovery nudge",
+    "Send re-engagement email + push notification",
+], dtype=object)
+
+
+# ----------------------------
+# Vectorized decision logic
+# ----------------------------
+def risk_codes(churn_probs, days_since_last_active, session_trend_ratio):
+    """Risk code per row; CRITICAL takes precedence over AT_RISK"""
+    churn_probs = np.asarray(churn_probs)
+    codes = np.full(len(churn_probs), HEALTHY, dtype=np.int8)
+
+    at_risk = (churn_probs >= AT_RISK_PROBABILITY) & (
+        np.asarray(session_trend_ratio) < AT_RISK_TREND_RATIO
+    )
+    critical = (churn_probs >= CRITICAL_PROBABILITY) & (
+        np.asarray(days_since_last_active) >= CRITICAL_INACTIVE_DAYS
+    )
+    codes[at_risk] = AT_RISK
+    codes[critical] = CRITICAL
+    return codes
+
+
+def top_drivers(shap_vals, feature_names):
+    """Feature with the largest absolute SHAP value per row (first on ties)"""
+    names = np.asarray(feature_names, dtype=object)
+    return names[np.abs(np.asarray(shap_vals)).argmax(axis=1)]
+
+
+def recommend_actions(churn_probs, X, shap_vals):
+    """Risk level, action and primary reason for every row of X, as columns"""
+    codes = risk_codes(
+        churn_probs,
+        X["days_since_last_active"].to_numpy(),
+        X["session_trend_ratio"].to_numpy(),
+    )
+    return {
+        "risk_code": codes,
+        "risk_level": RISK_LEVELS[codes],
+        "action": ACTIONS[codes],
+        "primary_reason": top_drivers(shap_vals, X.columns),
+    }
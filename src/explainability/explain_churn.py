@@ -1,8 +1,10 @@
 import pandas as pd
-import shap
 import joblib
 import os
 
+from src.explainability.tree_shap import load_explainer, top_k_columns
+from src.features.feature_store import load_features
+
 # ----------------------------
 # Paths
 # ----------------------------
@@ -14,7 +16,7 @@ SCALER_PATH = "models/scaler.pkl"
 # ----------------------------
 # Load data
 # ----------------------------
-X = pd.read_csv(FEATURES_PATH)
+X = load_features(FEATURES_PATH)
 y = pd.read_csv(LABELS_PATH)
 
 data = X.merge(y, on="user_id")
@@ -30,7 +32,8 @@ model = joblib.load(MODEL_PATH)
 # ----------------------------
 # SHAP Explainer
 # ----------------------------
-explainer = shap.TreeExplainer(model)
+# Compiled tree SHAP (same values as shap.TreeExplainer) when the model allows
+explainer = load_explainer(model)
 shap_values = explainer.shap_values(X_model)
 
 # ----------------------------
@@ -52,12 +55,8 @@ print("✅ Global feature importance saved")
 def explain_user(user_id, top_n=5):
     idx = user_ids[user_ids == user_id].index[0]
 
-    user_shap = pd.Series(
-        shap_values[idx],
-        index=X_model.columns
-    ).sort_values(key=abs, ascending=False)
-
-    explanation = user_shap.head(top_n)
+    features, values = top_k_columns(shap_values[[idx]], top_n)
+    explanation = pd.Series(values[0], index=X_model.columns[features[0]])
 
     return explanation
 
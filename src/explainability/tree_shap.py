@@ -0,0 +1,219 @@
+import itertools
+import math
+
+import numpy as np
+
+from src.models.compiled_gb import CompiledGB
+
+# ----------------------------
+# Configuration
+# ----------------------------
+# Rows explained per block: a block's leaf codes plus its SHAP rows stay small
+BLOCK_ROWS = 8192
+N_CODES = 2 ** CompiledGB.N_INTERNAL
+
+
+def top_k_columns(values, k):
+    """Top k columns per row by |value|, as (column indices, signed values).
+
+    Ordered by decreasing magnitude, lower column first on ties, the same
+    as a stable sort of the full row (so column 0 agrees with argmax).
+    """
+    values = np.asarray(values)
+    k = min(k, values.shape[1])
+    magnitude = np.abs(values)
+    if k < values.shape[1]:
+        idx = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+        # argpartition picks any of the columns tied with the k-th magnitude;
+        # redo those rows with a stable sort
+        kth = np.take_along_axis(magnitude, idx, axis=1).min(axis=1, keepdims=True)
+        tied = (magnitude >= kth).sum(axis=1) > k
+        if tied.any():
+            idx[tied] = np.argsort(-magnitude[tied], axis=1, kind="stable")[:, :k]
+        idx.sort(axis=1)
+    else:
+        idx = np.tile(np.arange(values.shape[1]), (len(values), 1))
+    order = np.argsort(-np.take_along_axis(magnitude, idx, axis=1), axis=1, kind="stable")
+    idx = np.take_along_axis(idx, order, axis=1)
+    return idx, np.take_along_axis(values, idx, axis=1)
+
+
+# ----------------------------
+# Compiled tree SHAP
+# ----------------------------
+class CompiledTreeShap:
+    """Exact tree SHAP values for a model CompiledGB supports.
+
+    In a depth-3 tree, the 7-bit split-outcome code from
+    CompiledGB.leaf_codes fixes a row's path through the tree, and with it
+    the tree's SHAP vector. So each tree's vector is tabulated once per
+    code, and explaining a batch is one table lookup and add per tree.
+    The tables use the path-dependent TreeSHAP value function: cover
+    fractions for absent features, split indicators for present ones.
+    Values match shap.TreeExplainer(model).shap_values (raw log-odds) up to
+    floating-point rounding.
+    """
+
+    def __init__(self, scorer, phi_table, expected_value):
+        self.scorer = scorer                # CompiledGB: leaf codes and column order
+        self.phi_table = phi_table          # (n_trees, N_CODES, n_features) float64
+        self.expected_value = expected_value
+        self._flat_table = phi_table.reshape(-1, phi_table.shape[2])
+        self._table_offsets = (np.arange(scorer.n_trees) * N_CODES)[:, None]
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Raises ValueError for models CompiledGB cannot compile"""
+        scorer = CompiledGB.from_sklearn(model)
+        trees = [est.tree_ for est in model.estimators_[:, 0]]
+
+        # Bit s of a code is "went right" at level-order slot s
+        bits = (np.arange(N_CODES)[:, None] >> np.arange(CompiledGB.N_INTERNAL)) & 1
+        phi_table = np.zeros((len(trees), N_CODES, model.n_features_in_))
+        expected_value = scorer.init_raw
+        for t, tree in enumerate(trees):
+            feature, cover, value = _complete_tree(tree, model.learning_rate)
+            expected_value += _tabulate_tree(feature, cover, value, bits, phi_table[t])
+        return cls(scorer, phi_table, expected_value)
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def save(self, path):
+        """Tables only; the scorer is saved on its own (CompiledGB.save)"""
+        with open(path, "wb") as f:
+            np.savez(f, phi_table=self.phi_table, expected_value=np.float64(self.expected_value))
+
+    @classmethod
+    def load(cls, path, scorer):
+        with np.load(path) as data:
+            return cls(scorer, data["phi_table"], float(data["expected_value"]))
+
+    # ----------------------------
+    # Explanations
+    # ----------------------------
+    def _block_values(self, Xb):
+        codes = self.scorer.leaf_codes(Xb).astype(np.intp) + self._table_offsets
+        values = self._flat_table[codes[0]]
+        for tree_codes in codes[1:]:
+            values += self._flat_table[tree_codes]
+        return values
+
+    def shap_values(self, X):
+        """(n_rows, n_features) SHAP values, like TreeExplainer.shap_values"""
+        Xm = self.scorer.as_matrix(X)
+        values = np.empty((len(Xm), self.phi_table.shape[2]))
+        for start in range(0, len(Xm), BLOCK_ROWS):
+            values[start:start + BLOCK_ROWS] = self._block_values(Xm[start:start + BLOCK_ROWS])
+        return values
+
+    def top_k(self, X, k=5):
+        """Top-k drivers per row as (feature indices, signed SHAP values).
+
+        Only the (n_rows, k) results are kept, block by block.
+        """
+        Xm = self.scorer.as_matrix(X)
+        k = min(k, self.phi_table.shape[2])
+        idx = np.empty((len(Xm), k), dtype=np.intp)
+        values = np.empty((len(Xm), k))
+        for start in range(0, len(Xm), BLOCK_ROWS):
+            block = slice(start, start + BLOCK_ROWS)
+            idx[block], values[block] = top_k_columns(self._block_values(Xm[block]), k)
+        return idx, values
+
+
+def _complete_tree(tree, learning_rate):
+    """Heap-ordered depth-3 arrays: split feature per internal node (-1 for
+    padding under a shallow leaf), and cover and scaled value per node.
+
+    Padding sends every row left, so a padded left child keeps its parent's
+    cover and a padded right child has none.
+    """
+    from sklearn.tree._tree import TREE_LEAF
+
+    n_internal = CompiledGB.N_INTERNAL
+    feature = np.full(n_internal, -1, dtype=np.intp)
+    cover = np.zeros(2 * n_internal + 1)
+    value = np.zeros(2 * n_internal + 1)
+
+    stack = [(0, 0)]  # (sklearn node or None for padding, heap slot)
+    cover[0] = tree.weighted_n_node_samples[0]
+    value[0] = learning_rate * tree.value[0, 0, 0]
+    while stack:
+        node, slot = stack.pop()
+        if slot >= n_internal:
+            continue
+        left, right = 2 * slot + 1, 2 * slot + 2
+        if node is None or tree.children_left[node] == TREE_LEAF:
+            cover[left] = cover[slot]
+            value[left] = value[right] = value[slot]
+            stack += [(None, left), (None, right)]
+            continue
+        feature[slot] = tree.feature[node]
+        for child_slot, child in [(left, tree.children_left[node]), (right, tree.children_right[node])]:
+            cover[child_slot] = tree.weighted_n_node_samples[child]
+            value[child_slot] = learning_rate * tree.value[child, 0, 0]
+            stack.append((child, child_slot))
+    return feature, cover, value
+
+
+def _tabulate_tree(feature, cover, value, bits, phi):
+    """Fill phi (codes x features) with one tree's SHAP vectors; returns the
+    tree's expected value.
+
+    Per leaf, the value function is a product over the path's distinct
+    features of a one fraction (the row goes this way) when the feature is
+    present and a zero fraction (share of cover going this way) when not;
+    its Shapley values are summed over the leaf's at most 3 features.
+    """
+    depth = CompiledGB.MAX_DEPTH
+    expected = 0.0
+    for leaf in range(2 ** depth):
+        path, slot = [], 0
+        for level in range(depth):
+            direction = (leaf >> (depth - 1 - level)) & 1
+            path.append((slot, direction))
+            slot = 2 * slot + 1 + direction
+        if cover[slot] == 0:
+            continue  # padding: no row reaches it
+        leaf_value = value[slot]
+
+        one, zero, reach = {}, {}, 1.0
+        for node, direction in path:
+            child = 2 * node + 1 + direction
+            zero_fraction = cover[child] / cover[node]
+            reach *= zero_fraction
+            if feature[node] < 0:
+                continue  # padding: always taken, neutral for every feature
+            f = feature[node]
+            one[f] = one.get(f, 1.0) * (bits[:, node] == direction)
+            zero[f] = zero.get(f, 1.0) * zero_fraction
+        expected += leaf_value * reach
+
+        players = list(one)
+        m = len(players)
+        for i in players:
+            others = [j for j in players if j != i]
+            weighted = np.zeros(len(bits))
+            for size in range(m):
+                weight = math.factorial(size) * math.factorial(m - size - 1) / math.factorial(m)
+                for present in itertools.combinations(others, size):
+                    term = np.full(len(bits), weight)
+                    for j in others:
+                        term = term * (one[j] if j in present else zero[j])
+                    weighted += term
+            phi[:, i] += leaf_value * (one[i] - zero[i]) * weighted
+    return expected
+
+
+def compile_explainer(model):
+    return CompiledTreeShap.from_sklearn(model)
+
+
+def load_explainer(model):
+    """Compiled tree SHAP when the model supports it, else shap.TreeExplainer"""
+    try:
+        return compile_explainer(model)
+    except ValueError:
+        import shap
+        return shap.TreeExplainer(model)
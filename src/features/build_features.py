@@ -1,121 +1,173 @@
 import pandas as pd
 import numpy as np
-from scipy.stats import entropy
+from scipy.special import entr
+
+from src.features.feature_store import FEATURES_CSV_PATH, write_feature_store
+from src.ingestion.event_schema import EVENT_DTYPES, day_index
 
 # ----------------------------
 # Load data
 # ----------------------------
 def load_events(path="data/raw/events.csv"):
-    df = pd.read_csv(path, parse_dates=["event_time"])
+    """Events in the compact schema (see src.ingestion.event_schema)"""
+    df = pd.read_csv(path, dtype=EVENT_DTYPES, parse_dates=["event_time"])
     return df
 
 
+# ----------------------------
+# Aggregation stages
+# ----------------------------
+# Only these event types count as activity
+ACTIVITY_EVENTS = ["login", "feature_use"]
+
+
+def activity_events(events: pd.DataFrame):
+    """Activity rows with their integer day index (adds a day column to events)"""
+    events["day"] = day_index(events["event_time"])
+    return events[events["event_type"].isin(ACTIVITY_EVENTS)]
+
+
+def daily_sessions(activity: pd.DataFrame):
+    """One row per (user, day): event count and mean session duration"""
+    # Durations may be stored as float32; means are taken in float64
+    durations = activity["session_duration"].astype(np.float64)
+    return durations.groupby([activity["user_id"], activity["day"]]).agg(
+        daily_sessions="size",
+        avg_session_duration="mean"
+    ).reset_index()
+
+
+def count_features(activity: pd.DataFrame):
+    """One row per (user, feature_name) with its usage count, names sorted"""
+    counts = (
+        activity
+        .dropna(subset=["feature_name"])
+        .groupby(["user_id", "feature_name"], observed=True)
+        .size()
+        .reset_index(name="count")
+    )
+    # Category order need not be name order; entropy sums in name order
+    counts["feature_name"] = counts["feature_name"].astype(object)
+    return counts.sort_values(["user_id", "feature_name"], ignore_index=True)
+
+
 # ----------------------------
 # Core Feature Builder
 # ----------------------------
 def build_user_features(events: pd.DataFrame):
-    events["date"] = events["event_time"].dt.date
+    activity = activity_events(events)
+    return features_from_aggregates(daily_sessions(activity), count_features(activity))
 
-    # Filter only meaningful activity
-    activity = events[events["event_type"].isin(["login", "feature_use"])]
 
-    # ----------------------------
-    # Session-level features
-    # ----------------------------
-    sessions = activity.groupby(["user_id", "date"]).agg(
-        daily_sessions=("event_type", "count"),
-        avg_session_duration=("session_duration", "mean")
-    ).reset_index()
+def features_from_aggregates(sessions: pd.DataFrame, feature_counts: pd.DataFrame,
+                             observation_days=None, max_day=None):
+    """User features from the per-(user, day) and per-(user, feature) tables.
+
+    observation_days and max_day default to the values seen in sessions;
+    pass the global ones when sessions covers only some of the users.
+    """
+    user_agg = (
+        user_aggregates(sessions, observation_days)
+        .merge(recency(sessions, max_day), on="user_id", how="left")
+        .merge(trends(sessions, max_day), on="user_id", how="left")
+        .merge(feature_diversity(feature_counts), on="user_id", how="left")
+    )
 
     # ----------------------------
-    # User aggregates
+    # Cleanup
     # ----------------------------
+    user_agg.fillna(0, inplace=True)
+    user_agg["user_id"] = user_agg["user_id"].astype(np.int64)
+
+    return user_agg
+
+
+# ----------------------------
+# User aggregates
+# ----------------------------
+def user_aggregates(sessions: pd.DataFrame, observation_days=None):
     user_agg = sessions.groupby("user_id").agg(
         total_sessions=("daily_sessions", "sum"),
         avg_session_duration=("avg_session_duration", "mean"),
-        active_days=("date", "nunique"),
+        active_days=("day", "nunique"),
         daily_activity_std=("daily_sessions", "std")
     ).reset_index()
 
-    observation_days = sessions["date"].nunique()
+    if observation_days is None:
+        observation_days = sessions["day"].nunique()
     user_agg["sessions_per_day"] = user_agg["total_sessions"] / observation_days
     user_agg["active_days_ratio"] = user_agg["active_days"] / observation_days
+    return user_agg
 
-    # ----------------------------
-    # Recency
-    # ----------------------------
-    last_active = sessions.groupby("user_id")["date"].max().reset_index()
-    max_date = sessions["date"].max()
 
-    last_active["days_since_last_active"] = (
-        pd.to_datetime(max_date) - pd.to_datetime(last_active["date"])
-    ).dt.days
+# ----------------------------
+# Recency
+# ----------------------------
+def recency(sessions: pd.DataFrame, max_day=None):
+    last_active = sessions.groupby("user_id")["day"].max().reset_index()
+    if max_day is None:
+        max_day = sessions["day"].max()
 
-    user_agg = user_agg.merge(
-        last_active[["user_id", "days_since_last_active"]],
-        on="user_id",
-        how="left"
+    last_active["days_since_last_active"] = (
+        max_day - last_active["day"].astype(np.int64)
     )
+    return last_active[["user_id", "days_since_last_active"]]
 
-    # ----------------------------
-    # Trend features (last 7d vs prev 7d)
-    # ----------------------------
-    sessions["date"] = pd.to_datetime(sessions["date"])
-    cutoff = sessions["date"].max() - pd.Timedelta(days=7)
 
-    last_7d = sessions[sessions["date"] >= cutoff]
-    prev_7d = sessions[sessions["date"] < cutoff]
+# ----------------------------
+# Trend features (last 7d vs prev 7d)
+# ----------------------------
+def trends(sessions: pd.DataFrame, max_day=None):
+    days = sessions["day"]
+    if max_day is None:
+        max_day = days.max()
+    cutoff = max_day - 7
+
+    last_7d = sessions[days >= cutoff]
+    prev_7d = sessions[days < cutoff]
 
     last_7d_agg = last_7d.groupby("user_id")["daily_sessions"].sum().rename("sessions_last_7d")
     prev_7d_agg = prev_7d.groupby("user_id")["daily_sessions"].sum().rename("sessions_prev_7d")
 
-    trends = pd.concat([last_7d_agg, prev_7d_agg], axis=1).fillna(0)
-    trends["session_trend_ratio"] = (
-        trends["sessions_last_7d"] / (trends["sessions_prev_7d"] + 1)
-    )
-
-    user_agg = user_agg.merge(trends, on="user_id", how="left")
-
-    # ----------------------------
-    # Feature diversity & entropy
-    # ----------------------------
-    feature_usage = activity.dropna(subset=["feature_name"])
-
-    feature_counts = (
-        feature_usage
-        .groupby(["user_id", "feature_name"])
-        .size()
-        .reset_index(name="count")
-    )
-
-    feature_entropy = (
-        feature_counts
-        .groupby("user_id")
-        .apply(lambda x: entropy(x["count"]))
-        .rename("feature_entropy")
-        .reset_index()
+    user_trends = pd.concat([last_7d_agg, prev_7d_agg], axis=1).fillna(0)
+    user_trends["session_trend_ratio"] = (
+        user_trends["sessions_last_7d"] / (user_trends["sessions_prev_7d"] + 1)
     )
+    return user_trends
 
-    unique_features = (
-        feature_counts
-        .groupby("user_id")["feature_name"]
-        .nunique()
-        .rename("unique_features_used")
-        .reset_index()
-    )
 
-    user_agg = (
-        user_agg
-        .merge(feature_entropy, on="user_id", how="left")
-        .merge(unique_features, on="user_id", how="left")
+# ----------------------------
+# Feature diversity & entropy
+# ----------------------------
+def feature_diversity(feature_counts: pd.DataFrame):
+    """Shannon entropy of each user's feature usage and the features used.
+
+    Bit-for-bit equal to scipy.stats.entropy per user: users are grouped by
+    the number of features they used and each group is reduced as one
+    (users x features) matrix, which sums every row in the same order as
+    entropy() sums a single user's probabilities.
+    """
+    if not feature_counts["user_id"].is_monotonic_increasing:
+        feature_counts = feature_counts.sort_values("user_id", kind="stable")
+
+    user_ids, starts, used = np.unique(
+        feature_counts["user_id"].to_numpy(), return_index=True, return_counts=True
     )
+    feature_entropy = np.zeros(len(user_ids))
+    if len(user_ids):
+        counts = feature_counts["count"].to_numpy(dtype=np.float64)
+        totals = np.add.reduceat(counts, starts)
+        terms = entr(counts / np.repeat(totals, used))
 
-    # ----------------------------
-    # Cleanup
-    # ----------------------------
-    user_agg.fillna(0, inplace=True)
+        for k in np.unique(used):
+            users = np.flatnonzero(used == k)
+            feature_entropy[users] = terms[starts[users, None] + np.arange(k)].sum(axis=1)
 
-    return user_agg
+    return pd.DataFrame({
+        "user_id": user_ids,
+        "feature_entropy": feature_entropy,
+        "unique_features_used": used.astype(np.int64),
+    })
 
 
 # ----------------------------
@@ -125,6 +177,8 @@ if __name__ == "__main__":
     events = load_events()
     features = build_user_features(events)
 
-    features.to_csv("data/processed/user_features.csv", index=False)
+    features.to_csv(FEATURES_CSV_PATH, index=False)
+    # Binary copy is written after the CSV so it records the CSV's stamp
+    write_feature_store(features)
     print("✅ Feature engineering complete")
     print(features.head())
@@ -0,0 +1,106 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.features.build_features import (
+    activity_events,
+    count_features,
+    features_from_aggregates,
+)
+from src.features.feature_store import FEATURES_CSV_PATH, write_feature_store
+from src.ingestion.event_schema import EVENT_DTYPES
+
+# ----------------------------
+# Configuration
+# ----------------------------
+EVENTS_PATH = "data/raw/events.csv"
+CHUNK_ROWS = int(os.environ.get("FEATURE_CHUNK_ROWS", 1_000_000))
+
+EVENT_COLUMNS = ["user_id", "event_time", "event_type", "session_duration", "feature_name"]
+
+DAY_KEYS = ["user_id", "day"]
+FEATURE_KEYS = ["user_id", "feature_name"]
+
+
+# ----------------------------
+# Partial aggregates
+# ----------------------------
+# A partial is a pair of sum-mergeable tables: per (user, day) the event
+# count plus the sum and count of non-null durations, and per (user,
+# feature) the usage count. Their size depends on users and active days,
+# never on the number of events reduced into them.
+def reduce_chunk(chunk: pd.DataFrame):
+    activity = activity_events(chunk)
+    duration = activity["session_duration"].astype(np.float64)
+
+    days = (
+        pd.DataFrame({
+            "user_id": activity["user_id"],
+            "day": activity["day"],
+            "daily_sessions": 1,
+            "duration_sum": duration.fillna(0),
+            "duration_count": duration.notna().astype("int64"),
+        })
+        .groupby(DAY_KEYS)
+        .sum()
+    )
+    features = count_features(activity).set_index(FEATURE_KEYS)
+    return days, features
+
+
+def merge_partials(partials):
+    """Sum a list of partials into one"""
+    days = pd.concat([d for d, _ in partials]).groupby(level=DAY_KEYS).sum()
+    features = pd.concat([f for _, f in partials]).groupby(level=FEATURE_KEYS).sum()
+    return days, features
+
+
+def finalize(partial):
+    """User features from a fully merged partial"""
+    days, features = partial
+    sessions = days.reset_index()
+    # Mean of a day's durations, NaN when none were recorded (as .mean())
+    sessions["avg_session_duration"] = (
+        sessions["duration_sum"] / sessions["duration_count"].where(sessions["duration_count"] > 0)
+    )
+    sessions = sessions[["user_id", "day", "daily_sessions", "avg_session_duration"]]
+    return features_from_aggregates(sessions, features.reset_index())
+
+
+# ----------------------------
+# Streaming builder
+# ----------------------------
+def build_user_features_chunked(path=EVENTS_PATH, chunk_rows=CHUNK_ROWS):
+    """build_user_features over an event log read chunk by chunk.
+
+    Integer features match the in-memory build exactly. Daily duration
+    means are merged as sums and counts, so float features can differ
+    from it in the last bits when a user's day spans chunks.
+    """
+    merged = None
+    reader = pd.read_csv(
+        path, usecols=EVENT_COLUMNS, dtype=EVENT_DTYPES, parse_dates=["event_time"],
+        chunksize=chunk_rows
+    )
+    for chunk in reader:
+        partial = reduce_chunk(chunk)
+        # Folding each chunk in right away keeps one partial alive at a time
+        merged = partial if merged is None else merge_partials([merged, partial])
+
+    if merged is None:
+        raise ValueError(f"{path} contains no events")
+    return finalize(merged)
+
+
+# ----------------------------
+# Run pipeline
+# ----------------------------
+if __name__ == "__main__":
+    features = build_user_features_chunked(sys.argv[1] if len(sys.argv) > 1 else EVENTS_PATH)
+
+    features.to_csv(FEATURES_CSV_PATH, index=False)
+    write_feature_store(features)
+    print("✅ Chunked feature engineering complete")
+    print(features.head())
@@ -0,0 +1,124 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# Paths
+# ----------------------------
+FEATURES_CSV_PATH = "data/processed/user_features.csv"
+FEATURE_STORE_DIR = "data/processed/user_features"
+
+SCHEMA_FILE = "schema.json"
+USER_IDS_FILE = "user_id.npy"
+MATRIX_FILE = "features.npy"
+STORE_VERSION = 1
+
+
+# ----------------------------
+# Binary columnar store
+# ----------------------------
+# Layout: user ids as an int64 vector and every feature column in one
+# C-ordered float64 matrix, plus a JSON schema sidecar. Both .npy files load
+# memory-mapped, and the matrix backs the feature DataFrame without a copy.
+def _csv_stamp(csv_path):
+    if not os.path.exists(csv_path):
+        return None
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_feature_store(features: pd.DataFrame, store_dir=FEATURE_STORE_DIR,
+                        csv_path=FEATURES_CSV_PATH):
+    """Write user features in the binary layout; the schema is written last"""
+    os.makedirs(store_dir, exist_ok=True)
+    columns = [c for c in features.columns if c != "user_id"]
+
+    np.save(
+        os.path.join(store_dir, USER_IDS_FILE),
+        features["user_id"].to_numpy(dtype=np.int64)
+    )
+    np.save(
+        os.path.join(store_dir, MATRIX_FILE),
+        np.ascontiguousarray(features[columns].to_numpy(dtype=np.float64))
+    )
+
+    schema = {
+        "version": STORE_VERSION,
+        "rows": len(features),
+        "columns": columns,
+        "dtypes": {c: str(features[c].dtype) for c in columns},
+        # Lets readers detect a CSV rewritten after this store was built
+        "csv": _csv_stamp(csv_path),
+    }
+    schema_path = os.path.join(store_dir, SCHEMA_FILE)
+    with open(f"{schema_path}.tmp", "w") as f:
+        json.dump(schema, f, indent=2)
+    os.replace(f"{schema_path}.tmp", schema_path)
+    return schema
+
+
+def read_schema(store_dir=FEATURE_STORE_DIR):
+    path = os.path.join(store_dir, SCHEMA_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        schema = json.load(f)
+    return schema if schema.get("version") == STORE_VERSION else None
+
+
+def store_is_current(store_dir=FEATURE_STORE_DIR, csv_path=FEATURES_CSV_PATH):
+    """Binary store exists and the CSV has not changed since it was written"""
+    schema = read_schema(store_dir)
+    if schema is None:
+        return False
+    stamp = _csv_stamp(csv_path)
+    return stamp is None or stamp == schema.get("csv")
+
+
+def feature_source(store_dir=FEATURE_STORE_DIR, csv_path=FEATURES_CSV_PATH):
+    """File that versions the features actually served (for cache keys)"""
+    if store_is_current(store_dir, csv_path):
+        return os.path.join(store_dir, SCHEMA_FILE)
+    return csv_path
+
+
+# ----------------------------
+# Loaders
+# ----------------------------
+def load_feature_matrix(csv_path=FEATURES_CSV_PATH, store_dir=FEATURE_STORE_DIR,
+                        mmap=True):
+    """(user_ids ndarray, feature DataFrame X), preferring the binary store.
+
+    With the store, X is a zero-copy, read-only view of the memory-mapped
+    matrix. Otherwise the CSV is parsed as before.
+    """
+    if store_is_current(store_dir, csv_path):
+        schema = read_schema(store_dir)
+        mode = "r" if mmap else None
+        user_ids = np.load(os.path.join(store_dir, USER_IDS_FILE), mmap_mode=mode)
+        matrix = np.load(os.path.join(store_dir, MATRIX_FILE), mmap_mode=mode)
+        X = pd.DataFrame(matrix, columns=schema["columns"], copy=False)
+        return user_ids, X
+
+    features = pd.read_csv(csv_path)
+    return features["user_id"].to_numpy(), features.drop(columns=["user_id"])
+
+
+def load_features(csv_path=FEATURES_CSV_PATH, store_dir=FEATURE_STORE_DIR, mmap=True):
+    """Full feature table with its user_id column, preferring the binary store"""
+    user_ids, X = load_feature_matrix(csv_path, store_dir, mmap)
+    features = X.copy(deep=False)
+    features.insert(0, "user_id", user_ids)
+    return features
+
+
+# ----------------------------
+# Convert an existing CSV
+# ----------------------------
+if __name__ == "__main__":
+    features = pd.read_csv(FEATURES_CSV_PATH)
+    schema = write_feature_store(features)
+    print(f"✅ Feature store written to {FEATURE_STORE_DIR}")
+    print(f"{schema['rows']} users x {len(schema['columns'])} features")
@@ -0,0 +1,160 @@
+import glob
+import os
+import sys
+
+import pandas as pd
+
+from src.features.build_features import (
+    load_events,
+    activity_events,
+    daily_sessions,
+    count_features,
+    features_from_aggregates,
+)
+from src.features.feature_store import FEATURES_CSV_PATH, write_feature_store
+from src.ingestion.event_schema import day_to_date
+
+# ----------------------------
+# Paths
+# ----------------------------
+EVENTS_PATH = "data/raw/events.csv"
+# New batches land here, one CSV per batch; file names sort in arrival order
+EVENTS_DIR = "data/raw/events"
+STATE_PATH = "data/processed/feature_state.pkl"
+
+STATE_VERSION = 2
+
+OPEN_DAY_COLUMNS = ["user_id", "day", "event_type", "session_duration"]
+
+
+def _concat(frames):
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+# ----------------------------
+# Running feature state
+# ----------------------------
+class FeatureState:
+    """Per-user running aggregates that new event batches are folded into.
+
+    Events are append-only, so every day before the latest one seen is
+    final and is kept only as its (user, day) session bucket. The latest
+    day can still receive events, so its activity rows are kept raw and
+    re-reduced with the next batch. Feature usage is kept as per-(user,
+    feature) counts. features() runs the same final stage as
+    build_user_features, so the output matches a full rebuild exactly.
+    """
+
+    def __init__(self):
+        self.sessions = None        # closed (user, day) buckets
+        self.open_day = None        # raw activity rows of last_day
+        self.feature_counts = None  # (user, feature_name) counts
+        self.last_day = None
+        self.sources = {}           # event file -> stamp when folded in
+
+    def update(self, events: pd.DataFrame):
+        """Fold a batch of events in; nothing in it may predate last_day"""
+        activity = activity_events(events)
+        if not len(activity):
+            return self
+
+        if self.last_day is not None and (activity["day"] < self.last_day).any():
+            raise ValueError(
+                f"Events before {day_to_date(self.last_day)} cannot be folded in; "
+                "run a full rebuild instead"
+            )
+
+        counts = count_features(activity)
+        if self.feature_counts is not None:
+            counts = (
+                _concat([self.feature_counts, counts])
+                .groupby(["user_id", "feature_name"])["count"]
+                .sum()
+                .reset_index()
+            )
+        self.feature_counts = counts
+
+        # File order is kept, so the open day reduces as in one full pass
+        pending = _concat([self.open_day, activity[OPEN_DAY_COLUMNS]])
+        self.last_day = pending["day"].max()
+        closed = (pending["day"] < self.last_day).to_numpy()
+        self.sessions = _concat([self.sessions, daily_sessions(pending[closed])])
+        self.open_day = pending[~closed].reset_index(drop=True)
+        return self
+
+    def update_files(self, paths):
+        """Fold in event files not seen before; returns the ones folded in"""
+        folded = []
+        for path in paths:
+            stamp = _file_stamp(path)
+            if path in self.sources:
+                if self.sources[path] != stamp:
+                    raise ValueError(
+                        f"{path} changed after it was folded in; "
+                        "run a full rebuild instead"
+                    )
+                continue
+            self.update(load_events(path))
+            self.sources[path] = stamp
+            folded.append(path)
+        return folded
+
+    def features(self):
+        if self.open_day is None:
+            raise ValueError("No activity has been folded in yet")
+        sessions = (
+            _concat([self.sessions, daily_sessions(self.open_day)])
+            .sort_values(["user_id", "day"])
+            .reset_index(drop=True)
+        )
+        return features_from_aggregates(sessions, self.feature_counts)
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def save(self, path=STATE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        pd.to_pickle({"version": STATE_VERSION, **vars(self)}, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        """Saved state, or an empty one when none (or an old version) exists"""
+        state = cls()
+        if os.path.exists(path):
+            saved = pd.read_pickle(path)
+            if saved.pop("version", None) == STATE_VERSION:
+                vars(state).update(saved)
+        return state
+
+
+def event_files():
+    """The original event log followed by batch files in name order"""
+    paths = [EVENTS_PATH] if os.path.exists(EVENTS_PATH) else []
+    return paths + sorted(glob.glob(os.path.join(EVENTS_DIR, "*.csv")))
+
+
+# ----------------------------
+# Run incremental update
+# ----------------------------
+if __name__ == "__main__":
+    state = FeatureState.load()
+    folded = state.update_files(sys.argv[1:] or event_files())
+    if not folded:
+        print("No new event files")
+        sys.exit(0)
+
+    features = state.features()
+    features.to_csv(FEATURES_CSV_PATH, index=False)
+    write_feature_store(features)
+    state.save()
+    print(f"✅ Folded in {len(folded)} event file(s)")
+    print(f"{len(features)} users, events through {day_to_date(state.last_day)}")
@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.features.build_features import (
+    load_events,
+    ACTIVITY_EVENTS,
+    activity_events,
+    daily_sessions,
+    count_features,
+    features_from_aggregates,
+)
+from src.features.feature_store import FEATURES_CSV_PATH, write_feature_store
+from src.ingestion.event_schema import day_index
+
+# ----------------------------
+# Configuration
+# ----------------------------
+WORKERS = int(os.environ.get("FEATURE_WORKERS", os.cpu_count() or 1))
+
+PARTITION_COLUMNS = ["user_id", "event_time", "event_type", "session_duration", "feature_name"]
+
+
+# ----------------------------
+# Worker side
+# ----------------------------
+# Forked workers inherit the events and partition labels set here, so each
+# one selects its own users instead of the parent pickling every partition
+_shared = {}
+
+
+def _select(events, labels, partition):
+    # take() returns a standalone frame that the builder may add columns to
+    return events.take(np.flatnonzero(labels == partition))
+
+
+def _partition_features(events, observation_days, max_day):
+    activity = activity_events(events)
+    return features_from_aggregates(
+        daily_sessions(activity),
+        count_features(activity),
+        observation_days=observation_days,
+        max_day=max_day,
+    )
+
+
+def _shared_partition_features(partition, observation_days, max_day):
+    events, labels = _shared["events"], _shared["labels"]
+    return _partition_features(_select(events, labels, partition), observation_days, max_day)
+
+
+# ----------------------------
+# Parallel builder
+# ----------------------------
+def global_days(events: pd.DataFrame):
+    """(observation_days, max_day) over all users' activity, as the full build sees them"""
+    is_activity = events["event_type"].isin(ACTIVITY_EVENTS).to_numpy()
+    unique_days = pd.unique(day_index(events["event_time"].to_numpy()[is_activity]))
+    return len(unique_days), unique_days.max()
+
+
+def partition_labels(events: pd.DataFrame, partitions: int):
+    """Partition of each event, from its hashed user_id (whole users per partition)"""
+    return pd.util.hash_array(events["user_id"].to_numpy()) % partitions
+
+
+def build_user_features_parallel(events: pd.DataFrame, workers=WORKERS, partitions=None):
+    """build_user_features with users hash-partitioned across a process pool.
+
+    Features are independent per user except for observation_days and the
+    max day, which are reduced once here and broadcast to every partition.
+    The concatenated output is identical to build_user_features.
+    """
+    partitions = partitions or workers
+    observation_days, max_day = global_days(events)
+    labels = partition_labels(events, partitions)
+    events = events[PARTITION_COLUMNS]
+    args = ([observation_days] * partitions, [max_day] * partitions)
+
+    if workers <= 1:
+        results = [
+            _partition_features(_select(events, labels, p), observation_days, max_day)
+            for p in range(partitions)
+        ]
+    elif "fork" in multiprocessing.get_all_start_methods():
+        _shared.update(events=events, labels=labels)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("fork")
+            ) as pool:
+                results = list(pool.map(_shared_partition_features, range(partitions), *args))
+        finally:
+            _shared.clear()
+    else:
+        chunks = [_select(events, labels, p) for p in range(partitions)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_partition_features, chunks, *args))
+
+    return (
+        pd.concat([r for r in results if len(r)], ignore_index=True)
+        .sort_values("user_id")
+        .reset_index(drop=True)
+    )
+
+
+# ----------------------------
+# Run pipeline
+# ----------------------------
+if __name__ == "__main__":
+    features = build_user_features_parallel(load_events())
+
+    features.to_csv(FEATURES_CSV_PATH, index=False)
+    write_feature_store(features)
+    print(f"✅ Feature engineering complete ({WORKERS} workers)")
+    print(features.head())
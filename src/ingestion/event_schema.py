@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# Enumerations
+# ----------------------------
+EVENT_TYPES = ["login", "feature_use", "logout"]
+DEVICES = ["android", "ios", "web"]
+FEATURES = [
+    "dashboard",
+    "search",
+    "analytics",
+    "notifications",
+    "profile",
+    "settings"
+]
+
+# ----------------------------
+# Compact event schema
+# ----------------------------
+# Fixed categories store event types and devices as int8 codes; values
+# outside them become NaN. Feature names keep categories inferred from the
+# data so an unknown feature still counts as one.
+EVENT_DTYPES = {
+    "user_id": "int32",
+    "event_type": pd.CategoricalDtype(EVENT_TYPES),
+    "session_duration": "float32",
+    "feature_name": "category",
+    "device_type": pd.CategoricalDtype(DEVICES),
+}
+
+# Calendar days are int32 day indices: days since 1970-01-01
+DAY_DTYPE = np.int32
+
+
+def day_index(event_time):
+    """Day index of each timestamp (floors like .dt.date)"""
+    values = np.asarray(event_time, dtype="datetime64[ns]")
+    return values.astype("datetime64[D]").astype(np.int64).astype(DAY_DTYPE)
+
+
+def day_to_date(day):
+    return pd.Timestamp(int(day), unit="D").date()
+
+
+def compact_events(events: pd.DataFrame):
+    """Cast an event frame to the compact schema (columns it has only)"""
+    dtypes = {c: t for c, t in EVENT_DTYPES.items() if c in events.columns}
+    return events.astype(dtypes)
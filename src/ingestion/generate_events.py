@@ -1,133 +1,252 @@
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-import random
+
+from src.ingestion.event_schema import (
+    DEVICES,
+    FEATURES,
+    EVENT_DTYPES,
+)
 
 # ----------------------------
 # Configuration
 # ----------------------------
-NUM_USERS = 5000
+NUM_USERS = int(os.environ.get("GENERATOR_USERS", 5000))
 DAYS_OBSERVED = 30
 CHURN_INACTIVITY_DAYS = 14
 SEED = 42
 
-np.random.seed(SEED)
-random.seed(SEED)
+# Users per shard: each shard has its own seed and output file
+SHARD_USERS = int(os.environ.get("GENERATOR_SHARD_USERS", 20_000))
+WORKERS = int(os.environ.get("GENERATOR_WORKERS", 1))
+OUTPUT_FORMAT = os.environ.get("GENERATOR_FORMAT", "csv")  # csv | parquet
+
+EVENTS_PATH = "data/raw/events.csv"
+EVENTS_PARQUET_PATH = "data/raw/events.parquet"
+LABELS_PATH = "data/processed/churn_labels.csv"
 
-FEATURES = [
-    "dashboard",
-    "search",
-    "analytics",
-    "notifications",
-    "profile",
-    "settings"
-]
+LOGIN, FEATURE_USE, LOGOUT = 0, 1, 2
 
-DEVICES = ["android", "ios", "web"]
+BASE_ACTIVITY = [0.3, 0.6, 0.9]
+BASE_ACTIVITY_P = [0.3, 0.5, 0.2]
+MAX_DECAY = 0.05
 
-EVENT_TYPES = ["login", "feature_use", "logout"]
+# Inclusive minute offsets from the start of the day
+LOGIN_MINUTES = (0, 60)
+FEATURE_MINUTES = (5, 120)
+LOGOUT_MINUTES = (120, 180)
 
 
 # ----------------------------
 # Helper functions
 # ----------------------------
-def generate_user_profile():
+def generate_user_profiles(rng, n_users):
     """Simulate different user engagement personalities"""
     return {
-        "base_activity": np.random.choice([0.3, 0.6, 0.9], p=[0.3, 0.5, 0.2]),
-        "decay_rate": np.random.uniform(0.0, 0.05),
-        "preferred_device": random.choice(DEVICES)
+        "base_activity": rng.choice(BASE_ACTIVITY, size=n_users, p=BASE_ACTIVITY_P),
+        "decay_rate": rng.uniform(0.0, MAX_DECAY, size=n_users),
+        "preferred_device": rng.integers(0, len(DEVICES), size=n_users),
     }
 
 
-def simulate_day_activity(base_prob, decay, day):
-    """Activity probability decays over time"""
-    return max(0, base_prob - decay * day)
+def simulate_activity(rng, profiles, n_days):
+    """(users x days) activity; the probability decays linearly over time"""
+    days = np.arange(n_days)
+    activity_prob = np.maximum(
+        0, profiles["base_activity"][:, None] - profiles["decay_rate"][:, None] * days
+    )
+    return rng.random(activity_prob.shape) < activity_prob
+
+
+def churn_labels(active):
+    """1 when a user was ever inactive for CHURN_INACTIVITY_DAYS days in a row"""
+    streak = np.zeros(len(active), dtype=np.int32)
+    churned = np.zeros(len(active), dtype=bool)
+    for day in range(active.shape[1]):
+        streak = np.where(active[:, day], 0, streak + 1)
+        churned |= streak >= CHURN_INACTIVITY_DAYS
+    return churned.astype(np.int64)
+
+
+def _minutes(rng, bounds, n):
+    return rng.integers(bounds[0], bounds[1] + 1, size=n)
 
 
 # ----------------------------
 # Main Generator
 # ----------------------------
-def generate_events():
-    start_date = datetime.now() - timedelta(days=DAYS_OBSERVED + CHURN_INACTIVITY_DAYS)
-    all_events = []
-
-    churn_labels = {}
-
-    for user_id in range(1, NUM_USERS + 1):
-        profile = generate_user_profile()
-        inactive_streak = 0
-        churned = False
-
-        for day in range(DAYS_OBSERVED + CHURN_INACTIVITY_DAYS):
-            current_date = start_date + timedelta(days=day)
-            activity_prob = simulate_day_activity(
-                profile["base_activity"], profile["decay_rate"], day
-            )
-
-            active_today = np.random.rand() < activity_prob
-
-            if not active_today:
-                inactive_streak += 1
-            else:
-                inactive_streak = 0
-
-            if inactive_streak >= CHURN_INACTIVITY_DAYS:
-                churned = True
-
-            if active_today:
-                session_duration = np.random.gamma(shape=2, scale=10)
-
-                # Login
-                all_events.append({
-                    "user_id": user_id,
-                    "event_time": current_date + timedelta(minutes=random.randint(0, 60)),
-                    "event_type": "login",
-                    "session_duration": session_duration,
-                    "feature_name": None,
-                    "device_type": profile["preferred_device"]
-                })
-
-                # Feature usage
-                for _ in range(np.random.randint(1, 4)):
-                    all_events.append({
-                        "user_id": user_id,
-                        "event_time": current_date + timedelta(minutes=random.randint(5, 120)),
-                        "event_type": "feature_use",
-                        "session_duration": session_duration,
-                        "feature_name": random.choice(FEATURES),
-                        "device_type": profile["preferred_device"]
-                    })
-
-                # Logout
-                all_events.append({
-                    "user_id": user_id,
-                    "event_time": current_date + timedelta(minutes=random.randint(120, 180)),
-                    "event_type": "logout",
-                    "session_duration": session_duration,
-                    "feature_name": None,
-                    "device_type": profile["preferred_device"]
-                })
-
-        churn_labels[user_id] = int(churned)
-
-    events_df = pd.DataFrame(all_events)
-    churn_df = pd.DataFrame.from_dict(
-        churn_labels, orient="index", columns=["churned"]
-    ).reset_index().rename(columns={"index": "user_id"})
+def generate_shard(shard, first_user_id, n_users, start_date, seed=SEED):
+    """Events and churn labels for users [first_user_id, first_user_id + n_users).
+
+    Every draw comes from the shard's own seed, so a shard's output does not
+    depend on how many shards or worker processes there are.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(shard,)))
+    profiles = generate_user_profiles(rng, n_users)
+    active = simulate_activity(rng, profiles, DAYS_OBSERVED + CHURN_INACTIVITY_DAYS)
+
+    # One session per active (user, day), in user then day order
+    session_user, session_day = np.nonzero(active)
+    n_sessions = len(session_user)
+    session_duration = rng.gamma(shape=2, scale=10, size=n_sessions).astype(np.float32)
+    n_features = rng.integers(1, 4, size=n_sessions)
+
+    # Each session is a login, 1-3 feature uses and a logout
+    session_events = n_features + 2
+    session = np.repeat(np.arange(n_sessions), session_events)
+    first_event = np.cumsum(session_events) - session_events
+    position = np.arange(len(session)) - first_event[session]
+
+    event_type = np.full(len(session), FEATURE_USE, dtype=np.int8)
+    event_type[position == 0] = LOGIN
+    event_type[position == session_events[session] - 1] = LOGOUT
+
+    minutes = np.empty(len(session), dtype=np.int64)
+    for kind, bounds in [(LOGIN, LOGIN_MINUTES), (FEATURE_USE, FEATURE_MINUTES),
+                         (LOGOUT, LOGOUT_MINUTES)]:
+        is_kind = event_type == kind
+        minutes[is_kind] = _minutes(rng, bounds, int(is_kind.sum()))
+
+    feature_code = np.full(len(session), -1, dtype=np.int8)
+    is_feature = event_type == FEATURE_USE
+    feature_code[is_feature] = rng.integers(0, len(FEATURES), size=int(is_feature.sum()))
+
+    user = session_user[session]
+    event_time = (
+        np.datetime64(start_date, "us")
+        + session_day[session].astype("timedelta64[D]")
+        + minutes.astype("timedelta64[m]")
+    )
+
+    events_df = pd.DataFrame({
+        "user_id": (first_user_id + user).astype(EVENT_DTYPES["user_id"]),
+        "event_time": event_time,
+        "event_type": pd.Categorical.from_codes(
+            event_type, dtype=EVENT_DTYPES["event_type"]
+        ),
+        "session_duration": session_duration[session],
+        "feature_name": pd.Categorical.from_codes(feature_code, FEATURES),
+        "device_type": pd.Categorical.from_codes(
+            profiles["preferred_device"][user], dtype=EVENT_DTYPES["device_type"]
+        ),
+    })
+    churn_df = pd.DataFrame({
+        "user_id": first_user_id + np.arange(n_users),
+        "churned": churn_labels(active),
+    })
+    return events_df, churn_df
 
+
+def shard_plan(num_users, shard_users=SHARD_USERS):
+    """(shard, first_user_id, n_users) for each shard; user ids start at 1"""
+    return [
+        (shard, first, min(shard_users, num_users - first + 1))
+        for shard, first in enumerate(range(1, num_users + 1, shard_users))
+    ]
+
+
+def generate_events(num_users=NUM_USERS, seed=SEED):
+    """All events and churn labels in memory, shard by shard"""
+    start_date = datetime.now() - timedelta(days=DAYS_OBSERVED + CHURN_INACTIVITY_DAYS)
+    shards = [
+        generate_shard(shard, first, n, start_date, seed)
+        for shard, first, n in shard_plan(num_users)
+    ]
+    events_df = pd.concat([e for e, _ in shards], ignore_index=True)
+    churn_df = pd.concat([c for _, c in shards], ignore_index=True)
     return events_df, churn_df
 
 
+# ----------------------------
+# Chunked output
+# ----------------------------
+def _part_path(events_path, shard, fmt):
+    if fmt == "parquet":
+        return os.path.join(events_path, f"part-{shard:05d}.parquet")
+    return f"{events_path}.part-{shard:05d}"
+
+
+def _formatted_categorical(values, format_values):
+    """Categorical whose categories are already strings.
+
+    Event times and session durations repeat heavily, so formatting only the
+    distinct values makes to_csv several times faster.
+    """
+    codes, uniques = pd.factorize(values)
+    return pd.Categorical.from_codes(codes, format_values(uniques))
+
+
+def _csv_ready(events_df):
+    return events_df.assign(
+        event_time=_formatted_categorical(
+            events_df["event_time"].to_numpy(),
+            lambda t: np.char.replace(np.datetime_as_string(t, unit="us"), "T", " "),
+        ),
+        session_duration=_formatted_categorical(
+            events_df["session_duration"].to_numpy(),
+            lambda d: d.astype(str),
+        ),
+    )
+
+
+def _write_shard(shard, first_user_id, n_users, start_date, seed, events_path, fmt):
+    events_df, churn_df = generate_shard(shard, first_user_id, n_users, start_date, seed)
+    path = _part_path(events_path, shard, fmt)
+    if fmt == "parquet":
+        events_df.to_parquet(path, index=False)
+    else:
+        _csv_ready(events_df).to_csv(path, index=False, header=shard == 0)
+    return churn_df
+
+
+def write_events(events_path=None, labels_path=LABELS_PATH, num_users=NUM_USERS,
+                 workers=WORKERS, fmt=OUTPUT_FORMAT, seed=SEED):
+    """Generate events shard by shard straight to disk.
+
+    CSV parts are concatenated in shard order into one file at events_path;
+    Parquet parts are kept as a dataset directory at events_path. Only one
+    shard per worker is held in memory at a time.
+    """
+    if events_path is None:
+        events_path = EVENTS_PARQUET_PATH if fmt == "parquet" else EVENTS_PATH
+    if fmt == "parquet":
+        os.makedirs(events_path, exist_ok=True)
+
+    start_date = datetime.now() - timedelta(days=DAYS_OBSERVED + CHURN_INACTIVITY_DAYS)
+    plan = shard_plan(num_users)
+    shards, first_user_ids, sizes = zip(*plan)
+    n = len(plan)
+    args = (shards, first_user_ids, sizes, [start_date] * n, [seed] * n,
+            [events_path] * n, [fmt] * n)
+    if workers <= 1:
+        labels = list(map(_write_shard, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            labels = list(pool.map(_write_shard, *args))
+
+    if fmt != "parquet":
+        with open(events_path, "wb") as out:
+            for shard in shards:
+                part = _part_path(events_path, shard, fmt)
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out)
+                os.remove(part)
+
+    churn_df = pd.concat(labels, ignore_index=True)
+    churn_df.to_csv(labels_path, index=False)
+    return churn_df
+
+
 # ----------------------------
 # Run & Save
 # ----------------------------
 if __name__ == "__main__":
-    events, churn = generate_events()
-
-    events.to_csv("data/raw/events.csv", index=False)
-    churn.to_csv("data/processed/churn_labels.csv", index=False)
+    churn = write_events()
 
     print("✅ Event generation complete")
-    print(events.head())
+    print(f"{len(churn)} users, {OUTPUT_FORMAT} output")
     print(churn["churned"].value_counts())
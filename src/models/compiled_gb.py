@@ -0,0 +1,218 @@
+import numpy as np
+
+# ----------------------------
+# Configuration
+# ----------------------------
+# Rows are scored in blocks so the (nodes x rows) split state stays in cache
+BLOCK_ROWS = 1024
+# Below this many rows a single cumsum beats a Python loop over stages
+SMALL_BLOCK_ROWS = 256
+
+
+def float32_floor(values):
+    """Largest float32 <= each float64 value.
+
+    For float32 inputs x, ``x <= t`` and ``x <= float32_floor(t)`` agree,
+    so splits can be tested in float32 without changing any decision.
+    """
+    down = values.astype(np.float32)
+    too_high = down.astype(np.float64) > values
+    down[too_high] = np.nextafter(down[too_high], np.float32(-np.inf))
+    return down
+
+
+# ----------------------------
+# Compiled gradient boosting scorer
+# ----------------------------
+class CompiledGB:
+    """Flattened, array-level evaluator for a binary GradientBoostingClassifier.
+
+    Each tree is padded to a complete binary tree of depth 3 and flattened
+    into contiguous arrays: the distinct (feature, threshold) split tests, a
+    node-major map from (internal node, tree) to its test, and a per-tree
+    lookup table from the 7 split outcomes to the scaled stage value of the
+    leaf they reach. A batch is scored by evaluating every distinct test
+    once, packing the outcomes into a code per tree and reading the table.
+    Inputs are cast to float32 and stage contributions are summed in stage
+    order, as sklearn does, so probabilities are bit-for-bit identical to
+    model.predict_proba.
+    """
+
+    MAX_DEPTH = 3
+    N_INTERNAL = 2 ** MAX_DEPTH - 1
+
+    def __init__(self, test_feature, test_threshold, node_test, leaf_table,
+                 init_raw, feature_names=None):
+        self.test_feature = test_feature      # (n_tests,) int
+        self.test_threshold = test_threshold  # (n_tests, 1) float32
+        self.node_test = node_test            # (N_INTERNAL * n_trees,) int
+        self.leaf_table = leaf_table          # (n_trees, 2 ** N_INTERNAL) float64
+        self.init_raw = init_raw
+        self.feature_names = (
+            list(feature_names) if feature_names is not None else None
+        )
+        self.n_trees = leaf_table.shape[0]
+        self._table_offsets = (np.arange(self.n_trees) * leaf_table.shape[1])[:, None]
+
+    @classmethod
+    def from_sklearn(cls, model):
+        # sklearn is only needed to compile, not to score a saved scorer
+        from sklearn.dummy import DummyClassifier
+        from sklearn.tree._tree import TREE_LEAF
+
+        if getattr(model, "n_classes_", None) != 2:
+            raise ValueError("Only binary GradientBoostingClassifier models are supported")
+
+        if model.init_ == "zero":
+            init_raw = 0.0
+        elif isinstance(model.init_, DummyClassifier):
+            # The prior is constant per row, so one probe row is enough
+            probe = np.zeros((1, model.n_features_in_), dtype=np.float32)
+            init_raw = float(model._raw_predict_init(probe)[0, 0])
+        else:
+            raise ValueError("Only 'zero' or prior (DummyClassifier) init is supported")
+
+        trees = [est.tree_ for est in model.estimators_[:, 0]]
+        if max(tree.max_depth for tree in trees) > cls.MAX_DEPTH:
+            raise ValueError(f"Trees deeper than {cls.MAX_DEPTH} are not supported")
+
+        depth, n_internal = cls.MAX_DEPTH, cls.N_INTERNAL
+        feature = np.zeros((n_internal, len(trees)), dtype=np.intp)
+        threshold = np.full((n_internal, len(trees)), np.inf, dtype=np.float64)
+        leaf_value = np.zeros((len(trees), 2 ** depth), dtype=np.float64)
+
+        for t, tree in enumerate(trees):
+            # Stage contributions are scaled exactly like predict_stages does
+            values = model.learning_rate * tree.value[:, 0, 0]
+            stack = [(0, 0, 0)]  # (sklearn node, level, position in level)
+            while stack:
+                node, level, pos = stack.pop()
+                if tree.children_left[node] == TREE_LEAF:
+                    # Padded subtree below a shallow leaf: every leaf gets its value
+                    span = 2 ** (depth - level)
+                    leaf_value[t, pos * span:(pos + 1) * span] = values[node]
+                    continue
+                slot = 2 ** level - 1 + pos
+                feature[slot, t] = tree.feature[node]
+                threshold[slot, t] = tree.threshold[node]
+                stack.append((tree.children_left[node], level + 1, 2 * pos))
+                stack.append((tree.children_right[node], level + 1, 2 * pos + 1))
+
+        # Bit j of a code is "went right" at level-order slot j
+        codes = np.arange(2 ** n_internal)
+        leaf = np.zeros_like(codes)
+        for level in range(depth):
+            slot = 2 ** level - 1 + leaf
+            leaf = 2 * leaf + ((codes >> slot) & 1)
+
+        # Trees reuse the same splits heavily; evaluate each distinct one once
+        tests = np.stack([
+            feature.ravel().astype(np.float64),
+            float32_floor(threshold.ravel()).astype(np.float64),
+        ], axis=1)
+        unique_tests, node_test = np.unique(tests, axis=0, return_inverse=True)
+
+        return cls(
+            test_feature=unique_tests[:, 0].astype(np.intp),
+            test_threshold=unique_tests[:, 1].astype(np.float32)[:, None],
+            node_test=node_test.ravel().astype(np.intp),
+            leaf_table=leaf_value[:, leaf],
+            init_raw=init_raw,
+            feature_names=getattr(model, "feature_names_in_", None),
+        )
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                test_feature=self.test_feature,
+                test_threshold=self.test_threshold,
+                node_test=self.node_test,
+                leaf_table=self.leaf_table,
+                init_raw=np.float64(self.init_raw),
+                feature_names=np.array(self.feature_names or [], dtype=str),
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            feature_names = data["feature_names"].tolist()
+            return cls(
+                test_feature=data["test_feature"],
+                test_threshold=data["test_threshold"],
+                node_test=data["node_test"],
+                leaf_table=data["leaf_table"],
+                init_raw=float(data["init_raw"]),
+                feature_names=feature_names or None,
+            )
+
+    # ----------------------------
+    # Scoring
+    # ----------------------------
+    def as_matrix(self, X):
+        """Rows as a contiguous float32 matrix in the model's column order"""
+        if self.feature_names is not None and hasattr(X, "columns"):
+            if list(X.columns) != self.feature_names:
+                X = X[self.feature_names]
+            X = X.to_numpy(dtype=np.float32)
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def leaf_codes(self, Xb):
+        """Packed split outcomes per (tree, row); selects the leaf in leaf_table"""
+        Xt = np.ascontiguousarray(Xb.T)
+        # sklearn goes left when x <= threshold
+        outcomes = ~(Xt[self.test_feature] <= self.test_threshold)
+        goes_right = outcomes.view(np.uint8)[self.node_test]
+        goes_right = goes_right.reshape(self.N_INTERNAL, self.n_trees, -1)
+
+        codes = goes_right[0].copy()
+        for slot in range(1, self.N_INTERNAL):
+            codes |= goes_right[slot] << slot
+        return codes
+
+    def _raw_block(self, Xb):
+        contributions = np.empty((self.n_trees + 1, len(Xb)), dtype=np.float64)
+        contributions[0] = self.init_raw
+        contributions[1:] = self.leaf_table.ravel()[self.leaf_codes(Xb) + self._table_offsets]
+
+        # Sequential accumulation keeps sklearn's stage-by-stage rounding
+        if len(Xb) < SMALL_BLOCK_ROWS:
+            return np.cumsum(contributions, axis=0)[-1]
+        raw = contributions[0].copy()
+        for stage in contributions[1:]:
+            raw += stage
+        return raw
+
+    def decision_function(self, X):
+        Xm = self.as_matrix(X)
+        raw = np.empty(len(Xm), dtype=np.float64)
+        for start in range(0, len(Xm), BLOCK_ROWS):
+            raw[start:start + BLOCK_ROWS] = self._raw_block(Xm[start:start + BLOCK_ROWS])
+        return raw
+
+    def predict_churn(self, X):
+        """Positive-class (churn) probability per row"""
+        # scipy's expit, as sklearn uses; imported on first use
+        from scipy.special import expit
+        return expit(self.decision_function(X))
+
+    def predict_proba(self, X):
+        proba = np.empty((len(X), 2), dtype=np.float64)
+        proba[:, 1] = self.predict_churn(X)
+        proba[:, 0] = 1 - proba[:, 1]
+        return proba
+
+
+def compile_model(model):
+    return CompiledGB.from_sklearn(model)
+
+
+def load_scorer(model):
+    """Compiled scorer when the model supports it, else the sklearn model itself"""
+    try:
+        return compile_model(model)
+    except ValueError:
+        return model
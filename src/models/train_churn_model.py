@@ -14,6 +14,8 @@ from sklearn.ensemble import GradientBoostingClassifier
 import joblib
 import os
 
+from src.features.feature_store import load_features
+
 # ----------------------------
 # Paths
 # ----------------------------
@@ -26,7 +28,7 @@ os.makedirs(MODEL_DIR, exist_ok=True)
 # ----------------------------
 # Load data
 # ----------------------------
-X = pd.read_csv(FEATURES_PATH)
+X = load_features(FEATURES_PATH)
 y = pd.read_csv(LABELS_PATH)
 
 data = X.merge(y, on="user_id")
@@ -1,72 +1,124 @@
 import pandas as pd
-import numpy as np
-import joblib
 import os
+import sys
+
+from src.api.bundle import bundle_is_current, load_bundle
+from src.features.feature_store import load_feature_matrix
+from src.monitoring.sketches import (
+    BASELINE_SKETCH_PATH,
+    PROBABILITY,
+    PSI_ALERT,
+    drift_table,
+    load_reference,
+    sketch_frame,
+)
 
 # ----------------------------
 # Paths
 # ----------------------------
 FEATURES_PATH = "data/processed/user_features.csv"
 MODEL_PATH = "models/gb_model.pkl"
-BASELINE_PATH = "reports/monitoring/baseline_stats.csv"
+BASELINE_PATH = BASELINE_SKETCH_PATH
+
+# Rows scored and sketched at a time when there is no current bundle
+MONITOR_CHUNK_ROWS = int(os.environ.get("MONITOR_CHUNK_ROWS", 100_000))
 
 os.makedirs("reports/monitoring", exist_ok=True)
 
+
 # ----------------------------
-# Load artifacts
+# Current population sketch
 # ----------------------------
-features = pd.read_csv(FEATURES_PATH)
-model = joblib.load(MODEL_PATH)
+def scored_chunks(chunk_rows=MONITOR_CHUNK_ROWS):
+    """Feature rows plus churn probability, chunk by chunk"""
+    if bundle_is_current():
+        bundle = load_bundle()
+        X, probs = bundle.X, bundle.score_table.churn_probability
+        scorer = None
+    else:
+        import joblib
+        from src.models.compiled_gb import load_scorer
 
-X = features.drop(columns=["user_id"])
+        _, X = load_feature_matrix(FEATURES_PATH)
+        scorer = load_scorer(joblib.load(MODEL_PATH))
 
-# ----------------------------
-# Prediction confidence monitoring
-# ----------------------------
-probs = model.predict_proba(X)[:, 1]
+    for start in range(0, len(X), chunk_rows):
+        chunk = X.iloc[start:start + chunk_rows]
+        chunk_probs = (
+            scorer.predict_proba(chunk)[:, 1] if scorer is not None
+            else probs[start:start + chunk_rows]
+        )
+        yield chunk.assign(**{PROBABILITY: chunk_probs})
 
-confidence_report = {
-    "mean_probability": float(np.mean(probs)),
-    "std_probability": float(np.std(probs)),
-    "high_confidence_rate": float(np.mean((probs > 0.9) | (probs < 0.1)))
-}
 
-confidence_df = pd.DataFrame([confidence_report])
-confidence_df.to_csv("reports/monitoring/prediction_confidence.csv", index=False)
+def population_sketch(reference=None):
+    """The served population's sketch, reusing the bundle's when it fits.
 
-print("✅ Prediction confidence report saved")
+    The bundle sketches its population once at build time; only when it is
+    stale or binned differently from the baseline is the population
+    streamed again.
+    """
+    if bundle_is_current():
+        sketch = load_bundle().sketch
+        if sketch is not None and (reference is None or sketch.compatible(reference)):
+            return sketch
 
-# ----------------------------
-# Baseline creation (first run only)
-# ----------------------------
-if not os.path.exists(BASELINE_PATH):
-    baseline = X.describe().loc[["mean", "std"]].T
-    baseline.to_csv(BASELINE_PATH)
-    print("✅ Baseline statistics created")
-else:
-    baseline = pd.read_csv(BASELINE_PATH, index_col=0)
-    print("✅ Baseline statistics loaded")
+    chunks = scored_chunks()
+    sketch = sketch_frame(next(chunks), reference)
+    for chunk in chunks:
+        sketch.update(chunk)
+    return sketch
 
-# ----------------------------
-# Drift detection
-# ----------------------------
-current_stats = X.describe().loc[["mean", "std"]].T
 
-drift = abs(current_stats["mean"] - baseline["mean"]) / (baseline["std"] + 1e-6)
-drift_df = drift.reset_index()
-drift_df.columns = ["feature", "relative_mean_shift"]
+if __name__ == "__main__":
+    # ----------------------------
+    # Baseline (committed; --init-baseline recreates it)
+    # ----------------------------
+    if "--init-baseline" in sys.argv[1:]:
+        population_sketch().save(BASELINE_PATH)
+        print(f"✅ Baseline sketch created from the current population: {BASELINE_PATH}")
 
-drift_df.to_csv("reports/monitoring/data_drift.csv", index=False)
+    baseline = load_reference(BASELINE_PATH)
+    if baseline is None:
+        # Baselining on the population being checked would report no drift
+        raise SystemExit(
+            f"No baseline sketch at {BASELINE_PATH}; create one from the reference "
+            "population with: python -m src.monitoring.monitor --init-baseline"
+        )
+    print("✅ Baseline sketch loaded")
+    current = population_sketch(baseline)
 
-# ----------------------------
-# Alert logic
-# ----------------------------
-ALERT_THRESHOLD = 2.0  # 2 std deviation shift
+    # ----------------------------
+    # Prediction confidence monitoring
+    # ----------------------------
+    j = current.columns.index(PROBABILITY)
+    confidence_report = {
+        "mean_probability": float(current.mean()[j]),
+        "std_probability": float(current.std()[j]),
+        "high_confidence_rate": float(
+            current.fraction_below(PROBABILITY, 0.1)
+            + 1 - current.fraction_below(PROBABILITY, 0.9)
+        )
+    }
+
+    confidence_df = pd.DataFrame([confidence_report])
+    confidence_df.to_csv("reports/monitoring/prediction_confidence.csv", index=False)
+
+    print("✅ Prediction confidence report saved")
+
+    # ----------------------------
+    # Drift detection (all features in one pass)
+    # ----------------------------
+    drift_df = drift_table(baseline, current)
+    drift_df.to_csv("reports/monitoring/data_drift.csv", index=False)
 
-alerts = drift_df[drift_df["relative_mean_shift"] > ALERT_THRESHOLD]
+    # ----------------------------
+    # Alert logic
+    # ----------------------------
+    alerts = drift_df[drift_df["psi"] > PSI_ALERT]
 
-if not alerts.empty:
-    print("⚠️ DRIFT ALERT:")
-    print(alerts)
-else:
-    print("✅ No significant drift detected")
+    if not alerts.empty:
+        print("⚠️ DRIFT ALERT:")
+        print(alerts)
+    else:
+        print("✅ No significant drift detected")
@@ -0,0 +1,221 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# Configuration
+# ----------------------------
+BASELINE_SKETCH_PATH = "reports/monitoring/baseline_sketch.npz"
+
+N_BINS = 20
+# Rows sampled to place bin edges when a reference sketch is created
+EDGE_SAMPLE_ROWS = 100_000
+PROBABILITY = "churn_probability"
+# Fixed edges for probabilities: bins split exactly at 0.1 and 0.9
+PROBABILITY_EDGES = np.round(np.linspace(0.05, 0.95, 19), 2)
+
+# PSI rule of thumb: < 0.1 stable, 0.1-0.25 moderate, > 0.25 major shift
+PSI_MODERATE = 0.1
+PSI_ALERT = 0.25
+PSI_EPSILON = 1e-4
+
+
+# ----------------------------
+# Feature sketch
+# ----------------------------
+class FeatureSketch:
+    """Mergeable per-column histograms and moments over fixed bin edges.
+
+    Every column has N_BINS bins: interior edges from reference quantiles
+    plus open-ended first and last bins. Sketches with equal edges can be
+    merged, so batches are sketched as they are scored and combined later.
+    State is columns x bins, whatever the number of rows seen.
+    """
+
+    def __init__(self, columns, edges):
+        self.columns = list(columns)
+        self.edges = np.asarray(edges, dtype=np.float64)
+        k, n_bins = len(self.columns), self.edges.shape[1] + 1
+        self.counts = np.zeros((k, n_bins), dtype=np.int64)
+        self.missing = np.zeros(k, dtype=np.int64)
+        self.total = np.zeros(k)
+        self.total_sq = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_reference(cls, frame: pd.DataFrame, n_bins=N_BINS):
+        """Edges at the frame's quantiles (fixed for probabilities), then update"""
+        step = max(1, len(frame) // EDGE_SAMPLE_ROWS)
+        sample = frame.iloc[::step].to_numpy(dtype=np.float64)
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        with np.errstate(all="ignore"):
+            edges = np.nan_to_num(np.nanquantile(sample, quantiles, axis=0).T)
+        if PROBABILITY in frame.columns and n_bins == len(PROBABILITY_EDGES) + 1:
+            edges[frame.columns.get_loc(PROBABILITY)] = PROBABILITY_EDGES
+
+        sketch = cls(frame.columns, edges)
+        sketch.update(frame)
+        return sketch
+
+    def empty_like(self):
+        return FeatureSketch(self.columns, self.edges)
+
+    @property
+    def rows(self):
+        """Non-missing values seen per column"""
+        return self.counts.sum(axis=1)
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+    def update(self, frame: pd.DataFrame):
+        """Fold a batch of rows (all sketch columns) into the sketch"""
+        values = frame[self.columns].to_numpy(dtype=np.float64)
+        k, n_bins = self.counts.shape
+        present = ~np.isnan(values)
+
+        bins = np.empty(values.shape, dtype=np.int64)
+        for j in range(k):
+            bins[:, j] = np.searchsorted(self.edges[j], values[:, j], side="right")
+        # One bincount fills the whole columns x bins table
+        flat = (bins + np.arange(k) * n_bins)[present]
+        counts = np.bincount(flat, minlength=k * n_bins).reshape(k, n_bins)
+
+        filled = np.where(present, values, 0.0)
+        with np.errstate(invalid="ignore"):
+            low = np.where(present, values, np.inf).min(axis=0, initial=np.inf)
+            high = np.where(present, values, -np.inf).max(axis=0, initial=-np.inf)
+
+        with self._lock:
+            self.counts += counts
+            self.missing += len(values) - present.sum(axis=0)
+            self.total += filled.sum(axis=0)
+            self.total_sq += (filled * filled).sum(axis=0)
+            self.min = np.minimum(self.min, low)
+            self.max = np.maximum(self.max, high)
+        return self
+
+    def merge(self, other):
+        if not self.compatible(other):
+            raise ValueError("Sketches with different columns or bin edges cannot be merged")
+        with self._lock:
+            self.counts += other.counts
+            self.missing += other.missing
+            self.total += other.total
+            self.total_sq += other.total_sq
+            self.min = np.minimum(self.min, other.min)
+            self.max = np.maximum(self.max, other.max)
+        return self
+
+    def compatible(self, other):
+        return self.columns == other.columns and np.array_equal(self.edges, other.edges)
+
+    # ----------------------------
+    # Summaries
+    # ----------------------------
+    def mean(self):
+        with np.errstate(all="ignore"):
+            return self.total / self.rows
+
+    def std(self):
+        """Population standard deviation (ddof=0) from the moments"""
+        with np.errstate(all="ignore"):
+            variance = self.total_sq / self.rows - self.mean() ** 2
+        return np.sqrt(np.maximum(variance, 0.0))
+
+    def fraction_below(self, column, edge):
+        """Share of values below one of the column's bin edges"""
+        j = self.columns.index(column)
+        m = int(np.searchsorted(self.edges[j], edge, side="left"))
+        if m == len(self.edges[j]) or self.edges[j][m] != edge:
+            raise ValueError(f"{edge} is not a bin edge of {column}")
+        # Bin i holds values in [edges[i-1], edges[i]): bins 0..m lie below
+        return float(self.counts[j, :m + 1].sum() / max(self.rows[j], 1))
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                columns=np.array(self.columns, dtype=str),
+                edges=self.edges,
+                counts=self.counts,
+                missing=self.missing,
+                total=self.total,
+                total_sq=self.total_sq,
+                min=self.min,
+                max=self.max,
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            sketch = cls(data["columns"].tolist(), data["edges"])
+            for name in ["counts", "missing", "total", "total_sq", "min", "max"]:
+                setattr(sketch, name, data[name].copy())
+        return sketch
+
+
+def load_reference(path=BASELINE_SKETCH_PATH, columns=None):
+    """Saved baseline sketch, or None if missing or over other columns"""
+    try:
+        sketch = FeatureSketch.load(path)
+    except (OSError, KeyError, ValueError):
+        return None
+    if columns is not None and sketch.columns != list(columns):
+        return None
+    return sketch
+
+
+def sketch_frame(frame: pd.DataFrame, reference=None):
+    """Sketch of a frame on the reference's edges, or on its own quantiles"""
+    if reference is not None:
+        return reference.empty_like().update(frame)
+    return FeatureSketch.from_reference(frame)
+
+
+# ----------------------------
+# Drift (all columns at once)
+# ----------------------------
+def drift_table(reference, current):
+    """PSI, binned KS and mean shift of current vs reference, per column.
+
+    Computed on the columns x bins count tables, so the cost does not depend
+    on how many rows either sketch has seen. KS is evaluated at the bin
+    edges, a lower bound on the exact statistic.
+    """
+    from scipy.special import kolmogorov
+
+    if not reference.compatible(current):
+        raise ValueError("Sketches must share columns and bin edges")
+
+    n_ref = reference.rows
+    n_cur = current.rows
+    with np.errstate(all="ignore"):
+        p = reference.counts / n_ref[:, None]
+        q = current.counts / n_cur[:, None]
+
+        p_floor = np.maximum(p, PSI_EPSILON)
+        q_floor = np.maximum(q, PSI_EPSILON)
+        psi = ((q_floor - p_floor) * np.log(q_floor / p_floor)).sum(axis=1)
+
+        ks = np.abs(np.cumsum(p, axis=1) - np.cumsum(q, axis=1)).max(axis=1)
+        effective_n = n_ref * n_cur / (n_ref + n_cur)
+        ks_pvalue = kolmogorov(np.sqrt(effective_n) * ks)
+
+        mean_shift = np.abs(current.mean() - reference.mean()) / (reference.std() + 1e-6)
+
+    return pd.DataFrame({
+        "feature": reference.columns,
+        "psi": psi,
+        "ks_statistic": ks,
+        "ks_pvalue": ks_pvalue,
+        "relative_mean_shift": mean_shift,
+        "reference_rows": n_ref,
+        "current_rows": n_cur,
+    })
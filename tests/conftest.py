@@ -0,0 +1,32 @@
+import importlib
+
+import pytest
+
+from src.api.bundle import build_bundle
+from src.ingestion.generate_events import generate_events
+
+
+@pytest.fixture(scope="session")
+def event_log(tmp_path_factory):
+    """Path of a small generated event log, rows in arrival (time) order"""
+    events, _ = generate_events(num_users=300)
+    events = events.sort_values("event_time", kind="stable", ignore_index=True)
+    path = tmp_path_factory.mktemp("events") / "events.csv"
+    events.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def api(tmp_path_factory):
+    """src.api.main serving a bundle built in a temporary directory.
+
+    main reads its configuration at import, so test modules get it from
+    here rather than importing it themselves.
+    """
+    bundle_dir = tmp_path_factory.mktemp("bundle")
+    build_bundle(bundle_dir=str(bundle_dir))
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("BUNDLE_DIR", str(bundle_dir))
+        mp.setenv("RELOAD_INTERVAL_S", "0")
+        mp.setenv("JOBS_DIR", str(tmp_path_factory.mktemp("jobs")))
+        return importlib.import_module("src.api.main")
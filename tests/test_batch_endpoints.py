@@ -0,0 +1,16 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="module")
+def client(api):
+    # Not entered as a context manager: request validation runs before the
+    # handlers touch artifacts, so nothing needs to load
+    return TestClient(api.app)
+
+
+@pytest.mark.parametrize("endpoint", ["/predict/batch", "/decision/batch"])
+@pytest.mark.parametrize("user_id", [2 ** 63, -2 ** 63 - 1, 2 ** 70])
+def test_ids_outside_int64_are_rejected(client, endpoint, user_id):
+    response = client.post(endpoint, json={"user_ids": [1, user_id]})
+    assert response.status_code == 422
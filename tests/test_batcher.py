@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from src.api.batcher import MicroBatcher
+from src.api.serving import group_by_artifacts
+
+
+class Artifacts:
+    def __init__(self, version):
+        self.version = version
+
+
+def submit_all(batcher, items):
+    """Submit items concurrently; results (or exceptions) in submission order"""
+    async def run():
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(item) for item in items), return_exceptions=True
+            )
+        finally:
+            await batcher.close()
+    return asyncio.run(run())
+
+
+def test_results_fan_out_to_their_submitters():
+    batches = []
+
+    def process(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=50)
+    assert submit_all(batcher, list(range(10))) == [item * 10 for item in range(10)]
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert sum(batches, []) == list(range(10))
+    assert batcher.stats()["items"] == 10
+
+
+def test_a_partial_batch_closes_after_max_wait():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=64, max_wait_ms=1)
+    assert submit_all(batcher, ["only"]) == ["only"]
+    assert batcher.batches == 1
+
+
+def test_errors_reach_every_request_in_the_failed_batch_only():
+    def process(items):
+        if "bad" in items:
+            raise ValueError("bad item")
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=3, max_wait_ms=50)
+    results = submit_all(batcher, ["a", "bad", "c", "d", "e"])
+
+    for result in results[:3]:
+        assert isinstance(result, ValueError)
+    # The next batch is scored as usual
+    assert results[3:] == ["D", "E"]
+    assert batcher.batches == 1
+
+
+def test_batcher_restarts_on_a_new_event_loop():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=2, max_wait_ms=1)
+    assert submit_all(batcher, [1, 2]) == [1, 2]
+    assert submit_all(batcher, [3]) == [3]
+
+
+def test_a_batch_straddling_a_reload_is_scored_per_version():
+    old, new = Artifacts("v1"), Artifacts("v2")
+    calls = []
+
+    def process(artifacts, positions):
+        calls.append((artifacts.version, list(positions)))
+        return [f"{artifacts.version}:{idx}" for idx in positions]
+
+    items = [(old, 5), (old, 7), (new, 5), (old, 1), (new, 9)]
+    assert group_by_artifacts(items, process) == ["v1:5", "v1:7", "v2:5", "v1:1", "v2:9"]
+    assert calls == [("v1", [5, 7, 1]), ("v2", [5, 9])]
+
+
+def test_requests_keep_their_version_through_the_batcher():
+    served = {"artifacts": Artifacts("v1")}
+    calls = []
+
+    def process(artifacts, positions):
+        calls.append(artifacts.version)
+        return [(artifacts.version, idx) for idx in positions]
+
+    batcher = MicroBatcher(lambda items: group_by_artifacts(items, process), max_wait_ms=50)
+
+    async def request(idx, reload_after=False):
+        # Artifacts are captured when the request arrives, as the endpoints do
+        item = (served["artifacts"], idx)
+        if reload_after:
+            served["artifacts"] = Artifacts("v2")
+        return await batcher.submit(item)
+
+    async def run():
+        try:
+            return await asyncio.gather(
+                request(0), request(1, reload_after=True), request(2), request(3)
+            )
+        finally:
+            await batcher.close()
+
+    assert asyncio.run(run()) == [("v1", 0), ("v1", 1), ("v2", 2), ("v2", 3)]
+    assert batcher.batches == 1
+    assert calls == ["v1", "v2"]
+
+
+@pytest.mark.parametrize("size", [1, 2])
+def test_stats(size):
+    batcher = MicroBatcher(lambda items: items, max_batch_size=size, max_wait_ms=1)
+    submit_all(batcher, [1, 2])
+    assert batcher.stats()["avg_batch_size"] == size
@@ -0,0 +1,181 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from src.api.bundle import MANIFEST_FILE, VersionLease, current_version, prune_bundles, set_current
+from src.api.serving import ArtifactState, Reloader
+
+
+def make_versions(bundle_dir, names):
+    for i, name in enumerate(names):
+        path = bundle_dir / name
+        path.mkdir()
+        (path / MANIFEST_FILE).write_text(json.dumps({"version": name}))
+        # Oldest first, so pruning order is deterministic
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+
+
+def versions(bundle_dir):
+    return sorted(p.name for p in bundle_dir.iterdir() if p.is_dir())
+
+
+class FakeArtifacts:
+    """Leases its version for as long as it lives, like Bundle"""
+
+    def __init__(self, bundle_dir, version):
+        self.version = version
+        self.lease = VersionLease(bundle_dir / version)
+        self.preloaded_from = None
+
+    def probe(self):
+        pass
+
+    def preload_like(self, other):
+        self.preloaded_from = other.version
+
+
+def make_reloader(bundle_dir, **kwargs):
+    state = ArtifactState()
+    reloader = Reloader(
+        state, lambda: current_version(bundle_dir), lambda v: FakeArtifacts(bundle_dir, v), **kwargs
+    )
+    return state, reloader
+
+
+def test_prune_keeps_leased_versions(tmp_path):
+    make_versions(tmp_path, ["v1", "v2", "v3"])
+    set_current(tmp_path, "v3")
+
+    lease = VersionLease(tmp_path / "v1")
+    prune_bundles(tmp_path, keep=1)
+    assert versions(tmp_path) == ["v1", "v3"]
+
+    lease.release()
+    prune_bundles(tmp_path, keep=1)
+    assert versions(tmp_path) == ["v3"]
+
+
+def test_prune_removes_incomplete_versions(tmp_path):
+    make_versions(tmp_path, ["v1"])
+    (tmp_path / "v0").mkdir()
+    set_current(tmp_path, "v1")
+    prune_bundles(tmp_path, keep=1)
+    assert versions(tmp_path) == ["v1"]
+
+
+def test_prune_leaves_staging_directories_alone(tmp_path):
+    make_versions(tmp_path, ["v1"])
+    (tmp_path / "v2.tmp-1234").mkdir()
+    set_current(tmp_path, "v1")
+    prune_bundles(tmp_path, keep=1)
+    assert versions(tmp_path) == ["v1", "v2.tmp-1234"]
+
+
+def test_lease_of_another_process_until_it_exits(tmp_path):
+    make_versions(tmp_path, ["v1", "v2"])
+    set_current(tmp_path, "v2")
+    worker = subprocess.Popen(
+        [sys.executable, "-c",
+         "import sys; from src.api.bundle import VersionLease; "
+         f"lease = VersionLease({str(tmp_path / 'v1')!r}); print('leased', flush=True); "
+         "sys.stdin.read()"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        assert worker.stdout.readline().strip() == "leased"
+        prune_bundles(tmp_path, keep=1)
+        assert versions(tmp_path) == ["v1", "v2"]
+    finally:
+        # Killed, not released: the OS drops the lock with the process
+        worker.kill()
+        worker.wait()
+    prune_bundles(tmp_path, keep=1)
+    assert versions(tmp_path) == ["v2"]
+
+
+def test_reload_while_a_request_is_in_flight(tmp_path):
+    make_versions(tmp_path, ["v1", "v2"])
+    set_current(tmp_path, "v1")
+    state, reloader = make_reloader(tmp_path)
+    assert reloader.reload()
+
+    started, finish = threading.Event(), threading.Event()
+    served = []
+
+    def request():
+        # Endpoints read state.current once and use it to the end
+        artifacts = state.current
+        started.set()
+        finish.wait(10)
+        served.append(artifacts.lease.read_manifest()["version"])
+
+    thread = threading.Thread(target=request)
+    thread.start()
+    assert started.wait(10)
+
+    set_current(tmp_path, "v2")
+    assert reloader.reload()
+    assert state.current.version == "v2"
+    assert state.current.preloaded_from == "v1"
+    assert state.reloads == 1
+    # The swapped-out version is still leased by the request using it
+    prune_bundles(tmp_path, keep=1)
+    assert versions(tmp_path) == ["v1", "v2"]
+
+    finish.set()
+    thread.join(10)
+    assert served == ["v1"]
+    prune_bundles(tmp_path, keep=1)
+    assert versions(tmp_path) == ["v2"]
+
+
+def test_reload_only_swaps_on_a_new_version_or_force(tmp_path):
+    make_versions(tmp_path, ["v1"])
+    set_current(tmp_path, "v1")
+    state, reloader = make_reloader(tmp_path)
+
+    assert reloader.reload()
+    first = state.current
+    assert not reloader.reload()
+    assert state.current is first
+    assert reloader.reload(force=True)
+    assert state.current is not first
+
+
+def test_failed_load_keeps_serving_the_current_version(tmp_path):
+    make_versions(tmp_path, ["v1"])
+    (tmp_path / "v2").mkdir()  # no manifest: cannot be leased
+    set_current(tmp_path, "v1")
+    state, reloader = make_reloader(tmp_path, interval_s=0.01)
+    reloader.reload()
+
+    set_current(tmp_path, "v2")
+    reloader.start()
+    try:
+        deadline = time.monotonic() + 10
+        while reloader.last_error is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        reloader.stop()
+    assert "FileNotFoundError" in reloader.last_error
+    assert state.current.version == "v1"
+
+
+def test_polling_swaps_in_the_version_current_names(tmp_path):
+    make_versions(tmp_path, ["v1", "v2"])
+    set_current(tmp_path, "v1")
+    state, reloader = make_reloader(tmp_path, interval_s=0.01)
+    reloader.reload()
+
+    set_current(tmp_path, "v2")
+    reloader.start()
+    try:
+        deadline = time.monotonic() + 10
+        while state.current.version != "v2" and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        reloader.stop()
+    assert state.current.version == "v2"
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from src.features.build_features import build_user_features, load_events
+from src.features.chunked import build_user_features_chunked
+
+INTEGER_FEATURES = [
+    "user_id", "total_sessions", "active_days", "days_since_last_active",
+    "sessions_last_7d", "sessions_prev_7d", "unique_features_used",
+]
+
+
+@pytest.fixture(scope="module")
+def expected(event_log):
+    return build_user_features(load_events(event_log))
+
+
+@pytest.fixture(scope="module")
+def user_ordered_log(event_log, tmp_path_factory):
+    """The same events grouped by user, as the generator writes them"""
+    path = tmp_path_factory.mktemp("events") / "by_user.csv"
+    pd.read_csv(event_log).sort_values("user_id", kind="stable").to_csv(path, index=False)
+    return str(path)
+
+
+# Every size cuts some user's events, and some user's day, across chunks
+@pytest.mark.parametrize("chunk_rows", [97, 1000, 4099, 10**9])
+@pytest.mark.parametrize("log", ["event_log", "user_ordered_log"])
+def test_chunked_build_matches_the_in_memory_build(request, expected, log, chunk_rows):
+    features = build_user_features_chunked(request.getfixturevalue(log), chunk_rows=chunk_rows)
+
+    assert_frame_equal(features, expected, check_exact=False)
+    assert_frame_equal(features[INTEGER_FEATURES], expected[INTEGER_FEATURES], check_dtype=False)
+
@@ -0,0 +1,107 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier
+
+from src.models.compiled_gb import BLOCK_ROWS, SMALL_BLOCK_ROWS, CompiledGB, float32_floor
+
+FEATURES_PATH = "data/processed/user_features.csv"
+
+
+@pytest.fixture(scope="module")
+def model():
+    return joblib.load("models/gb_model.pkl")
+
+
+@pytest.fixture(scope="module")
+def X(model):
+    return pd.read_csv(FEATURES_PATH)[model.feature_names_in_]
+
+
+def threshold_rows(model, X):
+    """Copies of the first row with one feature set on and around each split threshold"""
+    rows = []
+    base = X.iloc[0].to_numpy(dtype=np.float64)
+    for est in model.estimators_[:, 0]:
+        tree = est.tree_
+        for feature, threshold in zip(tree.feature, tree.threshold):
+            if feature < 0:
+                continue
+            floor = np.float64(float32_floor(np.array([threshold]))[0])
+            above = np.float64(np.nextafter(np.float32(floor), np.float32(np.inf)))
+            for value in [threshold, floor, above]:
+                row = base.copy()
+                row[feature] = value
+                rows.append(row)
+    return pd.DataFrame(rows, columns=X.columns)
+
+
+def test_probabilities_are_identical_to_sklearn(model, X):
+    compiled = CompiledGB.from_sklearn(model)
+    assert np.array_equal(compiled.predict_proba(X), model.predict_proba(X))
+
+
+def test_rows_on_split_thresholds(model, X):
+    rows = threshold_rows(model, X)
+    compiled = CompiledGB.from_sklearn(model)
+    assert np.array_equal(compiled.predict_proba(rows), model.predict_proba(rows))
+
+
+def test_float32_floor_keeps_every_split_decision():
+    rng = np.random.default_rng(0)
+    thresholds = rng.normal(scale=100, size=1000)
+    floor = float32_floor(thresholds)
+
+    assert (floor.astype(np.float64) <= thresholds).all()
+    # The next float32 up is already past the threshold
+    above = np.nextafter(floor, np.float32(np.inf))
+    assert (above.astype(np.float64) > thresholds).all()
+    for x in [floor, above]:
+        assert np.array_equal(x <= floor, x.astype(np.float64) <= thresholds)
+
+
+def test_float32_floor_keeps_representable_values():
+    values = np.array([0.0, 1.5, -2.25, 1e30], dtype=np.float32).astype(np.float64)
+    assert np.array_equal(float32_floor(values).astype(np.float64), values)
+
+
+@pytest.mark.parametrize("rows", [
+    1,
+    SMALL_BLOCK_ROWS - 1,
+    SMALL_BLOCK_ROWS,
+    (SMALL_BLOCK_ROWS + BLOCK_ROWS) // 2,
+    BLOCK_ROWS,
+    BLOCK_ROWS + 1,
+    # Full blocks then a tail below SMALL_BLOCK_ROWS
+    2 * BLOCK_ROWS + SMALL_BLOCK_ROWS - 1,
+])
+def test_batch_sizes(model, X, rows):
+    rng = np.random.default_rng(rows)
+    batch = X.iloc[rng.integers(len(X), size=rows)]
+    compiled = CompiledGB.from_sklearn(model)
+    assert np.array_equal(compiled.predict_proba(batch), model.predict_proba(batch))
+
+
+def test_shallow_trees_and_zero_init(X):
+    y = (X["days_since_last_active"] > X["days_since_last_active"].median()).astype(int)
+    model = GradientBoostingClassifier(
+        n_estimators=20, max_depth=2, init="zero", random_state=0
+    ).fit(X, y)
+    compiled = CompiledGB.from_sklearn(model)
+    assert np.array_equal(compiled.predict_proba(X), model.predict_proba(X))
+
+
+def test_save_load_round_trip(model, X, tmp_path):
+    compiled = CompiledGB.from_sklearn(model)
+    path = tmp_path / "gb.npz"
+    compiled.save(path)
+    loaded = CompiledGB.load(path)
+
+    assert loaded.feature_names == compiled.feature_names
+    assert loaded.init_raw == compiled.init_raw
+    for name in ["test_feature", "test_threshold", "node_test", "leaf_table"]:
+        assert np.array_equal(getattr(loaded, name), getattr(compiled, name))
+    # Columns in another order are put back in the model's order
+    shuffled = X[X.columns[::-1]]
+    assert np.array_equal(loaded.predict_proba(shuffled), model.predict_proba(X))
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import entropy
+
+from src.features.build_features import activity_events, count_features, feature_diversity, load_events
+
+
+def reference_diversity(feature_counts):
+    """The per-user groupby/apply the vectorized version replaced"""
+    grouped = feature_counts.groupby("user_id")["count"]
+    return pd.DataFrame({
+        "feature_entropy": grouped.apply(lambda counts: entropy(counts.to_numpy())),
+        "unique_features_used": grouped.size(),
+    })
+
+
+def test_entropy_matches_scipy_per_user(event_log):
+    counts = count_features(activity_events(load_events(event_log)))
+    diversity = feature_diversity(counts).set_index("user_id")
+    expected = reference_diversity(counts)
+
+    assert diversity.index.equals(expected.index)
+    # Same summation order as entropy(), so bit-for-bit equal
+    assert np.array_equal(diversity["feature_entropy"], expected["feature_entropy"])
+    assert np.array_equal(diversity["unique_features_used"], expected["unique_features_used"])
+
+
+def test_unsorted_counts_and_single_feature_users():
+    counts = pd.DataFrame({
+        "user_id": [3, 1, 3, 2, 1, 3],
+        "feature_name": ["a", "a", "b", "c", "b", "c"],
+        "count": [5, 1, 1, 7, 3, 2],
+    })
+    diversity = feature_diversity(counts).set_index("user_id")
+
+    assert diversity.index.tolist() == [1, 2, 3]
+    assert diversity.loc[2, "feature_entropy"] == 0.0
+    assert diversity.loc[1, "feature_entropy"] == entropy([1, 3])
+    assert diversity.loc[3, "feature_entropy"] == entropy([5, 1, 2])
+    assert diversity["unique_features_used"].tolist() == [2, 1, 3]
+
+
+def test_no_feature_usage():
+    counts = pd.DataFrame({"user_id": [], "feature_name": [], "count": []})
+    assert len(feature_diversity(counts)) == 0
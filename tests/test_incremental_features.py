@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from src.features.build_features import build_user_features, load_events
+from src.features.incremental import FeatureState
+from src.ingestion.event_schema import day_index
+
+
+def split_batches(event_log, out_dir):
+    """Batch files cut mid-day (the day spans two batches) and on a day boundary"""
+    raw = pd.read_csv(event_log)
+    days = day_index(pd.to_datetime(raw["event_time"]))
+    first_day = days.min()
+
+    def day_rows(offset):
+        return np.flatnonzero(days == first_day + offset)
+
+    mid_day = day_rows(10)
+    cuts = [
+        mid_day[len(mid_day) // 2],  # inside day 10
+        day_rows(20)[0],             # first row of day 20
+        day_rows(30)[1],             # right after day 30's first row
+    ]
+    assert days[cuts[0] - 1] == days[cuts[0]]
+
+    paths = []
+    for i, (start, stop) in enumerate(zip([0] + cuts, cuts + [len(raw)])):
+        path = out_dir / f"batch-{i:02d}.csv"
+        raw.iloc[start:stop].to_csv(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+def test_batches_fold_in_to_the_full_build(event_log, tmp_path):
+    paths = split_batches(event_log, tmp_path)
+    state = FeatureState()
+
+    assert state.update_files(paths) == paths
+    assert_frame_equal(state.features(), build_user_features(load_events(event_log)))
+
+
+def test_features_after_each_batch_match_a_build_up_to_it(event_log, tmp_path):
+    paths = split_batches(event_log, tmp_path)
+    state = FeatureState()
+    seen = []
+    for i, path in enumerate(paths):
+        # Saved and reloaded between batches, as the scheduled job does
+        state.update_files([path])
+        state.save(tmp_path / "state.pkl")
+        state = FeatureState.load(tmp_path / "state.pkl")
+
+        seen.append(pd.read_csv(path))
+        prefix = tmp_path / f"prefix-{i:02d}.csv"
+        pd.concat(seen).to_csv(prefix, index=False)
+        assert_frame_equal(state.features(), build_user_features(load_events(prefix)))
+
+    assert state.update_files(paths) == []
+
+
+def test_late_events_are_rejected(event_log, tmp_path):
+    first, second, *_ = split_batches(event_log, tmp_path)
+    state = FeatureState()
+    state.update_files([second])
+    with pytest.raises(ValueError, match="cannot be folded in"):
+        state.update(load_events(first))
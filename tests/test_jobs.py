@@ -0,0 +1,105 @@
+import io
+import json
+import subprocess
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+from src.api.jobs import (
+    CANCELLED, DONE, FAILED, FINISHED, QUEUED, Job, JobManager, load_job, request_cancel
+)
+
+FEATURES_PATH = "data/processed/user_features.csv"
+FEATURE_COLS = [
+    "total_sessions", "avg_session_duration", "active_days", "daily_activity_std",
+    "sessions_per_day", "active_days_ratio", "days_since_last_active",
+    "sessions_last_7d", "sessions_prev_7d", "session_trend_ratio",
+    "feature_entropy", "unique_features_used",
+]
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = JobManager(
+        str(tmp_path), "models/gb_model.pkl", "models/anomaly_model.pkl", FEATURE_COLS,
+        workers=1, chunk_rows=1000
+    )
+    yield manager
+    manager.shutdown()
+
+
+def upload():
+    return io.BytesIO(pd.read_csv(FEATURES_PATH).to_csv(index=False).encode())
+
+
+def wait_finished(jobs_dir, job_id, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = load_job(jobs_dir, job_id)
+        if job.status in FINISHED:
+            return job
+        time.sleep(0.1)
+    raise TimeoutError(job_id)
+
+
+def test_job_state_is_read_from_its_record(manager):
+    job = manager.submit(upload())
+    # A fresh read, as a worker other than the one running the job would do
+    finished = wait_finished(manager.jobs_dir, job.id)
+
+    assert finished.status == DONE
+    assert finished.rows_done == len(pd.read_csv(FEATURES_PATH))
+    assert finished.output_path == job.output_path
+    with open(finished.record_path) as f:
+        assert json.load(f)["status"] == DONE
+
+
+def test_cancel_marker_stops_a_job_of_another_worker(manager):
+    running = manager.submit(upload())
+    queued = manager.submit(upload())
+    # Sent through the jobs directory only, as from another worker
+    request_cancel(manager.jobs_dir, queued.id)
+
+    assert wait_finished(manager.jobs_dir, running.id).status == DONE
+    cancelled = wait_finished(manager.jobs_dir, queued.id)
+    assert cancelled.status == CANCELLED
+    assert cancelled.rows_done == 0
+
+
+def test_unfinished_job_of_an_exited_worker_reads_as_failed(tmp_path):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    job = Job("0" * 32, str(tmp_path))
+    job.pid = dead.pid
+    job.save()
+
+    loaded = load_job(str(tmp_path), job.id)
+    assert loaded.status == FAILED
+    assert "exited" in loaded.error
+
+
+@pytest.mark.parametrize("job_id", ["missing", "0" * 32, "../" + "0" * 29])
+def test_unknown_job_ids(tmp_path, job_id):
+    assert load_job(str(tmp_path), job_id) is None
+    assert request_cancel(str(tmp_path), job_id) is None
+
+
+def test_finished_job_is_not_marked_cancelled(tmp_path):
+    job = Job("1" * 32, str(tmp_path))
+    job.status = DONE
+    job.save()
+
+    assert request_cancel(str(tmp_path), job.id).status == DONE
+    assert not job.cancelled()
+    assert load_job(str(tmp_path), job.id).status == DONE
+
+
+def test_queued_job_record_is_live_while_its_worker_runs(tmp_path):
+    job = Job("2" * 32, str(tmp_path))
+    job.save()
+
+    assert load_job(str(tmp_path), job.id).status == QUEUED
+    request_cancel(str(tmp_path), job.id)
+    assert job.cancelled()
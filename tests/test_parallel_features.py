@@ -0,0 +1,30 @@
+import multiprocessing
+
+import pytest
+from pandas.testing import assert_frame_equal
+
+from src.features.build_features import build_user_features, load_events
+from src.features.parallel import build_user_features_parallel
+
+
+@pytest.fixture(scope="module")
+def events(event_log):
+    return load_events(event_log)
+
+
+@pytest.fixture(scope="module")
+def serial(events):
+    return build_user_features_parallel(events.copy(), workers=1, partitions=3)
+
+
+def test_serial_partitions_match_the_full_build(events, serial):
+    assert_frame_equal(serial, build_user_features(events.copy()))
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+@pytest.mark.parametrize("workers, partitions", [(2, None), (2, 3), (3, 7)])
+def test_fork_parallel_matches_serial(events, serial, workers, partitions):
+    parallel = build_user_features_parallel(events.copy(), workers=workers, partitions=partitions)
+    assert_frame_equal(parallel, serial)
@@ -0,0 +1,53 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="module")
+def client(api):
+    with TestClient(api.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def artifacts(api, client):
+    return api.state.wait(60)
+
+
+def telemetry(artifacts, endpoint):
+    """(predictions, probability sum, risk-level counts) recorded so far"""
+    snapshot = artifacts.telemetry.snapshot()
+    return (
+        snapshot["predictions"].get(endpoint, 0),
+        snapshot["probability_total"],
+        snapshot["risk_levels"].tolist(),
+    )
+
+
+def delta(after, before):
+    return (
+        after[0] - before[0],
+        after[1] - before[1],
+        [a - b for a, b in zip(after[2], before[2])],
+    )
+
+
+@pytest.mark.parametrize("endpoint", ["predict", "decision"])
+def test_cache_hits_and_304s_are_recorded_like_scored_requests(client, artifacts, endpoint):
+    path = f"/{endpoint}/{int(artifacts.bundle.user_ids[0])}"
+    before = telemetry(artifacts, endpoint)
+    first = client.get(path)
+    scored = telemetry(artifacts, endpoint)
+    hit = client.get(path)
+    cached = telemetry(artifacts, endpoint)
+    not_modified = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+    revalidated = telemetry(artifacts, endpoint)
+
+    assert hit.content == first.content
+    assert not_modified.status_code == 304
+    expected = delta(scored, before)
+    assert expected[0] == 1
+    for after, previous in [(cached, scored), (revalidated, cached)]:
+        count, total, risk_levels = delta(after, previous)
+        assert count == expected[0]
+        assert total == pytest.approx(expected[1])
+        assert risk_levels == expected[2]
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+import shap
+from sklearn.ensemble import GradientBoostingClassifier
+
+from src.decision_engine.rules import top_drivers
+from src.explainability.tree_shap import CompiledTreeShap, top_k_columns
+
+FEATURES_PATH = "data/processed/user_features.csv"
+
+
+@pytest.fixture(scope="module")
+def X():
+    return pd.read_csv(FEATURES_PATH).drop(columns="user_id").iloc[:500]
+
+
+@pytest.fixture(scope="module", params=[2, 3])
+def model(request, X):
+    y = (X["days_since_last_active"] + X["sessions_last_7d"] > 10).astype(int)
+    return GradientBoostingClassifier(
+        n_estimators=25, max_depth=request.param, random_state=0
+    ).fit(X, y)
+
+
+def test_shap_values_match_tree_explainer(model, X):
+    explainer = shap.TreeExplainer(model)
+    compiled = CompiledTreeShap.from_sklearn(model)
+
+    assert np.allclose(compiled.shap_values(X), explainer.shap_values(X), rtol=1e-9, atol=1e-9)
+    assert compiled.expected_value == pytest.approx(float(np.ravel(explainer.expected_value)[0]))
+
+
+def test_top_k_matches_full_vector_ranking(model, X):
+    compiled = CompiledTreeShap.from_sklearn(model)
+    values = compiled.shap_values(X)
+    idx, top = compiled.top_k(X, k=3)
+
+    ranking = np.argsort(-np.abs(values), axis=1, kind="stable")[:, :3]
+    assert np.array_equal(idx, ranking)
+    assert np.array_equal(top, np.take_along_axis(values, ranking, axis=1))
+    # The top driver is the one /decision and /upload-data report
+    assert np.array_equal(X.columns[idx[:, 0]], top_drivers(values, X.columns))
+
+
+def test_top_k_columns_ties_agree_with_argmax():
+    values = np.array([
+        [1.0, -3.0, 3.0, 0.5],    # tie across signs
+        [2.0, 2.0, 2.0, 2.0],     # all tied
+        [0.0, 0.0, 0.0, 0.0],
+        [-0.5, 0.25, -4.0, 4.0],
+    ])
+    ranking = np.argsort(-np.abs(values), axis=1, kind="stable")
+    for k in range(1, values.shape[1] + 1):
+        idx, top = top_k_columns(values, k)
+        assert np.array_equal(idx, ranking[:, :k])
+        assert np.array_equal(top, np.take_along_axis(values, ranking[:, :k], axis=1))
+
+    idx, _ = top_k_columns(values, 1)
+    assert np.array_equal(idx[:, 0], np.abs(values).argmax(axis=1))
+    names = ["a", "b", "c", "d"]
+    assert top_drivers(values, names).tolist() == ["b", "a", "a", "c"]
+
+
+def test_top_k_columns_caps_k_at_the_column_count():
+    values = np.array([[1.0, -2.0]])
+    idx, top = top_k_columns(values, 5)
+    assert idx.tolist() == [[1, 0]]
+    assert top.tolist() == [[-2.0, 1.0]]
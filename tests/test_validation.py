@@ -0,0 +1,58 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from src.api.upload_pipeline import check_uploaded_frame
+from src.api.validation import validate_features
+
+FEATURE_COLS = ["days_since_last_active", "sessions_per_day", "active_days_ratio"]
+
+
+def upload_frame(rows):
+    df = pd.DataFrame({
+        "user_id": np.arange(rows),
+        "days_since_last_active": np.ones(rows),
+        "sessions_per_day": np.ones(rows),
+        "active_days_ratio": np.full(rows, 0.5),
+    })
+    return df
+
+
+def test_sample_rows_are_positions_in_a_single_frame():
+    df = upload_frame(10)
+    df.loc[7, "active_days_ratio"] = 2.0
+    _, violations = validate_features(df, FEATURE_COLS)
+    assert violations.to_list()[0]["sample_rows"] == [7]
+
+
+def test_sample_rows_are_file_rows_in_a_later_chunk():
+    df = upload_frame(3000)
+    df.loc[2500, "sessions_per_day"] = -1.0
+    chunks = pd.read_csv(io.StringIO(df.to_csv(index=False)), chunksize=1000)
+
+    reports = []
+    for chunk in chunks:
+        try:
+            check_uploaded_frame(chunk, FEATURE_COLS)
+        except HTTPException as exc:
+            reports.append(exc.detail)
+
+    assert len(reports) == 1
+    (violation,) = reports[0]["violations"]
+    assert violation["column"] == "sessions_per_day"
+    assert violation["sample_rows"] == [2500]
+
+
+@pytest.mark.parametrize("value, rule", [("abc", "numeric"), ("nan", "nan")])
+def test_non_range_violations_in_a_later_chunk(value, rule):
+    df = upload_frame(3000).astype({"days_since_last_active": object})
+    df.loc[1999, "days_since_last_active"] = value
+    chunk = list(pd.read_csv(io.StringIO(df.to_csv(index=False)), chunksize=1000))[1]
+
+    _, violations = validate_features(chunk, FEATURE_COLS)
+    (violation,) = violations.to_list()
+    assert violation["rule"] == rule
+    assert violation["sample_rows"] == [1999]